@@ -6,7 +6,10 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
 from app.database import Base
-from app.models import User, Team, TeamMember, Service, Environment, HealthCheck
+from app.models import (
+    User, Team, TeamMember, Service, Environment, HealthCheck, EnvironmentLatestStatus, HealthCheckRollup,
+    HealthCheckLatencyHistogram, SchedulerWorker, ChangeLog
+)
 
 config = context.config
 if config.config_file_name is not None:
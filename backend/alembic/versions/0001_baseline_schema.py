@@ -0,0 +1,121 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.models.user import GUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+user_role = sa.Enum('ADMIN', 'MEMBER', 'VIEWER', name='userrole')
+environment_type = sa.Enum('DEVELOPMENT', 'STAGING', 'PRODUCTION', name='environmenttype')
+health_status = sa.Enum('HEALTHY', 'DEGRADED', 'DOWN', 'UNKNOWN', name='healthstatus')
+
+
+def upgrade() -> None:
+    # Databases bootstrapped by init_db() before migrations existed already
+    # have these tables; only create what is missing.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', GUID(), nullable=False),
+            sa.Column('email', sa.String(length=255), nullable=False),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('full_name', sa.String(length=255), nullable=True),
+            sa.Column('role', user_role, nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    if 'teams' not in existing:
+        op.create_table(
+            'teams',
+            sa.Column('id', GUID(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.String(length=500), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'team_members' not in existing:
+        op.create_table(
+            'team_members',
+            sa.Column('id', GUID(), nullable=False),
+            sa.Column('user_id', GUID(), nullable=False),
+            sa.Column('team_id', GUID(), nullable=False),
+            sa.Column('role', user_role, nullable=False),
+            sa.Column('joined_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'services' not in existing:
+        op.create_table(
+            'services',
+            sa.Column('id', GUID(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('url', sa.String(length=500), nullable=True),
+            sa.Column('team_id', GUID(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'environments' not in existing:
+        op.create_table(
+            'environments',
+            sa.Column('id', GUID(), nullable=False),
+            sa.Column('name', environment_type, nullable=False),
+            sa.Column('url', sa.String(length=500), nullable=False),
+            sa.Column('service_id', GUID(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['service_id'], ['services.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    if 'health_checks' not in existing:
+        op.create_table(
+            'health_checks',
+            sa.Column('id', GUID(), nullable=False),
+            sa.Column('environment_id', GUID(), nullable=False),
+            sa.Column('status', health_status, nullable=False),
+            sa.Column('response_time_ms', sa.Integer(), nullable=True),
+            sa.Column('status_code', sa.Integer(), nullable=True),
+            sa.Column('error_message', sa.Text(), nullable=True),
+            sa.Column('checked_at', sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(['environment_id'], ['environments.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('health_checks')
+    op.drop_table('environments')
+    op.drop_table('services')
+    op.drop_table('team_members')
+    op.drop_table('teams')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    for enum_type in (health_status, environment_type, user_role):
+        enum_type.drop(op.get_bind(), checkfirst=True)
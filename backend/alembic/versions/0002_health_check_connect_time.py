@@ -0,0 +1,28 @@
+"""add health_checks.connect_time_ms
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('health_checks')}
+    if 'connect_time_ms' not in columns:
+        op.add_column('health_checks', sa.Column('connect_time_ms', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('health_checks', 'connect_time_ms')
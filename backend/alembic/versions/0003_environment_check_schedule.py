@@ -0,0 +1,32 @@
+"""add per-environment check interval and timeout
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('environments')}
+    if 'check_interval_seconds' not in columns:
+        op.add_column('environments', sa.Column('check_interval_seconds', sa.Integer(), server_default='60', nullable=False))
+    if 'timeout_seconds' not in columns:
+        op.add_column('environments', sa.Column('timeout_seconds', sa.Integer(), server_default='10', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('environments') as batch_op:
+        batch_op.drop_column('timeout_seconds')
+        batch_op.drop_column('check_interval_seconds')
@@ -0,0 +1,53 @@
+"""add environment_latest_status projection
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.models.user import GUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('environment_latest_status'):
+        return
+
+    op.create_table(
+        'environment_latest_status',
+        sa.Column('environment_id', GUID(), nullable=False),
+        sa.Column('health_check_id', GUID(), nullable=False),
+        sa.Column('status', sa.Enum('HEALTHY', 'DEGRADED', 'DOWN', 'UNKNOWN', name='healthstatus', create_type=False), nullable=False),
+        sa.Column('response_time_ms', sa.Integer(), nullable=True),
+        sa.Column('checked_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['environment_id'], ['environments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('environment_id'),
+    )
+
+    # Backfill from existing history: newest check per environment
+    op.execute(
+        """
+        INSERT INTO environment_latest_status (environment_id, health_check_id, status, response_time_ms, checked_at)
+        SELECT environment_id, id, status, response_time_ms, checked_at
+        FROM (
+            SELECT environment_id, id, status, response_time_ms, checked_at,
+                   ROW_NUMBER() OVER (PARTITION BY environment_id ORDER BY checked_at DESC) AS rn
+            FROM health_checks
+        ) ranked
+        WHERE rn = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('environment_latest_status')
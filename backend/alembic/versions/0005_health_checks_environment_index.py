@@ -0,0 +1,43 @@
+"""index health_checks on (environment_id, checked_at DESC)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_health_checks_environment_checked_at'
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if INDEX_NAME in {ix['name'] for ix in sa.inspect(bind).get_indexes('health_checks')}:
+        return
+
+    if bind.dialect.name == 'postgresql':
+        # Build without locking out check ingestion on large tables
+        with op.get_context().autocommit_block():
+            op.create_index(
+                INDEX_NAME,
+                'health_checks',
+                ['environment_id', sa.text('checked_at DESC')],
+                postgresql_include=['id', 'status', 'response_time_ms'],
+                postgresql_concurrently=True,
+            )
+    else:
+        op.create_index(INDEX_NAME, 'health_checks', ['environment_id', sa.text('checked_at DESC')])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='health_checks')
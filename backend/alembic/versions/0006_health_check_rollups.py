@@ -0,0 +1,81 @@
+"""add health_check_rollups
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.models.user import GUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESOLUTIONS = (60, 3600, 86400)
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('health_check_rollups'):
+        return
+
+    op.create_table(
+        'health_check_rollups',
+        sa.Column('environment_id', GUID(), nullable=False),
+        sa.Column('bucket_seconds', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('healthy_count', sa.Integer(), nullable=False),
+        sa.Column('degraded_count', sa.Integer(), nullable=False),
+        sa.Column('down_count', sa.Integer(), nullable=False),
+        sa.Column('unknown_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('response_count', sa.Integer(), nullable=False),
+        sa.Column('response_time_sum', sa.BigInteger(), nullable=False),
+        sa.Column('response_time_min', sa.Integer(), nullable=True),
+        sa.Column('response_time_max', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['environment_id'], ['environments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('environment_id', 'bucket_seconds', 'bucket_start'),
+    )
+
+    # Seed rollups from existing raw history, one resolution at a time
+    bind = op.get_bind()
+    for bucket_seconds in RESOLUTIONS:
+        if bind.dialect.name == 'postgresql':
+            bucket = f"to_timestamp(floor(extract(epoch FROM checked_at) / {bucket_seconds}) * {bucket_seconds}) AT TIME ZONE 'UTC'"
+        else:
+            # Match the "YYYY-MM-DD HH:MM:SS.ffffff" text SQLAlchemy stores
+            bucket = (
+                f"strftime('%Y-%m-%d %H:%M:%S.000000', "
+                f"(CAST(strftime('%s', checked_at) AS INTEGER) / {bucket_seconds}) * {bucket_seconds}, 'unixepoch')"
+            )
+        op.execute(
+            f"""
+            INSERT INTO health_check_rollups (
+                environment_id, bucket_seconds, bucket_start,
+                healthy_count, degraded_count, down_count, unknown_count, error_count,
+                response_count, response_time_sum, response_time_min, response_time_max
+            )
+            SELECT environment_id, {bucket_seconds}, {bucket},
+                   SUM(CASE WHEN status = 'HEALTHY' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'DEGRADED' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'DOWN' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'UNKNOWN' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN error_message IS NOT NULL THEN 1 ELSE 0 END),
+                   COUNT(response_time_ms),
+                   COALESCE(SUM(response_time_ms), 0),
+                   MIN(response_time_ms),
+                   MAX(response_time_ms)
+            FROM health_checks
+            GROUP BY environment_id, {bucket}
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('health_check_rollups')
@@ -0,0 +1,65 @@
+"""add id to the health_checks environment index for keyset pagination
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_INDEX = 'ix_health_checks_environment_checked_at'
+NEW_INDEX = 'ix_health_checks_environment_checked_at_id'
+
+
+def _index_names() -> set:
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('health_checks')}
+
+
+def upgrade() -> None:
+    existing = _index_names()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Build the replacement before dropping the old index so lookups
+        # stay indexed throughout
+        with op.get_context().autocommit_block():
+            if NEW_INDEX not in existing:
+                op.create_index(
+                    NEW_INDEX,
+                    'health_checks',
+                    ['environment_id', sa.text('checked_at DESC'), sa.text('id DESC')],
+                    postgresql_include=['status', 'response_time_ms'],
+                    postgresql_concurrently=True,
+                )
+            if OLD_INDEX in existing:
+                op.drop_index(OLD_INDEX, table_name='health_checks', postgresql_concurrently=True)
+    else:
+        if NEW_INDEX not in existing:
+            op.create_index(NEW_INDEX, 'health_checks', ['environment_id', sa.text('checked_at DESC'), sa.text('id DESC')])
+        if OLD_INDEX in existing:
+            op.drop_index(OLD_INDEX, table_name='health_checks')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(
+                OLD_INDEX,
+                'health_checks',
+                ['environment_id', sa.text('checked_at DESC')],
+                postgresql_include=['id', 'status', 'response_time_ms'],
+                postgresql_concurrently=True,
+            )
+            op.drop_index(NEW_INDEX, table_name='health_checks', postgresql_concurrently=True)
+    else:
+        op.create_index(OLD_INDEX, 'health_checks', ['environment_id', sa.text('checked_at DESC')])
+        op.drop_index(NEW_INDEX, table_name='health_checks')
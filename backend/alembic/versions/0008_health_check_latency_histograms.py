@@ -0,0 +1,76 @@
+"""add health_check_latency_histograms
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.models.user import GUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RESOLUTIONS = (60, 3600, 86400)
+
+# Frozen copy of rollup_service.LATENCY_BUCKET_BOUNDS_MS at this revision
+LATENCY_BUCKET_BOUNDS_MS = (
+    1, 2, 3, 4, 5, 6, 8,
+    10, 12, 15, 20, 25, 30, 40, 50, 60, 80,
+    100, 125, 150, 200, 250, 300, 400, 500, 600, 800,
+    1000, 1250, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 8000,
+    10000, 12500, 15000, 20000, 30000, 60000,
+)
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('health_check_latency_histograms'):
+        return
+
+    op.create_table(
+        'health_check_latency_histograms',
+        sa.Column('environment_id', GUID(), nullable=False),
+        sa.Column('bucket_seconds', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('latency_bucket', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['environment_id'], ['environments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('environment_id', 'bucket_seconds', 'bucket_start', 'latency_bucket'),
+    )
+
+    latency = "CASE " + " ".join(
+        f"WHEN response_time_ms <= {bound} THEN {index}" for index, bound in enumerate(LATENCY_BUCKET_BOUNDS_MS)
+    ) + f" ELSE {len(LATENCY_BUCKET_BOUNDS_MS)} END"
+
+    # Seed from existing raw history with the same bucketing as the rollups
+    bind = op.get_bind()
+    for bucket_seconds in RESOLUTIONS:
+        if bind.dialect.name == 'postgresql':
+            bucket = f"to_timestamp(floor(extract(epoch FROM checked_at) / {bucket_seconds}) * {bucket_seconds}) AT TIME ZONE 'UTC'"
+        else:
+            bucket = (
+                f"strftime('%Y-%m-%d %H:%M:%S.000000', "
+                f"(CAST(strftime('%s', checked_at) AS INTEGER) / {bucket_seconds}) * {bucket_seconds}, 'unixepoch')"
+            )
+        op.execute(
+            f"""
+            INSERT INTO health_check_latency_histograms (
+                environment_id, bucket_seconds, bucket_start, latency_bucket, count
+            )
+            SELECT environment_id, {bucket_seconds}, {bucket}, {latency}, COUNT(*)
+            FROM health_checks
+            WHERE response_time_ms IS NOT NULL
+            GROUP BY environment_id, {bucket}, {latency}
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('health_check_latency_histograms')
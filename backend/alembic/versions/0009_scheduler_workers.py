@@ -0,0 +1,39 @@
+"""add scheduler_workers heartbeat table
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('scheduler_workers'):
+        return
+
+    op.create_table(
+        'scheduler_workers',
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('hostname', sa.String(length=255), nullable=False),
+        sa.Column('pid', sa.Integer(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_scheduler_workers_heartbeat_at', 'scheduler_workers', ['heartbeat_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scheduler_workers_heartbeat_at', table_name='scheduler_workers')
+    op.drop_table('scheduler_workers')
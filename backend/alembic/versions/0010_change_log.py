@@ -0,0 +1,44 @@
+"""add change_log for delta sync
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.user import GUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('change_log'):
+        return
+
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', GUID(), nullable=False),
+        sa.Column('team_id', GUID(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+    op.create_index('ix_change_log_team_id_seq', 'change_log', ['team_id', 'seq'])
+    op.create_index('ix_change_log_changed_at', 'change_log', ['changed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_change_log_changed_at', table_name='change_log')
+    op.drop_index('ix_change_log_team_id_seq', table_name='change_log')
+    op.drop_table('change_log')
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -13,10 +14,87 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Authenticated users cached per token to skip the users lookup
+    auth_cache_max_entries: int = 10000
+    auth_cache_ttl_seconds: float = 60.0
+    # Team ids per user, used by every non-admin access check
+    team_membership_cache_ttl_seconds: float = 60.0
+    team_membership_cache_max_users: int = 10000
+    # Delta sync change log: how long entries are kept (older cursors get
+    # 410 and must resync) and how long a sequence gap may be an in-flight commit
+    sync_change_log_days: int = 7
+    sync_gap_grace_seconds: float = 5.0
+    # Serialized GET /api/services responses, per team scope. Changes made
+    # through this worker invalidate them at once; the TTL bounds how long
+    # one can miss a structural change committed by another worker
+    service_list_cache_ttl_seconds: float = 10.0
+    service_list_cache_max_entries: int = 1000
+    # bcrypt runs on a dedicated thread pool; once this many hashes are
+    # running or queued, login and registration answer 503
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 32
 
     # CORS
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
 
+    # Health check scheduler (interval/timeout are defaults for new environments)
+    health_check_interval_seconds: int = 60
+    health_check_timeout_seconds: int = 10
+    health_check_concurrency: int = 20
+    health_check_resync_seconds: int = 300
+    # Shard environments across every running worker (heartbeats in the
+    # scheduler_workers table) so each one is probed exactly once
+    scheduler_sharding: bool = True
+    scheduler_heartbeat_seconds: float = 10.0
+    scheduler_worker_ttl_seconds: float = 30.0
+
+    # Write-behind ingestion of health check results
+    ingest_batch_size: int = 500
+    ingest_flush_interval_seconds: float = 1.0
+    ingest_max_pending: int = 10000
+
+    # Retention of health check history (rollup windows keyed by resolution).
+    # 1m rollups and histograms hold about as many rows as the raw checks, so
+    # keep them no longer than the raw data
+    retention_raw_days: int = 7
+    retention_rollup_days: dict[str, int] = {"1m": 7, "1h": 365, "1d": 365}
+    retention_batch_size: int = 5000
+    retention_batch_pause_seconds: float = 0.05
+    retention_interval_seconds: int = 3600
+    # Drop whole daily partitions when health_checks is range-partitioned (PostgreSQL)
+    retention_use_partitions: bool = False
+
+    # WebSocket fan-out: per-connection outbound queue and what to do when
+    # a client can't keep up ("drop_oldest", "coalesce" or "disconnect")
+    ws_send_queue_size: int = 256
+    ws_slow_consumer_policy: str = "drop_oldest"
+    ws_send_timeout_seconds: float = 10.0
+    # Window over which updates are merged for clients that opt into status_batch frames
+    ws_batch_window_ms: int = 150
+    # How status updates reach the sockets of every worker process: "memory"
+    # (single worker), "unix" (workers on one host, sockets in
+    # ws_broadcast_dir) or "postgres" (LISTEN/NOTIFY on ws_broadcast_channel)
+    ws_broadcast_backend: str = "memory"
+    ws_broadcast_dir: Optional[str] = None
+    ws_broadcast_channel: str = "status_updates"
+    # Status updates kept per subscribed service / environment so a
+    # reconnecting client can resume_from its last sequence number, and how
+    # many such topics are tracked at most
+    ws_replay_buffer_size: int = 64
+    ws_replay_max_topics: int = 2000
+
+    # Health check probe HTTP client
+    probe_max_connections: int = 100
+    probe_max_keepalive_connections: int = 50
+    probe_keepalive_expiry_seconds: float = 90.0
+    probe_max_connections_per_host: int = 4
+    probe_http2: bool = False
+    # Per-host probe semaphores kept at most (idle ones are evicted LRU)
+    probe_max_tracked_hosts: int = 1000
+    # "total" records connection setup inside response_time_ms, "split" records it
+    # separately in connect_time_ms so response_time_ms is the warm request latency
+    probe_latency_mode: str = "total"
+
     class Config:
         env_file = ".env"
 
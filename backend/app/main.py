@@ -1,4 +1,3 @@
-import asyncio
 from contextlib import asynccontextmanager
 from uuid import UUID
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
@@ -6,68 +5,58 @@ from fastapi.middleware.cors import CORSMiddleware
 import structlog
 
 from app.config import get_settings
-from app.database import init_db, async_session_maker
-from app.routers import auth_router, services_router, environments_router, health_router, teams_router
-from app.websocket import manager
-from app.services.monitor_service import perform_health_check
-from app.models.environment import Environment
-from sqlalchemy import select
+from app.database import engine, init_db
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.routers import (
+    auth_router,
+    services_router,
+    environments_router,
+    health_router,
+    teams_router,
+    metrics_router,
+    sync_router
+)
+from app.websocket import MSGPACK_SUBPROTOCOL, manager
+from app.services.ingestion import ingestor
+from app.services.password_hasher import password_hasher
+from app.services.probe_client import probe_client
+from app.services.retention import retention
+from app.services.scheduler import scheduler
+from app.services.sharding import membership
+from app.services.status_service import status_cache
 
 logger = structlog.get_logger()
 settings = get_settings()
 
-# Background task flag
-background_task_running = False
-
-
-async def periodic_health_checks():
-    """Background task to perform health checks every 60 seconds"""
-    global background_task_running
-    background_task_running = True
-
-    while background_task_running:
-        try:
-            async with async_session_maker() as db:
-                result = await db.execute(select(Environment))
-                environments = result.scalars().all()
-
-                for env in environments:
-                    try:
-                        health_check = await perform_health_check(db, env.id)
-                        await db.commit()
-
-                        # Broadcast update via WebSocket
-                        await manager.broadcast_status_update(
-                            service_id=env.service_id,
-                            environment_id=env.id,
-                            status=health_check.status.value,
-                            response_time_ms=health_check.response_time_ms or 0,
-                            timestamp=health_check.checked_at.isoformat()
-                        )
-                    except Exception as e:
-                        logger.error("Health check failed", environment_id=str(env.id), error=str(e))
-
-        except Exception as e:
-            logger.error("Periodic health check error", error=str(e))
-
-        await asyncio.sleep(60)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting SaaS Service Monitor API")
     await init_db()
-
-    # Start background health check task
-    task = asyncio.create_task(periodic_health_checks())
+    await status_cache.warm()
+
+    # Start the shared probe client, the WebSocket broadcast bus, result
+    # ingestion and the background health check scheduler
+    await probe_client.start()
+    await manager.start()
+    ingestor.start()
+    if settings.scheduler_sharding:
+        await membership.start()
+    scheduler.start()
+    retention.start()
 
     yield
 
-    # Shutdown
-    global background_task_running
-    background_task_running = False
-    task.cancel()
+    # Shutdown: stop probing first so the ingestor can flush every result
+    await retention.stop()
+    await scheduler.stop()
+    if settings.scheduler_sharding:
+        await membership.stop()
+    await ingestor.stop()
+    await manager.stop()
+    await probe_client.stop()
+    password_hasher.shutdown()
     logger.info("Shutting down SaaS Service Monitor API")
 
 
@@ -78,6 +67,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+instrument_engine(engine)
+app.add_middleware(MetricsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -85,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag"],
 )
 
 # Include routers
@@ -93,6 +86,8 @@ app.include_router(teams_router)
 app.include_router(services_router)
 app.include_router(environments_router)
 app.include_router(health_router)
+app.include_router(sync_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -107,25 +102,39 @@ async def health():
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    # JSON text frames unless the client asks for msgpack, by subprotocol
+    # or ?format=msgpack; client messages are JSON either way
+    offered = MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+    await manager.connect(
+        websocket,
+        binary=offered or websocket.query_params.get("format") == MSGPACK_SUBPROTOCOL,
+        subprotocol=MSGPACK_SUBPROTOCOL if offered else None
+    )
     try:
         while True:
             data = await websocket.receive_json()
 
             # Handle subscription messages
             if data.get("type") == "subscribe":
+                # Followed by the current statuses, or only the updates
+                # missed since "resume_from" when reconnecting
+                resume_from, stream = data.get("resume_from"), data.get("stream")
                 if "service_id" in data:
-                    manager.subscribe_to_service(websocket, UUID(data["service_id"]))
+                    service_id = UUID(data["service_id"])
+                    manager.subscribe_to_service(websocket, service_id)
                     await manager.send_personal_message(
                         {"type": "subscribed", "service_id": data["service_id"]},
                         websocket
                     )
+                    manager.catch_up_service(websocket, service_id, resume_from, stream)
                 if "environment_id" in data:
-                    manager.subscribe_to_environment(websocket, UUID(data["environment_id"]))
+                    environment_id = UUID(data["environment_id"])
+                    manager.subscribe_to_environment(websocket, environment_id)
                     await manager.send_personal_message(
                         {"type": "subscribed", "environment_id": data["environment_id"]},
                         websocket
                     )
+                    manager.catch_up_environment(websocket, environment_id, resume_from, stream)
 
             elif data.get("type") == "unsubscribe":
                 if "service_id" in data:
@@ -133,6 +142,11 @@ async def websocket_endpoint(websocket: WebSocket):
                 if "environment_id" in data:
                     manager.unsubscribe_from_environment(websocket, UUID(data["environment_id"]))
 
+            elif data.get("type") == "configure":
+                batch, delta = bool(data.get("batch")), bool(data.get("delta"))
+                manager.configure(websocket, batch=batch, delta=delta)
+                await manager.send_personal_message({"type": "configured", "batch": batch, "delta": delta}, websocket)
+
             elif data.get("type") == "ping":
                 await manager.send_personal_message({"type": "pong"}, websocket)
 
@@ -0,0 +1,259 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional, Sequence
+from sqlalchemy import event
+
+# (labels, value) pairs reported by a collector for one metric family
+Sample = tuple[dict, float]
+Collector = Callable[[], Iterable[tuple[str, str, str, Iterable[Sample]]]]
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonic counter keyed by label values"""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *labels: str):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in list(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Bucketed distribution keyed by label values.
+
+    Each series keeps per-bucket (non-cumulative) counts plus sum and
+    count in a plain list; ``observe`` is a bisect and three increments.
+    Buckets are made cumulative only when rendering.
+    """
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: [bucket counts..., +Inf count, sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[-1] if series else 0
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{label_text} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics recorded on the hot path plus collectors sampled at scrape time.
+
+    Everything recording into these metrics runs on the event loop thread,
+    so updates are plain dict/list operations with no locking; the cost is
+    paid when ``/metrics`` renders. Counters that components already keep
+    for themselves are exposed through collectors rather than duplicated.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status")
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by the route that issued it (background for non-request work)",
+    ("route",)
+)
+PROBE_LATENCY = registry.histogram(
+    "health_check_probe_latency_seconds",
+    "Probe response time by probe outcome (per-environment latency is served from the rollups)",
+    ("status",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+HEALTH_CHECK_DURATION = registry.histogram(
+    "health_check_duration_seconds",
+    "Wall time of one scheduled check, from dispatch through probe and ingestion",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+HEALTH_CHECK_SCHEDULE_LAG = registry.histogram(
+    "health_check_schedule_lag_seconds",
+    "Delay between a check's slot and the moment its probe started"
+)
+WS_FANOUT_DURATION = registry.histogram(
+    "websocket_fanout_duration_seconds",
+    "Time to queue one status update for every subscribed local socket",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+)
+
+# Durations of the statements issued while serving the current request
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+def instrument_engine(engine):
+    """Time every statement executed through ``engine`` (an AsyncEngine or Engine)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        queries = _request_queries.get()
+        if queries is None:
+            DB_QUERY_DURATION.observe(elapsed, "background")
+        else:
+            queries.append(elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and DB time per route template.
+
+    The route is only known once routing has run, so statements are
+    buffered in a context variable and attributed when the response ends.
+    Unmatched paths share one label to keep cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries: list[float] = []
+        token = _request_queries.set(queries)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_queries.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], path, str(status_code))
+            for elapsed in queries:
+                DB_QUERY_DURATION.observe(elapsed, path)
@@ -1,6 +1,11 @@
 from app.models.user import User, Team, TeamMember
 from app.models.service import Service
 from app.models.environment import Environment
-from app.models.health_check import HealthCheck
+from app.models.health_check import HealthCheck, EnvironmentLatestStatus, HealthCheckRollup, HealthCheckLatencyHistogram
+from app.models.worker import SchedulerWorker
+from app.models.change_log import ChangeLog
 
-__all__ = ["User", "Team", "TeamMember", "Service", "Environment", "HealthCheck"]
+__all__ = [
+    "User", "Team", "TeamMember", "Service", "Environment", "HealthCheck", "EnvironmentLatestStatus",
+    "HealthCheckRollup", "HealthCheckLatencyHistogram", "SchedulerWorker", "ChangeLog"
+]
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Index, Integer, String
+from app.database import Base
+from app.models.user import GUID
+
+
+class ChangeLog(Base):
+    """One row per change to a service, environment or latest status, in commit sequence.
+
+    Only identities are logged; ``/api/sync`` reads the current state of
+    whatever changed, so repeated changes to one entity collapse into one
+    entry per sync. ``team_id`` is kept so deletions can still be scoped to
+    the teams allowed to see them.
+    """
+    __tablename__ = "change_log"
+
+    # SQLite only autoincrements INTEGER PRIMARY KEY
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(GUID(), nullable=False)
+    team_id = Column(GUID(), nullable=False)
+    deleted = Column(Boolean, default=False, nullable=False)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_change_log_team_id_seq", team_id, seq),
+        Index("ix_change_log_changed_at", changed_at),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.user import GUID
@@ -20,6 +20,8 @@ class Environment(Base):
     name = Column(SQLEnum(EnvironmentType), nullable=False)
     url = Column(String(500), nullable=False)
     service_id = Column(GUID(), ForeignKey("services.id", ondelete="CASCADE"), nullable=False)
+    check_interval_seconds = Column(Integer, default=60, server_default="60", nullable=False)
+    timeout_seconds = Column(Integer, default=10, server_default="10", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, Enum as SQLEnum, Text, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.models.user import GUID
@@ -23,6 +23,65 @@ class HealthCheck(Base):
     response_time_ms = Column(Integer, nullable=True)
     status_code = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
+    connect_time_ms = Column(Integer, nullable=True)
     checked_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     environment = relationship("Environment", back_populates="health_checks")
+
+    __table_args__ = (
+        # Serves every latest/history lookup (filter on environment, newest
+        # first, id as the keyset tie-breaker). On PostgreSQL the INCLUDE
+        # columns make status and latency scans index-only; SQLite ignores
+        # them and gets the plain composite.
+        Index(
+            "ix_health_checks_environment_checked_at_id",
+            environment_id,
+            checked_at.desc(),
+            id.desc(),
+            postgresql_include=["status", "response_time_ms"]
+        ),
+    )
+
+
+class EnvironmentLatestStatus(Base):
+    """Projection of the most recent health check per environment, maintained on ingest"""
+    __tablename__ = "environment_latest_status"
+
+    environment_id = Column(GUID(), ForeignKey("environments.id", ondelete="CASCADE"), primary_key=True)
+    health_check_id = Column(GUID(), nullable=False)
+    status = Column(SQLEnum(HealthStatus), nullable=False)
+    response_time_ms = Column(Integer, nullable=True)
+    checked_at = Column(DateTime, nullable=False)
+
+
+class HealthCheckRollup(Base):
+    """Per-environment aggregate of health checks over a fixed time bucket"""
+    __tablename__ = "health_check_rollups"
+
+    environment_id = Column(GUID(), ForeignKey("environments.id", ondelete="CASCADE"), primary_key=True)
+    bucket_seconds = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    healthy_count = Column(Integer, default=0, nullable=False)
+    degraded_count = Column(Integer, default=0, nullable=False)
+    down_count = Column(Integer, default=0, nullable=False)
+    unknown_count = Column(Integer, default=0, nullable=False)
+    error_count = Column(Integer, default=0, nullable=False)
+    response_count = Column(Integer, default=0, nullable=False)
+    response_time_sum = Column(BigInteger, default=0, nullable=False)
+    response_time_min = Column(Integer, nullable=True)
+    response_time_max = Column(Integer, nullable=True)
+
+
+class HealthCheckLatencyHistogram(Base):
+    """Response time distribution for a rollup bucket.
+
+    One row per non-empty latency bucket, so percentiles over any range can
+    be estimated from a handful of summed counters.
+    """
+    __tablename__ = "health_check_latency_histograms"
+
+    environment_id = Column(GUID(), ForeignKey("environments.id", ondelete="CASCADE"), primary_key=True)
+    bucket_seconds = Column(Integer, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    latency_bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
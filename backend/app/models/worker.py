@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from app.database import Base
+
+
+class SchedulerWorker(Base):
+    """A live process taking part in health check execution, kept fresh by heartbeats"""
+    __tablename__ = "scheduler_workers"
+
+    id = Column(String(255), primary_key=True)
+    hostname = Column(String(255), nullable=False)
+    pid = Column(Integer, nullable=False)
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -3,5 +3,8 @@ from app.routers.services import router as services_router
 from app.routers.environments import router as environments_router
 from app.routers.health import router as health_router
 from app.routers.teams import router as teams_router
+from app.routers.metrics import router as metrics_router
+from app.routers.sync import router as sync_router
 
-__all__ = ["auth_router", "services_router", "environments_router", "health_router", "teams_router"]
+__all__ = ["auth_router", "services_router", "environments_router", "health_router", "teams_router", "metrics_router",
+           "sync_router"]
@@ -1,36 +1,27 @@
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.models.user import User, TeamMember, UserRole
-from app.models.service import Service
+from app.models.user import User
 from app.models.environment import Environment
 from app.schemas.environment import EnvironmentCreate, EnvironmentResponse
+from app.schemas.health_check import EnvironmentHealthStatsResponse
+from app.services.access_service import check_environment_access, check_service_access
 from app.services.auth_service import get_current_user
-from app.services.monitor_service import get_latest_health_check
+from app.services.rollup_service import ROLLUP_RESOLUTIONS
+from app.services.stats_service import get_health_stats, resolve_stats_range
+from app.services.status_service import attach_latest_status
+from app.services.scheduler import scheduler
+from app.services.sync_service import record_environment_changes
+from app.utils.dates import to_naive_utc
+from app.websocket import manager
+from app.config import get_settings
 
 router = APIRouter(prefix="/api", tags=["Environments"])
-
-
-async def check_service_access(db: AsyncSession, user: User, service_id: UUID) -> Service:
-    result = await db.execute(select(Service).where(Service.id == service_id))
-    service = result.scalar_one_or_none()
-
-    if not service:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
-
-    if user.role != UserRole.ADMIN:
-        member_result = await db.execute(
-            select(TeamMember).where(
-                TeamMember.team_id == service.team_id,
-                TeamMember.user_id == user.id
-            )
-        )
-        if not member_result.scalar_one_or_none():
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-
-    return service
+settings = get_settings()
 
 
 @router.get("/services/{service_id}/environments", response_model=list[EnvironmentResponse])
@@ -45,13 +36,7 @@ async def list_environments(
         select(Environment).where(Environment.service_id == service_id)
     )
     environments = list(result.scalars().all())
-
-    # Add current status to each environment
-    for env in environments:
-        latest_check = await get_latest_health_check(db, env.id)
-        if latest_check:
-            env.current_status = latest_check.status
-            env.last_check = latest_check.checked_at
+    await attach_latest_status(db, environments)
 
     return environments
 
@@ -65,14 +50,28 @@ async def create_environment(
 ):
     await check_service_access(db, current_user, service_id)
 
+    check_interval_seconds = env_data.check_interval_seconds or settings.health_check_interval_seconds
+    timeout_seconds = env_data.timeout_seconds or min(settings.health_check_timeout_seconds, check_interval_seconds - 1)
+
     environment = Environment(
         name=env_data.name,
         url=env_data.url,
-        service_id=service_id
+        service_id=service_id,
+        check_interval_seconds=check_interval_seconds,
+        timeout_seconds=timeout_seconds
     )
     db.add(environment)
     await db.flush()
     await db.refresh(environment)
+    await record_environment_changes(db, [environment.id])
+
+    scheduler.schedule(
+        environment.id,
+        environment.service_id,
+        environment.url,
+        environment.check_interval_seconds,
+        environment.timeout_seconds
+    )
     return environment
 
 
@@ -82,20 +81,35 @@ async def get_environment(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(Environment).where(Environment.id == environment_id))
-    environment = result.scalar_one_or_none()
-
-    if not environment:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Environment not found")
+    environment = await check_environment_access(db, current_user, environment_id)
+    await attach_latest_status(db, [environment])
 
-    await check_service_access(db, current_user, environment.service_id)
+    return environment
 
-    latest_check = await get_latest_health_check(db, environment.id)
-    if latest_check:
-        environment.current_status = latest_check.status
-        environment.last_check = latest_check.checked_at
 
-    return environment
+@router.get("/environments/{environment_id}/stats", response_model=EnvironmentHealthStatsResponse)
+async def get_environment_stats(
+    environment_id: UUID,
+    start: Optional[datetime] = Query(default=None, alias="from", description="Defaults to 24 hours before to"),
+    end: Optional[datetime] = Query(default=None, alias="to", description="Defaults to now"),
+    resolution: Optional[str] = Query(default=None, pattern="^(" + "|".join(ROLLUP_RESOLUTIONS) + ")$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await check_environment_access(db, current_user, environment_id)
+
+    start, end = resolve_stats_range(to_naive_utc(start), to_naive_utc(end))
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from must be before to")
+
+    resolution, stats = await get_health_stats(db, [environment_id], start, end, resolution)
+    return EnvironmentHealthStatsResponse(
+        environment_id=environment_id,
+        resolution=resolution,
+        start=start,
+        end=end,
+        **stats[environment_id].summary()
+    )
 
 
 @router.delete("/environments/{environment_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -104,11 +118,10 @@ async def delete_environment(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(select(Environment).where(Environment.id == environment_id))
-    environment = result.scalar_one_or_none()
-
-    if not environment:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Environment not found")
-
-    await check_service_access(db, current_user, environment.service_id)
+    environment = await check_environment_access(db, current_user, environment_id)
+    await record_environment_changes(db, [environment_id], deleted=True)
     await db.delete(environment)
+    await db.commit()
+    # Only once the delete is committed, so a failed one leaves it monitored
+    scheduler.unschedule(environment_id)
+    await manager.broadcast_environments_removed([environment_id])
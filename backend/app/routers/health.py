@@ -1,42 +1,32 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
-from app.models.user import User, TeamMember, UserRole
-from app.models.environment import Environment
-from app.models.service import Service
-from app.schemas.health_check import HealthCheckResponse, HealthCheckCreate
+from app.models.user import User
+from app.schemas.health_check import (
+    HealthCheckResponse,
+    HealthCheckCreate,
+    HealthRollupResponse,
+    HealthRollupListResponse
+)
+from app.services.access_service import check_environment_access
 from app.services.auth_service import get_current_user
+from app.services.history_service import (
+    EXPORT_FORMATS,
+    decode_history_cursor,
+    encode_history_cursor,
+    stream_health_check_export
+)
 from app.services.monitor_service import perform_health_check, get_health_check_history
+from app.services.rollup_service import ROLLUP_RESOLUTIONS, get_rollups
+from app.utils.dates import to_naive_utc
 
 router = APIRouter(prefix="/api/health-checks", tags=["Health Checks"])
 
 
-async def check_environment_access(db: AsyncSession, user: User, environment_id: UUID) -> Environment:
-    result = await db.execute(select(Environment).where(Environment.id == environment_id))
-    environment = result.scalar_one_or_none()
-
-    if not environment:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Environment not found")
-
-    service_result = await db.execute(select(Service).where(Service.id == environment.service_id))
-    service = service_result.scalar_one_or_none()
-
-    if user.role != UserRole.ADMIN:
-        member_result = await db.execute(
-            select(TeamMember).where(
-                TeamMember.team_id == service.team_id,
-                TeamMember.user_id == user.id
-            )
-        )
-        if not member_result.scalar_one_or_none():
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-
-    return environment
-
-
 @router.post("/trigger", response_model=HealthCheckResponse)
 async def trigger_health_check(
     check_data: HealthCheckCreate,
@@ -51,15 +41,99 @@ async def trigger_health_check(
 @router.get("/environment/{environment_id}", response_model=List[HealthCheckResponse])
 async def get_environment_health_history(
     environment_id: UUID,
-    limit: int = Query(default=100, le=500),
+    request: Request,
+    response: Response,
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor value from the previous page"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     await check_environment_access(db, current_user, environment_id)
-    history = await get_health_check_history(db, environment_id, limit)
+
+    before = None
+    if cursor:
+        try:
+            before = decode_history_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    history = await get_health_check_history(db, environment_id, limit, before)
+
+    if len(history) == limit:
+        last = history[-1]
+        next_cursor = encode_history_cursor(last.checked_at, last.id)
+        response.headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor, limit=limit)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
     return history
 
 
+@router.get("/environment/{environment_id}/export")
+async def export_environment_health_history(
+    environment_id: UUID,
+    format: str = Query(default="ndjson", pattern="^(" + "|".join(EXPORT_FORMATS) + ")$"),
+    start: Optional[datetime] = Query(default=None),
+    end: Optional[datetime] = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await check_environment_access(db, current_user, environment_id)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"health-checks-{environment_id}.{format}"
+    return StreamingResponse(
+        stream_health_check_export(environment_id, format, to_naive_utc(start), to_naive_utc(end)),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/environment/{environment_id}/rollups", response_model=HealthRollupListResponse)
+async def get_environment_health_rollups(
+    environment_id: UUID,
+    start: Optional[datetime] = Query(default=None, description="Defaults to 24 hours before end"),
+    end: Optional[datetime] = Query(default=None, description="Defaults to now"),
+    resolution: Optional[str] = Query(default=None, pattern="^(" + "|".join(ROLLUP_RESOLUTIONS) + ")$"),
+    max_points: int = Query(default=200, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await check_environment_access(db, current_user, environment_id)
+
+    end = to_naive_utc(end) or datetime.utcnow()
+    start = to_naive_utc(start) or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+
+    resolution, rollups = await get_rollups(db, environment_id, start, end, resolution, max_points)
+
+    buckets = []
+    for rollup in rollups:
+        total = rollup.healthy_count + rollup.degraded_count + rollup.down_count + rollup.unknown_count
+        buckets.append(HealthRollupResponse(
+            bucket_start=rollup.bucket_start,
+            healthy_count=rollup.healthy_count,
+            degraded_count=rollup.degraded_count,
+            down_count=rollup.down_count,
+            unknown_count=rollup.unknown_count,
+            error_count=rollup.error_count,
+            total_count=total,
+            response_time_min=rollup.response_time_min,
+            response_time_avg=rollup.response_time_sum / rollup.response_count if rollup.response_count else None,
+            response_time_max=rollup.response_time_max
+        ))
+
+    return HealthRollupListResponse(
+        environment_id=environment_id,
+        resolution=resolution,
+        bucket_seconds=ROLLUP_RESOLUTIONS[resolution],
+        start=start,
+        end=end,
+        buckets=buckets
+    )
+
+
 @router.get("/latest/{environment_id}", response_model=HealthCheckResponse)
 async def get_latest_health(
     environment_id: UUID,
@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import registry
+from app.services.access_service import membership_cache
+from app.services.ingestion import ingestor
+from app.services.password_hasher import password_hasher
+from app.services.response_cache import service_list_cache
+from app.services.scheduler import scheduler
+from app.services.sharding import membership
+from app.services.user_cache import user_cache
+from app.websocket import manager
+
+router = APIRouter(tags=["Metrics"])
+
+
+def _runtime_metrics():
+    """Counters and gauges the services already keep, sampled at scrape time"""
+    ws = manager.stats()
+    yield "websocket_connections", "gauge", "Open WebSocket connections on this worker", [({}, ws["connections"])]
+    yield "websocket_subscriptions", "gauge", "WebSocket subscriptions on this worker by kind", [
+        ({"kind": "service"}, sum(len(sockets) for sockets in manager.service_connections.values())),
+        ({"kind": "environment"}, sum(len(sockets) for sockets in manager.environment_connections.values())),
+    ]
+    yield "websocket_queued_messages", "gauge", "Frames waiting in per-connection send queues", [({}, ws["queued_messages"])]
+    yield "websocket_messages_sent_total", "counter", "Frames written to WebSocket clients", [({}, ws["messages_sent"])]
+    yield "websocket_messages_dropped_total", "counter", "Frames dropped for slow WebSocket clients", [({}, ws["messages_dropped"])]
+    yield "websocket_slow_consumer_disconnects_total", "counter", "Clients disconnected for falling behind", [
+        ({}, ws["slow_consumer_disconnects"])
+    ]
+    yield "websocket_replay_topics", "gauge", "Services and environments with a replay buffer", [({}, ws["replay_topics"])]
+
+    yield "health_checks_run_total", "counter", "Scheduled health checks completed by this worker", [({}, scheduler.checks_run)]
+    yield "health_check_overruns_total", "counter", "Check slots skipped because the schedule fell behind", [
+        ({}, scheduler.overrun_count)
+    ]
+    yield "health_checks_scheduled", "gauge", "Environments on this worker's schedule", [({}, len(scheduler))]
+    yield "scheduler_workers", "gauge", "Live workers sharing health check execution", [({}, len(membership.workers))]
+    yield "scheduler_rebalances_total", "counter", "Changes to the scheduler worker membership", [({}, membership.rebalances)]
+
+    yield "ingest_pending_rows", "gauge", "Health check rows buffered for the next write", [({}, ingestor.pending)]
+    yield "ingest_rows_written_total", "counter", "Health check rows written by the ingestor", [({}, ingestor.rows_written)]
+    yield "ingest_rows_dropped_total", "counter", "Health check rows dropped after repeated write failures", [
+        ({}, ingestor.rows_dropped)
+    ]
+    yield "ingest_rows_discarded_total", "counter", "Health check rows of environments deleted before the write", [
+        ({}, ingestor.rows_discarded)
+    ]
+    yield "ingest_batches_written_total", "counter", "Batches written by the ingestor", [({}, ingestor.batches_written)]
+
+    yield "cache_requests_total", "counter", "Lookups in in-process caches by result", [
+        ({"cache": "auth_user", "result": "hit"}, user_cache.hits),
+        ({"cache": "auth_user", "result": "miss"}, user_cache.misses),
+        ({"cache": "team_membership", "result": "hit"}, membership_cache.hits),
+        ({"cache": "team_membership", "result": "miss"}, membership_cache.misses),
+        ({"cache": "service_list", "result": "hit"}, service_list_cache.hits),
+        ({"cache": "service_list", "result": "miss"}, service_list_cache.misses),
+    ]
+
+    hasher = password_hasher.stats()
+    yield "password_hash_pending", "gauge", "Password hashes running or queued", [({}, hasher["pending"])]
+    yield "password_hash_total", "counter", "Password hashes by outcome", [
+        ({"result": "completed"}, hasher["completed"]),
+        ({"result": "rejected"}, hasher["rejected"]),
+    ]
+    yield "password_hash_seconds_total", "counter", "Time spent hashing passwords", [({}, hasher["hash_seconds_total"])]
+    yield "password_hash_wait_seconds_total", "counter", "Time password hashes spent queued for a thread", [
+        ({}, hasher["wait_seconds_total"])
+    ]
+    yield "password_hash_seconds_max", "gauge", "Slowest password hash since startup", [({}, hasher["hash_seconds_max"])]
+
+
+registry.add_collector(_runtime_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
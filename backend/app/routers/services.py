@@ -1,42 +1,52 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from app.database import get_db
-from app.models.user import User, TeamMember, UserRole
+from app.models.user import User
 from app.models.service import Service
+from app.models.environment import Environment
+from app.schemas.health_check import EnvironmentHealthStatsResponse, ServiceHealthStatsResponse
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse, ServiceListResponse
+from app.services.access_service import check_team_access
 from app.services.auth_service import get_current_user
 from app.services.monitor_service import get_services_with_status
+from app.services.response_cache import etag_matches, service_list_cache
+from app.services.rollup_service import ROLLUP_RESOLUTIONS
+from app.services.scheduler import scheduler
+from app.services.stats_service import HealthStats, get_health_stats, resolve_stats_range
+from app.services.sync_service import record_service_change
+from app.utils.dates import to_naive_utc
+from app.websocket import manager
 
 router = APIRouter(prefix="/api/services", tags=["Services"])
 
 
-async def check_team_access(db: AsyncSession, user: User, team_id: UUID) -> bool:
-    if user.role == UserRole.ADMIN:
-        return True
-    result = await db.execute(
-        select(TeamMember).where(
-            TeamMember.team_id == team_id,
-            TeamMember.user_id == user.id
-        )
-    )
-    return result.scalar_one_or_none() is not None
-
-
 @router.get("", response_model=ServiceListResponse)
 async def list_services(
     team_id: Optional[UUID] = Query(None),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     if team_id and not await check_team_access(db, current_user, team_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-    services = await get_services_with_status(db, team_id)
-    return ServiceListResponse(services=services, total=len(services))
+    async def build():
+        services = await get_services_with_status(db, team_id)
+        body = ServiceListResponse(services=services, total=len(services)).model_dump_json().encode()
+        return body, [service.id for service in services]
+
+    # Access is checked above; the listing itself is the same for everyone
+    # who may see the scope, so it is cached per scope, not per user
+    cached = await service_list_cache.get_or_build(team_id, build)
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
@@ -56,6 +66,7 @@ async def create_service(
     )
     db.add(service)
     await db.flush()
+    await record_service_change(db, service.id, service.team_id)
 
     # Reload with environments relationship to avoid async lazy loading issue
     result = await db.execute(
@@ -88,6 +99,54 @@ async def get_service(
     return service
 
 
+@router.get("/{service_id}/stats", response_model=ServiceHealthStatsResponse)
+async def get_service_stats(
+    service_id: UUID,
+    start: Optional[datetime] = Query(default=None, alias="from", description="Defaults to 24 hours before to"),
+    end: Optional[datetime] = Query(default=None, alias="to", description="Defaults to now"),
+    resolution: Optional[str] = Query(default=None, pattern="^(" + "|".join(ROLLUP_RESOLUTIONS) + ")$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(select(Service).where(Service.id == service_id))
+    service = result.scalar_one_or_none()
+
+    if not service:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
+
+    if not await check_team_access(db, current_user, service.team_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+    start, end = resolve_stats_range(to_naive_utc(start), to_naive_utc(end))
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="from must be before to")
+
+    env_result = await db.execute(select(Environment.id).where(Environment.service_id == service_id))
+    environment_ids = list(env_result.scalars().all())
+    resolution, stats = await get_health_stats(db, environment_ids, start, end, resolution)
+
+    combined = HealthStats()
+    environments = []
+    for environment_id in environment_ids:
+        combined.merge(stats[environment_id])
+        environments.append(EnvironmentHealthStatsResponse(
+            environment_id=environment_id,
+            resolution=resolution,
+            start=start,
+            end=end,
+            **stats[environment_id].summary()
+        ))
+
+    return ServiceHealthStatsResponse(
+        service_id=service_id,
+        resolution=resolution,
+        start=start,
+        end=end,
+        environments=environments,
+        **combined.summary()
+    )
+
+
 @router.put("/{service_id}", response_model=ServiceResponse)
 async def update_service(
     service_id: UUID,
@@ -112,6 +171,7 @@ async def update_service(
         service.url = service_data.url
 
     await db.flush()
+    await record_service_change(db, service.id, service.team_id)
 
     # Reload with environments relationship to avoid async lazy loading issue
     result = await db.execute(
@@ -137,4 +197,11 @@ async def delete_service(
     if not await check_team_access(db, current_user, service.team_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
+    result = await db.execute(select(Environment.id).where(Environment.service_id == service_id))
+    environment_ids = list(result.scalars().all())
+    await record_service_change(db, service.id, service.team_id, deleted=True)
     await db.delete(service)
+    await db.commit()
+    # Only once the delete is committed, so a failed one leaves them monitored
+    scheduler.unschedule_service(service_id)
+    await manager.broadcast_environments_removed(environment_ids)
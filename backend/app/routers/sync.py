@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.models.user import User, UserRole
+from app.schemas.sync import SyncDeletedResponse, SyncResponse, SyncStatusResponse
+from app.services.access_service import get_team_ids
+from app.services.auth_service import get_current_user
+from app.services.sync_service import CursorExpired, get_changes, get_snapshot, scope_token
+
+router = APIRouter(prefix="/api/sync", tags=["Sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    since: Optional[int] = Query(None, ge=0, description="Cursor from the previous response; omit for a snapshot"),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    team_ids = None if current_user.role == UserRole.ADMIN else await get_team_ids(db, current_user.id)
+
+    if since is None:
+        result = await get_snapshot(db, team_ids)
+    else:
+        try:
+            result = await get_changes(db, team_ids, since, limit)
+        except CursorExpired:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Cursor expired, resync without since")
+
+    return SyncResponse(
+        cursor=result["cursor"],
+        scope=scope_token(team_ids),
+        full=since is None,
+        has_more=result["has_more"],
+        services=result["services"],
+        environments=result["environments"],
+        statuses=[
+            SyncStatusResponse(
+                environment_id=environment.id,
+                service_id=environment.service_id,
+                current_status=environment.current_status,
+                last_check=environment.last_check
+            )
+            for environment in result["statuses"]
+        ],
+        deleted=SyncDeletedResponse(
+            services=result["deleted_services"],
+            environments=result["deleted_environments"]
+        )
+    )
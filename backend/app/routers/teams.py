@@ -6,7 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User, Team, TeamMember, UserRole
 from app.schemas.user import TeamCreate, TeamResponse
+from app.services.access_service import check_team_access
 from app.services.auth_service import get_current_user
+from app.services.sync_service import record_team_services_deleted
 
 router = APIRouter(prefix="/api/teams", tags=["Teams"])
 
@@ -59,15 +61,8 @@ async def get_team(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
 
     # Check access
-    if current_user.role != UserRole.ADMIN:
-        member_result = await db.execute(
-            select(TeamMember).where(
-                TeamMember.team_id == team_id,
-                TeamMember.user_id == current_user.id
-            )
-        )
-        if not member_result.scalar_one_or_none():
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    if not await check_team_access(db, current_user, team_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
     return team
 
@@ -96,4 +91,5 @@ async def delete_team(
         if not member_result.scalar_one_or_none():
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
 
+    await record_team_services_deleted(db, team_id)
     await db.delete(team)
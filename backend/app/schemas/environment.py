@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from app.models.environment import EnvironmentType
 from app.models.health_check import HealthStatus
 
@@ -9,6 +9,18 @@ from app.models.health_check import HealthStatus
 class EnvironmentCreate(BaseModel):
     name: EnvironmentType
     url: str
+    check_interval_seconds: Optional[int] = Field(default=None, ge=10, le=86400)
+    timeout_seconds: Optional[int] = Field(default=None, ge=1, le=60)
+
+    @model_validator(mode="after")
+    def timeout_within_interval(self):
+        if (
+            self.check_interval_seconds is not None
+            and self.timeout_seconds is not None
+            and self.timeout_seconds >= self.check_interval_seconds
+        ):
+            raise ValueError("timeout_seconds must be shorter than check_interval_seconds")
+        return self
 
 
 class EnvironmentResponse(BaseModel):
@@ -16,6 +28,8 @@ class EnvironmentResponse(BaseModel):
     name: EnvironmentType
     url: str
     service_id: UUID
+    check_interval_seconds: int
+    timeout_seconds: int
     created_at: datetime
     current_status: Optional[HealthStatus] = None
     last_check: Optional[datetime] = None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from pydantic import BaseModel
 from app.models.health_check import HealthStatus
@@ -16,6 +16,7 @@ class HealthCheckResponse(BaseModel):
     response_time_ms: Optional[int]
     status_code: Optional[int]
     error_message: Optional[str]
+    connect_time_ms: Optional[int] = None
     checked_at: datetime
 
     class Config:
@@ -25,3 +26,53 @@ class HealthCheckResponse(BaseModel):
 class HealthCheckListResponse(BaseModel):
     health_checks: List[HealthCheckResponse]
     total: int
+
+
+class HealthRollupResponse(BaseModel):
+    bucket_start: datetime
+    healthy_count: int
+    degraded_count: int
+    down_count: int
+    unknown_count: int
+    error_count: int
+    total_count: int
+    response_time_min: Optional[int]
+    response_time_avg: Optional[float]
+    response_time_max: Optional[int]
+
+
+class HealthRollupListResponse(BaseModel):
+    environment_id: UUID
+    resolution: str
+    bucket_seconds: int
+    start: datetime
+    end: datetime
+    buckets: List[HealthRollupResponse]
+
+
+class HealthStatsResponse(BaseModel):
+    total_checks: int
+    uptime_percent: Optional[float]
+    check_counts: Dict[HealthStatus, int]
+    time_in_status_seconds: Dict[HealthStatus, float]
+    response_time_min: Optional[int]
+    response_time_avg: Optional[float]
+    response_time_max: Optional[int]
+    response_time_p50: Optional[float]
+    response_time_p95: Optional[float]
+    response_time_p99: Optional[float]
+
+
+class EnvironmentHealthStatsResponse(HealthStatsResponse):
+    environment_id: UUID
+    resolution: str
+    start: datetime
+    end: datetime
+
+
+class ServiceHealthStatsResponse(HealthStatsResponse):
+    service_id: UUID
+    resolution: str
+    start: datetime
+    end: datetime
+    environments: List[EnvironmentHealthStatsResponse]
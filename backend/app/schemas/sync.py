@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+from app.models.health_check import HealthStatus
+from app.schemas.environment import EnvironmentResponse
+
+
+class SyncServiceResponse(BaseModel):
+    id: UUID
+    name: str
+    description: Optional[str]
+    url: Optional[str]
+    team_id: UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SyncStatusResponse(BaseModel):
+    environment_id: UUID
+    service_id: UUID
+    current_status: Optional[HealthStatus] = None
+    last_check: Optional[datetime] = None
+
+
+class SyncDeletedResponse(BaseModel):
+    # Deleting a service also removes its environments
+    services: List[UUID] = []
+    environments: List[UUID] = []
+
+
+class SyncResponse(BaseModel):
+    cursor: int
+    # Changes whenever the caller joins or leaves a team; sync from a new snapshot then
+    scope: str
+    full: bool
+    has_more: bool
+    services: List[SyncServiceResponse]
+    environments: List[EnvironmentResponse]
+    statuses: List[SyncStatusResponse]
+    deleted: SyncDeletedResponse
@@ -0,0 +1,145 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.environment import Environment
+from app.models.service import Service
+from app.models.user import Team, TeamMember, UserRole
+
+settings = get_settings()
+
+
+class TeamMembershipCache:
+    """Bounded LRU of user id -> ids of the teams they belong to.
+
+    Entries expire after ``ttl_seconds`` and are dropped as soon as a
+    change to one of the user's ``TeamMember`` rows is committed in this
+    process; deleting a team clears the whole cache since its memberships
+    go with it in the database.
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: float):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[UUID, tuple[frozenset, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: UUID) -> Optional[frozenset]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            team_ids, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return team_ids
+            del self._entries[user_id]
+        self.misses += 1
+        return None
+
+    def put(self, user_id: UUID, team_ids: frozenset):
+        self._entries[user_id] = (team_ids, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: UUID):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+membership_cache = TeamMembershipCache(
+    max_users=settings.team_membership_cache_max_users,
+    ttl_seconds=settings.team_membership_cache_ttl_seconds
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_membership_changes(session: Session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, TeamMember):
+            session.info.setdefault("changed_member_ids", set()).add(instance.user_id)
+    if any(isinstance(instance, Team) for instance in session.deleted):
+        session.info["team_deleted"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    # Only after commit: evicting at flush would let a concurrent request
+    # re-cache a removed member's access for the full TTL
+    changed = session.info.pop("changed_member_ids", ())
+    if session.info.pop("team_deleted", False):
+        membership_cache.clear()
+        return
+    for user_id in changed:
+        membership_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session):
+    session.info.pop("changed_member_ids", None)
+    session.info.pop("team_deleted", None)
+
+
+async def get_team_ids(db: AsyncSession, user_id: UUID) -> frozenset:
+    """Ids of every team the user belongs to, from the cache or one query"""
+    team_ids = membership_cache.get(user_id)
+    if team_ids is None:
+        result = await db.execute(select(TeamMember.team_id).where(TeamMember.user_id == user_id))
+        team_ids = frozenset(result.scalars().all())
+        membership_cache.put(user_id, team_ids)
+    return team_ids
+
+
+async def check_team_access(db: AsyncSession, user, team_id: UUID) -> bool:
+    if user.role == UserRole.ADMIN:
+        return True
+    return team_id in await get_team_ids(db, user.id)
+
+
+async def check_service_access(db: AsyncSession, user, service_id: UUID) -> Service:
+    """Load a service the user may access, raising 404/403 otherwise"""
+    result = await db.execute(select(Service).where(Service.id == service_id))
+    service = result.scalar_one_or_none()
+
+    if not service:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
+
+    if not await check_team_access(db, user, service.team_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+    return service
+
+
+async def check_environment_access(db: AsyncSession, user, environment_id: UUID) -> Environment:
+    """Load an environment the user may access, raising 404/403 otherwise.
+
+    The owning team comes back with the environment in one joined query,
+    and membership is answered from the cache when possible.
+    """
+    result = await db.execute(
+        select(Environment, Service.team_id)
+        .join(Service, Service.id == Environment.service_id)
+        .where(Environment.id == environment_id)
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Environment not found")
+
+    environment, team_id = row
+    if not await check_team_access(db, user, team_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+    return environment
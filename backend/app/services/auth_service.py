@@ -6,11 +6,21 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.database import get_db
 from app.models.user import User
-from app.utils.security import verify_password, get_password_hash, decode_token
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
+from app.services.user_cache import UserSnapshot, user_cache
+from app.utils.security import decode_token
 
 security = HTTPBearer()
 
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, try again shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
@@ -25,13 +35,19 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
-        return None
+    try:
+        if not await password_hasher.verify(password, user.password_hash):
+            return None
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     return user
 
 
 async def create_user(db: AsyncSession, email: str, password: str, full_name: Optional[str] = None) -> User:
-    hashed_password = get_password_hash(password)
+    try:
+        hashed_password = await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
     user = User(email=email, password_hash=hashed_password, full_name=full_name)
     db.add(user)
     await db.flush()
@@ -42,8 +58,12 @@ async def create_user(db: AsyncSession, email: str, password: str, full_name: Op
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> UserSnapshot:
     token = credentials.credentials
+    cached = user_cache.get(token)
+    if cached is not None:
+        return cached
+
     payload = decode_token(token)
 
     if payload is None:
@@ -66,4 +86,6 @@ async def get_current_user(
             detail="User not found"
         )
 
-    return user
+    snapshot = UserSnapshot.from_user(user)
+    user_cache.put(token, snapshot, payload.get("exp"))
+    return snapshot
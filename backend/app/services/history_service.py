@@ -0,0 +1,101 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
+from sqlalchemy import select
+
+from app.database import async_session_maker
+from app.models.health_check import HealthCheck
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+EXPORT_COLUMNS = (
+    "id",
+    "environment_id",
+    "status",
+    "response_time_ms",
+    "connect_time_ms",
+    "status_code",
+    "error_message",
+    "checked_at",
+)
+
+
+def encode_history_cursor(checked_at: datetime, health_check_id: UUID) -> str:
+    """Opaque cursor pointing just past ``(checked_at, id)`` in newest-first order"""
+    raw = f"{checked_at.isoformat()}|{health_check_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Inverse of ``encode_history_cursor``; raises ValueError on malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        checked_at, health_check_id = raw.split("|", 1)
+        return datetime.fromisoformat(checked_at), UUID(health_check_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def health_check_export_query(environment_id: UUID, start: Optional[datetime], end: Optional[datetime]):
+    query = select(HealthCheck).where(HealthCheck.environment_id == environment_id)
+    if start is not None:
+        query = query.where(HealthCheck.checked_at >= start)
+    if end is not None:
+        query = query.where(HealthCheck.checked_at < end)
+    return query.order_by(HealthCheck.checked_at, HealthCheck.id)
+
+
+def _export_record(check: HealthCheck) -> dict:
+    return {
+        "id": str(check.id),
+        "environment_id": str(check.environment_id),
+        "status": check.status.value,
+        "response_time_ms": check.response_time_ms,
+        "connect_time_ms": check.connect_time_ms,
+        "status_code": check.status_code,
+        "error_message": check.error_message,
+        "checked_at": check.checked_at.isoformat(),
+    }
+
+
+async def stream_health_check_export(
+    environment_id: UUID,
+    export_format: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    yield_per: int = 1000
+) -> AsyncIterator[str]:
+    """Yield an environment's health checks, oldest first, as NDJSON lines or CSV rows.
+
+    Rows come off a server-side cursor ``yield_per`` at a time and are
+    serialized one by one, so memory stays flat regardless of the range.
+    The export owns its session because it outlives the request handler.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+
+        def serialize(record: Optional[dict]) -> str:
+            if record is None:
+                writer.writeheader()
+            else:
+                writer.writerow(record)
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return line
+
+        yield serialize(None)
+    else:
+        def serialize(record: dict) -> str:
+            return json.dumps(record) + "\n"
+
+    query = health_check_export_query(environment_id, start, end).execution_options(yield_per=yield_per)
+    async with async_session_maker() as db:
+        checks = await db.stream_scalars(query)
+        async for check in checks:
+            yield serialize(_export_record(check))
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from typing import Optional
+from sqlalchemy import insert, select
+import structlog
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.environment import Environment
+from app.models.health_check import HealthCheck
+from app.services.rollup_service import upsert_rollups
+from app.services.status_service import cache_latest_status, upsert_latest_status
+from app.services.sync_service import STATUS, record_environment_changes, status_transitions
+from app.websocket import manager
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class HealthCheckIngestor:
+    """Write-behind buffer that persists health check results in batches.
+
+    Probers hand over fully built rows (id and checked_at assigned up
+    front) and move on; a single writer task inserts them with one
+    executemany per batch and folds the batch into the latest-status
+    projection and the time-bucketed rollups in the same transaction. Batches flush when full or when
+    the flush interval elapses. The queue is bounded, so when the database
+    falls behind ``submit`` blocks and the probers slow down instead of
+    memory growing. ``stop`` drains whatever is still queued before
+    returning.
+    """
+
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int, max_retries: int = 5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.rows_written = 0
+        self.rows_dropped = 0
+        # Results of environments deleted before their row was written
+        self.rows_discarded = 0
+        self.batches_written = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # A None sentinel tells the writer to flush everything and exit
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, row: dict):
+        """Queue a health check row, waiting for room if the buffer is full"""
+        if self._queue is None:
+            raise RuntimeError("Health check ingestor is not running")
+        await self._queue.put(row)
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self._queue.get()
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+            if stopping:
+                # Drain anything queued behind the sentinel
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is not None:
+                        batch.append(item)
+
+            for start in range(0, len(batch), self.batch_size):
+                await self._write(batch[start:start + self.batch_size])
+
+    async def _write(self, batch: list[dict]):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                async with async_session_maker() as db:
+                    rows, service_ids = await self._live_rows(db, batch)
+                    latest = []
+                    if rows:
+                        await db.execute(insert(HealthCheck), rows)
+                        changed = await status_transitions(db, rows)
+                        latest = await upsert_latest_status(db, rows)
+                        await upsert_rollups(db, rows)
+                        await record_environment_changes(db, changed, entity=STATUS)
+                        await db.commit()
+            except Exception as e:
+                logger.warning("Health check batch write failed", rows=len(batch), attempt=attempt, error=str(e))
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 10))
+                continue
+
+            cache_latest_status(latest)
+            self.rows_written += len(rows)
+            self.rows_discarded += len(batch) - len(rows)
+            self.batches_written += 1
+            try:
+                await manager.publish_committed_statuses(latest, service_ids)
+            except Exception as e:
+                logger.warning("Publishing committed statuses failed", rows=len(latest), error=str(e))
+            return
+
+        self.rows_dropped += len(batch)
+        logger.error("Dropping health check batch after repeated failures", rows=len(batch))
+
+    @staticmethod
+    async def _live_rows(db, batch: list[dict]) -> tuple[list[dict], dict]:
+        """Rows whose environment still exists, and the service of each such environment.
+
+        An environment deleted while its probe was in flight would otherwise
+        fail the whole batch on the foreign key. Checked on every attempt,
+        so a delete racing this one is caught by the retry.
+        """
+        environment_ids = {row["environment_id"] for row in batch}
+        result = await db.execute(
+            select(Environment.id, Environment.service_id).where(Environment.id.in_(environment_ids))
+        )
+        service_ids = dict(result.all())
+        return [row for row in batch if row["environment_id"] in service_ids], service_ids
+
+
+ingestor = HealthCheckIngestor(
+    batch_size=settings.ingest_batch_size,
+    flush_interval=settings.ingest_flush_interval_seconds,
+    max_pending=settings.ingest_max_pending
+)
@@ -1,40 +1,107 @@
-import asyncio
+import time
+import uuid
 from datetime import datetime
-from typing import Optional
+from typing import NamedTuple, Optional
 from uuid import UUID
 import httpx
-from sqlalchemy import select, desc
+from sqlalchemy import Select, select, desc, literal, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from app.models.environment import Environment
 from app.models.health_check import HealthCheck, HealthStatus
 from app.models.service import Service
+from app.config import get_settings
+from app.metrics import PROBE_LATENCY
+from app.services.probe_client import probe_client
+from app.services.rollup_service import upsert_rollups
+from app.services.status_service import attach_latest_status, cache_latest_status_on_commit, upsert_latest_status
+from app.services.sync_service import STATUS, record_environment_changes, status_transitions
+
+settings = get_settings()
+
+
+class ProbeResult(NamedTuple):
+    status: HealthStatus
+    response_time_ms: int
+    status_code: Optional[int]
+    error_message: Optional[str]
+    # Only set in "split" latency mode: time spent opening new connections
+    # (TCP connect and TLS handshake), zero when a pooled connection was reused
+    connect_time_ms: Optional[int] = None
+
+
+class _ConnectTimer:
+    """httpx trace hook that measures time spent establishing connections"""
+
+    def __init__(self):
+        self.connect_seconds = 0.0
+        self._started: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.started":
+            self._started = time.perf_counter()
+        elif self._started is not None and event_name in (
+            "connection.connect_tcp.failed",
+            "connection.start_tls.complete",
+            "connection.start_tls.failed",
+            "http11.send_request_headers.started",
+            "http2.send_connection_init.started",
+        ):
+            self.connect_seconds += time.perf_counter() - self._started
+            self._started = None
+
+
+async def check_endpoint_health(url: str, timeout: float = 10.0) -> ProbeResult:
+    """Check health of an endpoint using the shared probe client"""
+    try:
+        if not probe_client.started:
+            # Outside the app lifespan (scripts, tests) fall back to a one-off client
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                return await _probe(client, url, timeout)
+
+        async with probe_client.host_limit(url):
+            return await _probe(probe_client.client, url, timeout)
+    except httpx.InvalidURL as e:
+        return ProbeResult(HealthStatus.DOWN, 0, None, f"Invalid URL: {e}")
+
 
+async def _probe(client: httpx.AsyncClient, url: str, timeout: float) -> ProbeResult:
+    split_latency = settings.probe_latency_mode == "split"
+    connect_timer = _ConnectTimer() if split_latency else None
+    extensions = {"trace": connect_timer} if connect_timer else None
 
-async def check_endpoint_health(url: str, timeout: float = 10.0) -> tuple[HealthStatus, int, Optional[int], Optional[str]]:
-    """Check health of an endpoint and return status, response_time_ms, status_code, error_message"""
-    start_time = datetime.utcnow()
+    def elapsed_ms() -> tuple[int, Optional[int]]:
+        total_ms = int((time.perf_counter() - start_time) * 1000)
+        if connect_timer is None:
+            return total_ms, None
+        connect_ms = int(connect_timer.connect_seconds * 1000)
+        return total_ms - connect_ms, connect_ms
+
+    start_time = time.perf_counter()
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=timeout, follow_redirects=True)
-            response_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
-
-            if response.status_code >= 500:
-                return HealthStatus.DOWN, response_time_ms, response.status_code, f"Server error: {response.status_code}"
-            elif response.status_code >= 400:
-                return HealthStatus.DEGRADED, response_time_ms, response.status_code, f"Client error: {response.status_code}"
-            elif response_time_ms > 5000:
-                return HealthStatus.DEGRADED, response_time_ms, response.status_code, "Slow response time"
-            else:
-                return HealthStatus.HEALTHY, response_time_ms, response.status_code, None
+        response = await client.get(url, timeout=timeout, extensions=extensions)
+        response_time_ms, connect_time_ms = elapsed_ms()
+
+        if response.status_code >= 500:
+            return ProbeResult(HealthStatus.DOWN, response_time_ms, response.status_code, f"Server error: {response.status_code}", connect_time_ms)
+        elif response.status_code >= 400:
+            return ProbeResult(HealthStatus.DEGRADED, response_time_ms, response.status_code, f"Client error: {response.status_code}", connect_time_ms)
+        elif response_time_ms > 5000:
+            return ProbeResult(HealthStatus.DEGRADED, response_time_ms, response.status_code, "Slow response time", connect_time_ms)
+        else:
+            return ProbeResult(HealthStatus.HEALTHY, response_time_ms, response.status_code, None, connect_time_ms)
 
     except httpx.TimeoutException:
-        response_time_ms = int(timeout * 1000)
-        return HealthStatus.DOWN, response_time_ms, None, "Request timed out"
+        response_time_ms, connect_time_ms = int(timeout * 1000), None
+        if connect_timer is not None:
+            # Keep what the handshake took, so a slow connect and a slow response stay distinguishable
+            connect_time_ms = int(connect_timer.connect_seconds * 1000)
+            response_time_ms -= connect_time_ms
+        return ProbeResult(HealthStatus.DOWN, response_time_ms, None, "Request timed out", connect_time_ms)
     except httpx.RequestError as e:
-        response_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
-        return HealthStatus.DOWN, response_time_ms, None, str(e)
+        response_time_ms, connect_time_ms = elapsed_ms()
+        return ProbeResult(HealthStatus.DOWN, response_time_ms, None, str(e), connect_time_ms)
 
 
 async def perform_health_check(db: AsyncSession, environment_id: UUID) -> HealthCheck:
@@ -45,46 +112,82 @@ async def perform_health_check(db: AsyncSession, environment_id: UUID) -> Health
     if not environment:
         raise ValueError(f"Environment {environment_id} not found")
 
-    status, response_time_ms, status_code, error_message = await check_endpoint_health(environment.url)
+    probe = await check_endpoint_health(environment.url, timeout=environment.timeout_seconds)
+    if probe.response_time_ms is not None:
+        PROBE_LATENCY.observe(probe.response_time_ms / 1000, probe.status.value)
+
+    return await save_health_check(db, environment_id, probe)
 
-    health_check = HealthCheck(
-        environment_id=environment_id,
-        status=status,
-        response_time_ms=response_time_ms,
-        status_code=status_code,
-        error_message=error_message
-    )
+
+def build_health_check_row(environment_id: UUID, probe: ProbeResult) -> dict:
+    """Column values for a new health check row, with id and timestamp assigned client-side"""
+    return {
+        "id": uuid.uuid4(),
+        "environment_id": environment_id,
+        "status": probe.status,
+        "response_time_ms": probe.response_time_ms,
+        "status_code": probe.status_code,
+        "error_message": probe.error_message,
+        "connect_time_ms": probe.connect_time_ms,
+        "checked_at": datetime.utcnow(),
+    }
+
+
+async def save_health_check(db: AsyncSession, environment_id: UUID, probe: ProbeResult) -> HealthCheck:
+    """Persist the result of a health check probe; the status cache sees it once the caller commits"""
+    row = build_health_check_row(environment_id, probe)
+    health_check = HealthCheck(**row)
 
     db.add(health_check)
     await db.flush()
-    await db.refresh(health_check)
+    changed = await status_transitions(db, [row])
+    latest = await upsert_latest_status(db, [row])
+    await record_environment_changes(db, changed, entity=STATUS)
+    cache_latest_status_on_commit(db, latest)
+    await upsert_rollups(db, [row])
 
     return health_check
 
 
-async def get_latest_health_check(db: AsyncSession, environment_id: UUID) -> Optional[HealthCheck]:
-    """Get the most recent health check for an environment"""
-    result = await db.execute(
+def latest_health_check_query(environment_id: UUID) -> Select:
+    return (
         select(HealthCheck)
         .where(HealthCheck.environment_id == environment_id)
         .order_by(desc(HealthCheck.checked_at))
         .limit(1)
     )
+
+
+def health_check_history_query(
+    environment_id: UUID,
+    limit: int,
+    before: Optional[tuple[datetime, UUID]] = None
+) -> Select:
+    """Newest-first history page; ``before`` is the (checked_at, id) keyset of the last row seen"""
+    query = select(HealthCheck).where(HealthCheck.environment_id == environment_id)
+    if before is not None:
+        checked_at, health_check_id = before
+        query = query.where(
+            tuple_(HealthCheck.checked_at, HealthCheck.id)
+            < tuple_(literal(checked_at, HealthCheck.checked_at.type), literal(health_check_id, HealthCheck.id.type))
+        )
+    return query.order_by(desc(HealthCheck.checked_at), desc(HealthCheck.id)).limit(limit)
+
+
+async def get_latest_health_check(db: AsyncSession, environment_id: UUID) -> Optional[HealthCheck]:
+    """Get the most recent health check for an environment"""
+    result = await db.execute(latest_health_check_query(environment_id))
     return result.scalar_one_or_none()
 
 
 async def get_health_check_history(
     db: AsyncSession,
     environment_id: UUID,
-    limit: int = 100
+    limit: int = 100,
+    before: Optional[tuple[datetime, UUID]] = None
 ) -> list[HealthCheck]:
     """Get health check history for an environment"""
-    result = await db.execute(
-        select(HealthCheck)
-        .where(HealthCheck.environment_id == environment_id)
-        .order_by(desc(HealthCheck.checked_at))
-        .limit(limit)
-    )
+    result = await db.execute(health_check_history_query(environment_id, limit, before))
     return list(result.scalars().all())
 
 
@@ -98,12 +201,6 @@ async def get_services_with_status(db: AsyncSession, team_id: Optional[UUID] = N
     result = await db.execute(query)
     services = list(result.scalars().all())
 
-    # Fetch latest health check for each environment
-    for service in services:
-        for env in service.environments:
-            latest_check = await get_latest_health_check(db, env.id)
-            if latest_check:
-                env.current_status = latest_check.status
-                env.last_check = latest_check.checked_at
+    await attach_latest_status(db, (env for service in services for env in service.environments))
 
     return services
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+import structlog
+
+from app.config import get_settings
+from app.utils.security import get_password_hash, verify_password
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing when the hashing pool is saturated"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism
+    without the pickling cost of a process pool. At most ``max_pending``
+    hashes are in flight (running or waiting for a thread); beyond that
+    ``PasswordHasherBusy`` is raised so callers can shed load instead of
+    building an unbounded backlog of 100ms+ jobs.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_seconds_total": self.wait_seconds_total,
+            "hash_seconds_total": self.hash_seconds_total,
+            "hash_seconds_max": self.hash_seconds_max,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func: Callable, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning("Password hashing saturated", pending=self.pending)
+            raise PasswordHasherBusy()
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(self._timed, func, time.perf_counter(), *args)
+        self.pending += 1
+        # A job keeps its thread after the awaiting request is cancelled, so
+        # it only stops counting towards max_pending once it has finished
+        future.add_done_callback(lambda _: self._release(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.call_soon_threadsafe(self._finished)
+        except RuntimeError:
+            # The loop is already closed; nothing is left to shed load for
+            pass
+
+    def _finished(self):
+        self.pending -= 1
+
+    def _timed(self, func: Callable, submitted: float, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            # Worker threads only ever add to these, and a lost update would
+            # merely skew a metric
+            self.completed += 1
+            self.wait_seconds_total += started - submitted
+            self.hash_seconds_total += elapsed
+            self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending
+)
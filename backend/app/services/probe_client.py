@@ -0,0 +1,142 @@
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import httpx
+import structlog
+
+from app.config import get_settings
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class ProbeClientManager:
+    """Owns the HTTP client shared by every health check probe.
+
+    One pooled ``httpx.AsyncClient`` lives for the lifetime of the app so
+    probes reuse keep-alive connections instead of paying for a new TCP
+    and TLS handshake on every check. httpx only limits connections per
+    pool, so a per-host semaphore caps how many probes hit the same
+    endpoint at once. At most ``max_tracked_hosts`` semaphores are kept;
+    the least recently used idle ones are dropped beyond that.
+    """
+
+    def __init__(
+        self,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        max_connections_per_host: int,
+        http2: bool = False,
+        max_tracked_hosts: int = 1000
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2
+        self.max_tracked_hosts = max_tracked_hosts
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: OrderedDict[str, asyncio.Semaphore] = OrderedDict()
+        # Probes holding or waiting for each host's slot; those hosts are never evicted
+        self._slot_users: dict[str, int] = {}
+
+    async def start(self):
+        if self._client is not None:
+            return
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 probes requested but the 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            http2=http2,
+            follow_redirects=True
+        )
+        logger.info(
+            "Probe client started",
+            max_connections=self.max_connections,
+            max_connections_per_host=self.max_connections_per_host,
+            http2=http2
+        )
+
+    async def stop(self):
+        if self._client is None:
+            return
+        await self._client.aclose()
+        self._client = None
+        self._host_slots.clear()
+        logger.info("Probe client stopped")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("Probe client is not started")
+        return self._client
+
+    @property
+    def started(self) -> bool:
+        return self._client is not None
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent probes against the host of ``url``.
+
+        Raises ``httpx.InvalidURL`` if ``url`` can't be parsed.
+        """
+        host = _host_of(url)
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_slots[host] = slot
+            self._evict_idle_slots()
+        else:
+            self._host_slots.move_to_end(host)
+        return slot
+
+    @asynccontextmanager
+    async def host_limit(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the probe slots of the host of ``url`` for the duration of the block"""
+        slot = self.host_slot(url)
+        host = _host_of(url)
+        self._slot_users[host] = self._slot_users.get(host, 0) + 1
+        try:
+            async with slot:
+                yield
+        finally:
+            users = self._slot_users[host] - 1
+            if users:
+                self._slot_users[host] = users
+            else:
+                del self._slot_users[host]
+
+    def _evict_idle_slots(self):
+        for host in list(self._host_slots):
+            if len(self._host_slots) <= self.max_tracked_hosts:
+                break
+            # A slot still in use must stay, or a new semaphore would let more probes through
+            if host not in self._slot_users:
+                del self._host_slots[host]
+
+
+def _host_of(url: str) -> str:
+    return httpx.URL(url).netloc.decode("ascii")
+
+
+probe_client = ProbeClientManager(
+    max_connections=settings.probe_max_connections,
+    max_keepalive_connections=settings.probe_max_keepalive_connections,
+    keepalive_expiry=settings.probe_keepalive_expiry_seconds,
+    max_connections_per_host=settings.probe_max_connections_per_host,
+    http2=settings.probe_http2,
+    max_tracked_hosts=settings.probe_max_tracked_hosts
+)
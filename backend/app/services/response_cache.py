@@ -0,0 +1,160 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.environment import Environment
+from app.models.service import Service
+from app.models.user import Team
+from app.services.status_service import status_cache
+
+settings = get_settings()
+
+# Model instances whose changes alter a service listing
+_STRUCTURAL_MODELS = (Service, Environment, Team)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "service_ids", "structure_version", "status_version", "expires_at")
+
+    def __init__(
+        self,
+        body: bytes,
+        service_ids: tuple[UUID, ...],
+        structure_version: int,
+        status_version: int,
+        expires_at: float
+    ):
+        self.body = body
+        self.etag = make_etag(body)
+        self.service_ids = service_ids
+        self.structure_version = structure_version
+        self.status_version = status_version
+        self.expires_at = expires_at
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag over the exact response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check with the weak comparison RFC 9110 prescribes for it"""
+    if not if_none_match:
+        return False
+    opaque = _opaque_tag(etag)
+    return any(tag == "*" or tag == opaque for tag in map(_opaque_tag, if_none_match.split(",")))
+
+
+class ServiceListCache:
+    """Serialized service listings keyed by team scope (``None`` for all services).
+
+    An entry is reused while nothing it depends on has changed:
+    ``structure_version`` moves whenever a commit touched a service,
+    environment or team, and the status part is checked against the
+    status cache, globally for the unscoped list and per listed service
+    for a team. Versions are read before the listing is built, so a
+    change racing the build leaves the entry already stale rather than
+    caching old data under a new version.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.structure_version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Optional[UUID], CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self):
+        self.structure_version += 1
+        self._entries.clear()
+
+    def _status_version(self, team_id: Optional[UUID], service_ids: Iterable[UUID]) -> int:
+        if team_id is None:
+            return status_cache.version
+        # Versions only grow, so the sum changes whenever any of them does
+        return status_cache.unattributed_version + sum(status_cache.service_version(sid) for sid in service_ids)
+
+    def get(self, team_id: Optional[UUID]) -> Optional[CachedResponse]:
+        entry = self._entries.get(team_id)
+        if entry is not None:
+            if (
+                entry.structure_version == self.structure_version
+                and time.monotonic() < entry.expires_at
+                and entry.status_version == self._status_version(team_id, entry.service_ids)
+            ):
+                self._entries.move_to_end(team_id)
+                self.hits += 1
+                return entry
+            del self._entries[team_id]
+        self.misses += 1
+        return None
+
+    async def get_or_build(
+        self,
+        team_id: Optional[UUID],
+        build: Callable[[], Awaitable[tuple[bytes, Iterable[UUID]]]]
+    ) -> CachedResponse:
+        """Cached listing for the scope, or ``build()`` it (returning body and listed service ids)"""
+        entry = self.get(team_id)
+        if entry is not None:
+            return entry
+
+        structure_version = self.structure_version
+        status_version = status_cache.version
+        unattributed = status_cache.unattributed_version
+        body, service_ids = await build()
+        service_ids = tuple(service_ids)
+        if team_id is not None:
+            status_version = unattributed + sum(status_cache.service_version(sid) for sid in service_ids)
+
+        entry = CachedResponse(
+            body, service_ids, structure_version, status_version, time.monotonic() + self.ttl_seconds
+        )
+        if structure_version == self.structure_version:
+            self._entries[team_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+service_list_cache = ServiceListCache(
+    ttl_seconds=settings.service_list_cache_ttl_seconds,
+    max_entries=settings.service_list_cache_max_entries
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_structural_change(session: Session, flush_context):
+    if session.info.get("service_list_changed"):
+        return
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _STRUCTURAL_MODELS):
+            session.info["service_list_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    # Only after commit: invalidating at flush would let a concurrent
+    # request cache the pre-commit state under the new version
+    if session.info.pop("service_list_changed", False):
+        service_list_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session):
+    session.info.pop("service_list_changed", None)
@@ -0,0 +1,228 @@
+import asyncio
+import re
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, select, text
+import structlog
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.change_log import ChangeLog
+from app.models.environment import Environment
+from app.models.health_check import HealthCheck, HealthCheckLatencyHistogram, HealthCheckRollup
+from app.services.rollup_service import ROLLUP_RESOLUTIONS
+from app.services.sharding import WorkerMembership, membership
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+_PARTITION_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+# Hashed onto the worker membership like an environment id; its owner runs the purges
+RETENTION_OWNER_KEY = uuid.uuid5(uuid.NAMESPACE_URL, "service-monitor/retention")
+
+
+class RetentionManager:
+    """Periodically purges health data older than its retention window.
+
+    Environments holding expired rows are found with one probe per table,
+    and only their rows are deleted, in small batches that walk the
+    ``(environment_id, checked_at)`` index oldest first, each batch in its
+    own short transaction with a pause in between, so purging never holds
+    long locks or starves check ingestion. On PostgreSQL, if
+    ``health_checks`` has been converted to a table range-partitioned on
+    ``checked_at`` and partitions are enabled, expired raw data is removed
+    by dropping whole partitions and upcoming daily partitions are created
+    ahead of time instead. With a worker ``membership`` only the worker
+    owning ``RETENTION_OWNER_KEY`` purges, so workers don't repeat each
+    other's deletes.
+    """
+
+    def __init__(
+        self,
+        raw_days: int,
+        rollup_days: dict[str, int],
+        batch_size: int,
+        batch_pause: float,
+        interval_seconds: float,
+        use_partitions: bool = False,
+        change_log_days: Optional[int] = None,
+        membership: Optional[WorkerMembership] = None
+    ):
+        self.raw_days = raw_days
+        self.rollup_days = rollup_days
+        self.batch_size = batch_size
+        self.batch_pause = batch_pause
+        self.interval_seconds = interval_seconds
+        self.use_partitions = use_partitions
+        self.change_log_days = change_log_days
+        self.membership = membership
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                if self.membership is None or self.membership.owns(RETENTION_OWNER_KEY):
+                    await self.purge()
+            except Exception as e:
+                logger.error("Retention purge failed", error=str(e))
+            await asyncio.sleep(self.interval_seconds)
+
+    async def purge(self, now: Optional[datetime] = None) -> dict:
+        """Apply every retention window once and return what was removed"""
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        report = {
+            "health_checks": 0,
+            "health_check_rollups": 0,
+            "health_check_latency_histograms": 0,
+            "change_log": 0,
+            "partitions_dropped": 0
+        }
+
+        raw_cutoff = now - timedelta(days=self.raw_days)
+
+        if self.use_partitions and await self._is_partitioned():
+            report["partitions_dropped"] = await self._drop_expired_partitions(raw_cutoff)
+            await self._create_upcoming_partitions(now)
+        else:
+            expired = [HealthCheck.checked_at < raw_cutoff]
+            for environment_id in await self._environments_with(HealthCheck, expired):
+                report["health_checks"] += await self._purge_in_batches(
+                    HealthCheck, HealthCheck.id, HealthCheck.checked_at,
+                    [HealthCheck.environment_id == environment_id, *expired]
+                )
+
+        for resolution, bucket_seconds in ROLLUP_RESOLUTIONS.items():
+            days = self.rollup_days.get(resolution)
+            if days is None:
+                continue
+            cutoff = now - timedelta(days=days)
+            for report_key, model in (
+                ("health_check_rollups", HealthCheckRollup),
+                ("health_check_latency_histograms", HealthCheckLatencyHistogram)
+            ):
+                expired = [model.bucket_seconds == bucket_seconds, model.bucket_start < cutoff]
+                for environment_id in await self._environments_with(model, expired):
+                    report[report_key] += await self._purge_in_batches(
+                        model, model.bucket_start, model.bucket_start,
+                        [model.environment_id == environment_id, *expired]
+                    )
+
+        if self.change_log_days is not None:
+            # Clients whose cursor predates this resync from a snapshot
+            report["change_log"] = await self._purge_in_batches(
+                ChangeLog, ChangeLog.seq, ChangeLog.seq,
+                [ChangeLog.changed_at < now - timedelta(days=self.change_log_days)]
+            )
+
+        report["duration_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info("Retention purge completed", **report)
+        return report
+
+    async def _environments_with(self, model, conditions: list) -> list:
+        """Environments having at least one ``model`` row matching ``conditions``.
+
+        One statement per table: the EXISTS is answered per environment from
+        the leading ``environment_id`` of the table's index, so environments
+        with nothing expired cost no delete transactions.
+        """
+        expired = select(model.environment_id).where(model.environment_id == Environment.id, *conditions).exists()
+        async with async_session_maker() as db:
+            result = await db.execute(select(Environment.id).where(expired))
+            return list(result.scalars().all())
+
+    async def _purge_in_batches(self, model, key_column, order_column, conditions: list) -> int:
+        """Delete matching rows ``batch_size`` at a time, oldest first"""
+        purged = 0
+        while True:
+            batch = (
+                select(key_column)
+                .where(*conditions)
+                .order_by(order_column)
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    delete(model).where(*conditions, key_column.in_(batch)).execution_options(synchronize_session=False)
+                )
+                await db.commit()
+
+            purged += result.rowcount
+            if result.rowcount < self.batch_size:
+                return purged
+            # Let ingestion and API traffic in between batches
+            await asyncio.sleep(self.batch_pause)
+
+    async def _is_partitioned(self) -> bool:
+        async with async_session_maker() as db:
+            if db.bind.dialect.name != "postgresql":
+                return False
+            result = await db.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = 'health_checks'"
+            ))
+            return result.scalar() is not None
+
+    async def _drop_expired_partitions(self, cutoff: datetime) -> int:
+        async with async_session_maker() as db:
+            result = await db.execute(text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = 'health_checks'"
+            ))
+            partitions = result.all()
+
+        dropped = 0
+        for name, bound in partitions:
+            match = _PARTITION_BOUND.search(bound or "")
+            if not match or datetime.fromisoformat(match.group(1)) > cutoff:
+                continue
+            async with async_session_maker() as db:
+                await db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                await db.commit()
+            dropped += 1
+            logger.info("Dropped expired health check partition", partition=name)
+        return dropped
+
+    async def _create_upcoming_partitions(self, now: datetime, days_ahead: int = 3):
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        async with async_session_maker() as db:
+            for offset in range(days_ahead + 1):
+                start = day + timedelta(days=offset)
+                end = start + timedelta(days=1)
+                await db.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "health_checks_p{start:%Y%m%d}" PARTITION OF health_checks '
+                    f"FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}') TO ('{end:%Y-%m-%d %H:%M:%S}')"
+                ))
+            await db.commit()
+
+
+retention = RetentionManager(
+    raw_days=settings.retention_raw_days,
+    rollup_days=settings.retention_rollup_days,
+    batch_size=settings.retention_batch_size,
+    batch_pause=settings.retention_batch_pause_seconds,
+    interval_seconds=settings.retention_interval_seconds,
+    use_partitions=settings.retention_use_partitions,
+    change_log_days=settings.sync_change_log_days,
+    membership=membership if settings.scheduler_sharding else None
+)
@@ -0,0 +1,247 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.health_check import HealthCheckLatencyHistogram, HealthCheckRollup, HealthStatus
+from app.utils.sql import dialect_insert
+
+settings = get_settings()
+
+# Bucket sizes maintained for every environment, finest first
+ROLLUP_RESOLUTIONS: dict[str, int] = {
+    "1m": 60,
+    "1h": 3600,
+    "1d": 86400,
+}
+
+_STATUS_COLUMNS = {
+    HealthStatus.HEALTHY: "healthy_count",
+    HealthStatus.DEGRADED: "degraded_count",
+    HealthStatus.DOWN: "down_count",
+    HealthStatus.UNKNOWN: "unknown_count",
+}
+
+# Inclusive upper bounds (ms) of the latency histogram buckets; anything
+# slower lands in the overflow bucket ``len(LATENCY_BUCKET_BOUNDS_MS)``.
+# Roughly 1-1.25-1.5-2-2.5-3-4-5-6-8 per decade keeps percentile estimates
+# within ~25% of the true value.
+LATENCY_BUCKET_BOUNDS_MS: tuple[int, ...] = (
+    1, 2, 3, 4, 5, 6, 8,
+    10, 12, 15, 20, 25, 30, 40, 50, 60, 80,
+    100, 125, 150, 200, 250, 300, 400, 500, 600, 800,
+    1000, 1250, 1500, 2000, 2500, 3000, 4000, 5000, 6000, 8000,
+    10000, 12500, 15000, 20000, 30000, 60000,
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def bucket_start(timestamp: datetime, bucket_seconds: int) -> datetime:
+    seconds = int((timestamp - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % bucket_seconds)
+
+
+def latency_bucket(response_time_ms: int) -> int:
+    return bisect_left(LATENCY_BUCKET_BOUNDS_MS, response_time_ms)
+
+
+def aggregate_rows(rows: Iterable[dict]) -> list[dict]:
+    """Fold raw health check rows into rollup deltas for every resolution"""
+    buckets: dict[tuple[UUID, int, datetime], dict] = {}
+
+    for row in rows:
+        for bucket_seconds in ROLLUP_RESOLUTIONS.values():
+            key = (row["environment_id"], bucket_seconds, bucket_start(row["checked_at"], bucket_seconds))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {
+                    "environment_id": key[0],
+                    "bucket_seconds": key[1],
+                    "bucket_start": key[2],
+                    "healthy_count": 0,
+                    "degraded_count": 0,
+                    "down_count": 0,
+                    "unknown_count": 0,
+                    "error_count": 0,
+                    "response_count": 0,
+                    "response_time_sum": 0,
+                    "response_time_min": None,
+                    "response_time_max": None,
+                }
+
+            bucket[_STATUS_COLUMNS[row["status"]]] += 1
+            if row["error_message"]:
+                bucket["error_count"] += 1
+
+            response_time_ms = row["response_time_ms"]
+            if response_time_ms is not None:
+                bucket["response_count"] += 1
+                bucket["response_time_sum"] += response_time_ms
+                if bucket["response_time_min"] is None or response_time_ms < bucket["response_time_min"]:
+                    bucket["response_time_min"] = response_time_ms
+                if bucket["response_time_max"] is None or response_time_ms > bucket["response_time_max"]:
+                    bucket["response_time_max"] = response_time_ms
+
+    return list(buckets.values())
+
+
+def aggregate_latency(rows: Iterable[dict]) -> list[dict]:
+    """Fold raw health check rows into latency histogram deltas for every resolution"""
+    counts: dict[tuple[UUID, int, datetime, int], int] = {}
+
+    for row in rows:
+        response_time_ms = row["response_time_ms"]
+        if response_time_ms is None:
+            continue
+        latency = latency_bucket(response_time_ms)
+        for bucket_seconds in ROLLUP_RESOLUTIONS.values():
+            key = (row["environment_id"], bucket_seconds, bucket_start(row["checked_at"], bucket_seconds), latency)
+            counts[key] = counts.get(key, 0) + 1
+
+    return [
+        {
+            "environment_id": environment_id,
+            "bucket_seconds": bucket_seconds,
+            "bucket_start": start,
+            "latency_bucket": latency,
+            "count": count,
+        }
+        for (environment_id, bucket_seconds, start, latency), count in counts.items()
+    ]
+
+
+async def upsert_rollups(db: AsyncSession, rows: Iterable[dict]):
+    """Add a batch of raw health check rows to the rollup tables.
+
+    Deltas are merged in SQL (counters added, min/max combined), so
+    concurrent writers and out-of-order batches never lose counts.
+    """
+    rows = list(rows)
+    deltas = aggregate_rows(rows)
+    if not deltas:
+        return
+    histogram = aggregate_latency(rows)
+
+    insert = dialect_insert(db)
+    if insert is None:
+        for delta in deltas:
+            key = (delta["environment_id"], delta["bucket_seconds"], delta["bucket_start"])
+            existing = await db.get(HealthCheckRollup, key)
+            if existing is None:
+                db.add(HealthCheckRollup(**delta))
+            else:
+                _merge_into(existing, delta)
+        for delta in histogram:
+            key = (delta["environment_id"], delta["bucket_seconds"], delta["bucket_start"], delta["latency_bucket"])
+            existing = await db.get(HealthCheckLatencyHistogram, key)
+            if existing is None:
+                db.add(HealthCheckLatencyHistogram(**delta))
+            else:
+                existing.count += delta["count"]
+        await db.flush()
+        return
+
+    if db.bind.dialect.name == "postgresql":
+        least, greatest = func.least, func.greatest
+    else:
+        # SQLite's multi-argument min()/max() are the scalar forms
+        least, greatest = func.min, func.max
+
+    table = HealthCheckRollup
+    # Keep each statement well under the driver's bind parameter limit
+    for offset in range(0, len(deltas), 1000):
+        stmt = insert(table).values(deltas[offset:offset + 1000])
+        await db.execute(_merge_on_conflict(stmt, least, greatest))
+
+    table = HealthCheckLatencyHistogram
+    for offset in range(0, len(histogram), 1000):
+        stmt = insert(table).values(histogram[offset:offset + 1000])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.environment_id, table.bucket_seconds, table.bucket_start, table.latency_bucket],
+            set_={"count": table.count + stmt.excluded.count}
+        ))
+
+
+def _merge_on_conflict(stmt, least, greatest):
+    table = HealthCheckRollup
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[table.environment_id, table.bucket_seconds, table.bucket_start],
+        set_={
+            "healthy_count": table.healthy_count + excluded.healthy_count,
+            "degraded_count": table.degraded_count + excluded.degraded_count,
+            "down_count": table.down_count + excluded.down_count,
+            "unknown_count": table.unknown_count + excluded.unknown_count,
+            "error_count": table.error_count + excluded.error_count,
+            "response_count": table.response_count + excluded.response_count,
+            "response_time_sum": table.response_time_sum + excluded.response_time_sum,
+            "response_time_min": least(
+                func.coalesce(table.response_time_min, excluded.response_time_min),
+                func.coalesce(excluded.response_time_min, table.response_time_min)
+            ),
+            "response_time_max": greatest(
+                func.coalesce(table.response_time_max, excluded.response_time_max),
+                func.coalesce(excluded.response_time_max, table.response_time_max)
+            ),
+        }
+    )
+
+
+def _merge_into(rollup: HealthCheckRollup, delta: dict):
+    for column in (
+        "healthy_count", "degraded_count", "down_count", "unknown_count",
+        "error_count", "response_count", "response_time_sum"
+    ):
+        setattr(rollup, column, getattr(rollup, column) + delta[column])
+    for column, pick in (("response_time_min", min), ("response_time_max", max)):
+        current, incoming = getattr(rollup, column), delta[column]
+        if incoming is not None:
+            setattr(rollup, column, incoming if current is None else pick(current, incoming))
+
+
+def choose_resolution(start: datetime, end: datetime, max_points: int, now: Optional[datetime] = None) -> str:
+    """Most detailed resolution whose bucket count over the range fits ``max_points``.
+
+    Resolutions whose retention window no longer covers ``start`` are
+    skipped. Falls back to the coarsest resolution when even that exceeds
+    the budget.
+    """
+    now = now or datetime.utcnow()
+    span = (end - start).total_seconds()
+    for name, bucket_seconds in ROLLUP_RESOLUTIONS.items():
+        retention_days = settings.retention_rollup_days.get(name)
+        if retention_days is not None and start < now - timedelta(days=retention_days):
+            continue
+        if span / bucket_seconds <= max_points:
+            return name
+    return next(reversed(ROLLUP_RESOLUTIONS))
+
+
+async def get_rollups(
+    db: AsyncSession,
+    environment_id: UUID,
+    start: datetime,
+    end: datetime,
+    resolution: Optional[str] = None,
+    max_points: int = 200
+) -> tuple[str, list[HealthCheckRollup]]:
+    """Rollup buckets overlapping ``[start, end)`` for an environment, oldest first"""
+    if resolution is None:
+        resolution = choose_resolution(start, end, max_points)
+    bucket_seconds = ROLLUP_RESOLUTIONS[resolution]
+
+    result = await db.execute(
+        select(HealthCheckRollup)
+        .where(
+            HealthCheckRollup.environment_id == environment_id,
+            HealthCheckRollup.bucket_seconds == bucket_seconds,
+            HealthCheckRollup.bucket_start >= bucket_start(start, bucket_seconds),
+            HealthCheckRollup.bucket_start < end
+        )
+        .order_by(HealthCheckRollup.bucket_start)
+    )
+    return resolution, list(result.scalars().all())
@@ -0,0 +1,348 @@
+import asyncio
+import heapq
+import math
+import time
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import func, select
+import structlog
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.metrics import HEALTH_CHECK_DURATION, HEALTH_CHECK_SCHEDULE_LAG, PROBE_LATENCY
+from app.models.environment import Environment
+from app.services.ingestion import ingestor
+from app.services.monitor_service import check_endpoint_health, build_health_check_row
+from app.services.sharding import WorkerMembership, membership
+from app.services.status_service import status_cache
+from app.websocket import manager
+from app.websocket.bus import InProcessBus
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class ScheduledCheck:
+    __slots__ = ("environment_id", "service_id", "url", "interval", "timeout", "next_run", "version")
+
+    def __init__(self, environment_id: UUID, service_id: UUID, url: str, interval: float, timeout: float):
+        self.environment_id = environment_id
+        self.service_id = service_id
+        self.url = url
+        self.interval = interval
+        self.timeout = timeout
+        self.next_run = 0.0
+        self.version = 0
+
+
+def jitter_offset(environment_id: UUID, interval: float) -> float:
+    """Deterministic phase for an environment within its check interval.
+
+    Environment ids are random UUIDs, so their integer value spreads
+    environments evenly across the interval, and the same environment
+    always lands on the same phase across restarts and workers.
+    """
+    interval_ms = max(int(interval * 1000), 1)
+    return (environment_id.int % interval_ms) / 1000
+
+
+def next_run_after(now: float, interval: float, offset: float) -> float:
+    """First time strictly after ``now`` that is ``offset`` past a multiple of ``interval``"""
+    return (math.floor((now - offset) / interval) + 1) * interval + offset
+
+
+class HealthCheckScheduler:
+    """Runs each environment's health check on its own interval.
+
+    Due times live in a min-heap keyed by wall-clock time. Each environment
+    is pinned to a deterministic phase inside its interval so probes and DB
+    writes are spread out instead of firing in one burst, and the next run
+    is computed from the scheduled slot rather than from when the check
+    finished, so timing never drifts. Slots missed because the scheduler
+    fell behind are skipped and counted as overruns.
+
+    Probes run concurrently, bounded by a semaphore, and results are handed
+    to the write-behind ingestor rather than written inline. Routers call ``schedule``/``unschedule``
+    when environments change; a periodic resync reconciles anything
+    changed behind the scheduler's back (e.g. cascading deletes).
+
+    With a worker ``membership`` every process keeps the full schedule but
+    only dispatches the environments it owns, so each check runs once no
+    matter how many workers or hosts are up, and ownership follows the
+    membership list as workers come and go. The environments table is then
+    polled every heartbeat for changes made through other workers.
+    """
+
+    def __init__(self, concurrency: int, resync_seconds: float, membership: Optional[WorkerMembership] = None):
+        self.concurrency = concurrency
+        self.resync_seconds = resync_seconds
+        self.membership = membership
+        self.checks_run = 0
+        self.overrun_count = 0
+        self.max_lag_seconds = 0.0
+        self._entries: dict[UUID, ScheduledCheck] = {}
+        self._heap: list[tuple[float, int, UUID, int]] = []
+        self._counter = 0
+        self._in_flight: set[UUID] = set()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._check_tasks: set[asyncio.Task] = set()
+        self._submitting: set[asyncio.Task] = set()
+        self._fingerprint: Optional[tuple] = None
+        self._warned_unshared = False
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        # Probes still running are abandoned, but checks whose result is
+        # already built get to hand it to the ingestor before it drains
+        for task in list(self._check_tasks):
+            if task not in self._submitting:
+                task.cancel()
+        await asyncio.gather(self._task, *self._check_tasks, return_exceptions=True)
+        self._task = None
+        self._check_tasks.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(
+        self,
+        environment_id: UUID,
+        service_id: UUID,
+        url: str,
+        interval: float,
+        timeout: float,
+        now: Optional[float] = None
+    ):
+        """Add an environment, or update its URL and timing if already scheduled"""
+        entry = self._entries.get(environment_id)
+        if entry is not None and entry.interval == interval:
+            entry.service_id = service_id
+            entry.url = url
+            entry.timeout = timeout
+            return
+
+        if entry is None:
+            entry = ScheduledCheck(environment_id, service_id, url, interval, timeout)
+            self._entries[environment_id] = entry
+        else:
+            entry.service_id = service_id
+            entry.url = url
+            entry.timeout = timeout
+            entry.interval = interval
+
+        now = time.time() if now is None else now
+        self._push(entry, next_run_after(now, interval, jitter_offset(environment_id, interval)))
+
+    def unschedule(self, environment_id: UUID):
+        # The heap entry is left in place and discarded when it comes due
+        self._entries.pop(environment_id, None)
+
+    def unschedule_service(self, service_id: UUID):
+        for environment_id in [e.environment_id for e in self._entries.values() if e.service_id == service_id]:
+            self.unschedule(environment_id)
+
+    def pop_due(self, now: float) -> list[tuple[ScheduledCheck, float]]:
+        """Return ``(check, scheduled_at)`` for every check due at ``now``, rescheduling each one"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            run_at, _, environment_id, version = heapq.heappop(self._heap)
+            entry = self._entries.get(environment_id)
+            if entry is None or entry.version != version:
+                continue
+
+            # Next slot follows the one just taken; if we are more than a
+            # whole interval late, skip the missed slots instead of bursting
+            next_run = run_at + entry.interval
+            if next_run <= now:
+                missed = math.floor((now - run_at) / entry.interval)
+                self.overrun_count += missed
+                next_run = run_at + (missed + 1) * entry.interval
+                logger.warning(
+                    "Health check schedule overran",
+                    environment_id=str(environment_id),
+                    missed_slots=missed,
+                    lag_seconds=round(now - run_at, 3)
+                )
+            self._push(entry, next_run)
+
+            if self.membership is not None and not self.membership.owns(environment_id):
+                continue
+            if environment_id in self._in_flight:
+                # Previous probe is still running, don't stack another one
+                self.overrun_count += 1
+                continue
+            due.append((entry, run_at))
+        return due
+
+    def next_due(self) -> Optional[float]:
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, entry: ScheduledCheck, run_at: float):
+        # Versions come from a global counter so a heap item left behind by
+        # an unscheduled environment can never match a re-added one
+        self._counter += 1
+        entry.version = self._counter
+        entry.next_run = run_at
+        heapq.heappush(self._heap, (run_at, self._counter, entry.environment_id, entry.version))
+        self._wakeup.set()
+
+    def _is_live(self, item: tuple[float, int, UUID, int]) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and entry.version == item[3]
+
+    async def _environments_changed(self) -> bool:
+        """Cheap check for environments added, removed or edited since the last call"""
+        async with async_session_maker() as db:
+            result = await db.execute(select(
+                func.count(Environment.id), func.max(Environment.created_at), func.max(Environment.updated_at)
+            ))
+            fingerprint = tuple(result.one())
+        changed = self._fingerprint is not None and fingerprint != self._fingerprint
+        self._fingerprint = fingerprint
+        return changed
+
+    async def _refresh_peer_statuses(self):
+        """Load other workers' results into the status cache when no shared bus carries them.
+
+        With the in-process bus each worker only sees the checks it runs
+        itself, so without this its status cache, and the listings and
+        WebSocket snapshots served from it, would go stale for every
+        environment owned by another worker.
+        """
+        if len(self.membership.workers) < 2 or not isinstance(manager.bus, InProcessBus):
+            self._warned_unshared = False
+            return
+        if not self._warned_unshared:
+            self._warned_unshared = True
+            logger.warning(
+                "Sharded workers without a shared WebSocket broadcast bus; set WS_BROADCAST_BACKEND "
+                "to unix or postgres, other workers' results reach this one only once per heartbeat",
+                workers=len(self.membership.workers)
+            )
+        await status_cache.refresh()
+
+    async def resync(self):
+        """Reconcile the schedule with the environments table"""
+        async with async_session_maker() as db:
+            result = await db.execute(select(
+                Environment.id,
+                Environment.service_id,
+                Environment.url,
+                Environment.check_interval_seconds,
+                Environment.timeout_seconds
+            ))
+            rows = result.all()
+
+        seen = set()
+        for environment_id, service_id, url, interval, timeout in rows:
+            seen.add(environment_id)
+            self.schedule(environment_id, service_id, url, interval, timeout)
+
+        for environment_id in set(self._entries) - seen:
+            self.unschedule(environment_id)
+
+        # Lazily deleted heap entries pile up under churn; rebuild the heap
+        # once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [item for item in self._heap if self._is_live(item)]
+            heapq.heapify(self._heap)
+
+        logger.info(
+            "Health check schedule synced",
+            environments=len(self._entries),
+            checks_run=self.checks_run,
+            overrun_count=self.overrun_count,
+            max_lag_seconds=round(self.max_lag_seconds, 3)
+        )
+        self.max_lag_seconds = 0.0
+
+    async def _run(self):
+        next_resync = 0.0
+        next_poll = 0.0
+
+        while True:
+            now = time.time()
+            if self.membership is not None and now >= next_poll:
+                next_poll = now + self.membership.heartbeat_seconds
+                try:
+                    if await self._environments_changed():
+                        next_resync = now
+                except Exception as e:
+                    logger.error("Environment change poll failed", error=str(e))
+                try:
+                    await self._refresh_peer_statuses()
+                except Exception as e:
+                    logger.error("Status cache refresh failed", error=str(e))
+
+            if now >= next_resync:
+                try:
+                    await self.resync()
+                except Exception as e:
+                    logger.error("Health check schedule sync failed", error=str(e))
+                next_resync = now + self.resync_seconds
+
+            for entry, run_at in self.pop_due(time.time()):
+                self._in_flight.add(entry.environment_id)
+                task = asyncio.create_task(self._check_environment(entry, run_at))
+                self._check_tasks.add(task)
+                task.add_done_callback(self._check_tasks.discard)
+
+            next_due = self.next_due()
+            wake_at = next_resync if next_due is None else min(next_due, next_resync)
+            if self.membership is not None:
+                wake_at = min(wake_at, next_poll)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(wake_at - time.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check_environment(self, entry: ScheduledCheck, scheduled_at: float):
+        environment_id = entry.environment_id
+        dispatched = time.perf_counter()
+        try:
+            async with self._semaphore:
+                lag = time.time() - scheduled_at
+                self.max_lag_seconds = max(self.max_lag_seconds, lag)
+                HEALTH_CHECK_SCHEDULE_LAG.observe(lag)
+                try:
+                    probe = await check_endpoint_health(entry.url, timeout=entry.timeout)
+                    if probe.response_time_ms is not None:
+                        PROBE_LATENCY.observe(probe.response_time_ms / 1000, probe.status.value)
+                    row = build_health_check_row(environment_id, probe)
+                    self._submitting.add(asyncio.current_task())
+                    # Waits only when the write-behind buffer is full, which
+                    # throttles probing while the database catches up
+                    await ingestor.submit(row)
+                except Exception as e:
+                    logger.error("Health check failed", environment_id=str(environment_id), error=str(e))
+                    return
+                self.checks_run += 1
+        finally:
+            self._submitting.discard(asyncio.current_task())
+            self._in_flight.discard(environment_id)
+            HEALTH_CHECK_DURATION.observe(time.perf_counter() - dispatched)
+
+        # Broadcast update via WebSocket
+        await manager.broadcast_status_update(
+            service_id=entry.service_id,
+            environment_id=environment_id,
+            status=row["status"].value,
+            response_time_ms=row["response_time_ms"] or 0,
+            timestamp=row["checked_at"].isoformat()
+        )
+
+
+scheduler = HealthCheckScheduler(
+    concurrency=settings.health_check_concurrency,
+    resync_seconds=settings.health_check_resync_seconds,
+    membership=membership if settings.scheduler_sharding else None
+)
@@ -0,0 +1,142 @@
+import asyncio
+import hashlib
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+from uuid import UUID
+from sqlalchemy import delete, select
+import structlog
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.worker import SchedulerWorker
+from app.utils.sql import database_now, dialect_insert
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+def _weight(worker_id: str, environment_id: UUID) -> int:
+    digest = hashlib.blake2b(f"{worker_id}/{environment_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def owner_of(environment_id: UUID, workers: Sequence[str]) -> Optional[str]:
+    """Rendezvous (highest random weight) hash of an environment onto a worker.
+
+    Every worker computes the same answer from the same membership list,
+    and when a worker leaves only the environments it owned move.
+    """
+    if not workers:
+        return None
+    return max(workers, key=lambda worker_id: _weight(worker_id, environment_id))
+
+
+class WorkerMembership:
+    """Heartbeat-based view of the workers sharing health check execution.
+
+    Each process upserts its row in ``scheduler_workers`` every
+    ``heartbeat_seconds`` and reads back the workers seen within
+    ``ttl_seconds``; environments are sharded across that list with
+    ``owner_of``. Heartbeats and expiry use the database clock, so workers
+    on hosts whose clocks disagree still agree on who is alive. A worker
+    that dies stops heartbeating and its share moves to the survivors once
+    its row expires. A worker that cannot reach the database for longer
+    than the TTL assumes it has been replaced and owns nothing until its
+    heartbeat succeeds again.
+    """
+
+    def __init__(self, heartbeat_seconds: float, ttl_seconds: float, worker_id: Optional[str] = None):
+        self.heartbeat_seconds = heartbeat_seconds
+        self.ttl_seconds = ttl_seconds
+        self.hostname = socket.gethostname()
+        self.worker_id = worker_id or f"{self.hostname}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.workers: tuple[str, ...] = ()
+        self.rebalances = 0
+        self._last_heartbeat = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        # Join before the scheduler starts so it never runs unsharded
+        await self.heartbeat()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            async with async_session_maker() as db:
+                await db.execute(delete(SchedulerWorker).where(SchedulerWorker.id == self.worker_id))
+                await db.commit()
+        except Exception as e:
+            logger.warning("Failed to leave scheduler membership", error=str(e))
+        self.workers = ()
+
+    @property
+    def active(self) -> bool:
+        return time.monotonic() - self._last_heartbeat < self.ttl_seconds
+
+    def owns(self, environment_id: UUID) -> bool:
+        if not self.active:
+            return False
+        return owner_of(environment_id, self.workers) == self.worker_id
+
+    async def heartbeat(self, now: Optional[datetime] = None):
+        """Refresh this worker's row, expire dead workers and reload the live list"""
+        async with async_session_maker() as db:
+            now = now or await database_now(db)
+            expired_before = now - timedelta(seconds=self.ttl_seconds)
+            values = {
+                "id": self.worker_id,
+                "hostname": self.hostname,
+                "pid": os.getpid(),
+                "started_at": now,
+                "heartbeat_at": now,
+            }
+            insert = dialect_insert(db)
+            if insert is None:
+                worker = await db.get(SchedulerWorker, self.worker_id)
+                if worker is None:
+                    db.add(SchedulerWorker(**values))
+                else:
+                    worker.heartbeat_at = now
+            else:
+                stmt = insert(SchedulerWorker).values(values)
+                await db.execute(stmt.on_conflict_do_update(
+                    index_elements=[SchedulerWorker.id],
+                    set_={"heartbeat_at": stmt.excluded.heartbeat_at}
+                ))
+            await db.execute(delete(SchedulerWorker).where(SchedulerWorker.heartbeat_at < expired_before))
+            result = await db.execute(select(SchedulerWorker.id).order_by(SchedulerWorker.id))
+            workers = tuple(result.scalars().all())
+            await db.commit()
+
+        self._last_heartbeat = time.monotonic()
+        if workers != self.workers:
+            if self.workers:
+                self.rebalances += 1
+            logger.info("Scheduler membership changed", worker_id=self.worker_id, workers=len(workers))
+            self.workers = workers
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.error("Scheduler heartbeat failed", worker_id=self.worker_id, error=str(e))
+
+
+membership = WorkerMembership(
+    heartbeat_seconds=settings.scheduler_heartbeat_seconds,
+    ttl_seconds=settings.scheduler_worker_ttl_seconds
+)
@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.health_check import HealthCheckLatencyHistogram, HealthCheckRollup, HealthStatus
+from app.services.rollup_service import LATENCY_BUCKET_BOUNDS_MS, ROLLUP_RESOLUTIONS, bucket_start, choose_resolution
+
+PERCENTILES = (50, 95, 99)
+
+# Stats walk whole buckets, so allow far more of them than a chart would
+STATS_MAX_BUCKETS = 5000
+
+_STATUS_COLUMNS = (
+    (HealthStatus.HEALTHY, "healthy_count"),
+    (HealthStatus.DEGRADED, "degraded_count"),
+    (HealthStatus.DOWN, "down_count"),
+    (HealthStatus.UNKNOWN, "unknown_count"),
+)
+
+
+class HealthStats:
+    """Uptime and latency summary accumulated from rollup buckets"""
+
+    def __init__(self):
+        self.status_counts = {status: 0 for status, _ in _STATUS_COLUMNS}
+        self.status_seconds = {status: 0.0 for status, _ in _STATUS_COLUMNS}
+        self.response_count = 0
+        self.response_time_sum = 0
+        self.response_time_min: Optional[int] = None
+        self.response_time_max: Optional[int] = None
+        self.histogram: dict[int, int] = {}
+
+    @property
+    def total_checks(self) -> int:
+        return sum(self.status_counts.values())
+
+    @property
+    def uptime_percent(self) -> Optional[float]:
+        """Share of checks with a known status that were not DOWN"""
+        known = self.total_checks - self.status_counts[HealthStatus.UNKNOWN]
+        if not known:
+            return None
+        return 100.0 * (known - self.status_counts[HealthStatus.DOWN]) / known
+
+    @property
+    def response_time_avg(self) -> Optional[float]:
+        return self.response_time_sum / self.response_count if self.response_count else None
+
+    def add_bucket(self, counts: dict[HealthStatus, int], seconds: float):
+        """Count one rollup bucket, sharing its covered time across statuses by check count"""
+        total = sum(counts.values())
+        for status, count in counts.items():
+            self.status_counts[status] += count
+            if total:
+                self.status_seconds[status] += seconds * count / total
+
+    def add_latency(self, count: int, total: int, low: Optional[int], high: Optional[int]):
+        self.response_count += count
+        self.response_time_sum += total
+        if low is not None and (self.response_time_min is None or low < self.response_time_min):
+            self.response_time_min = low
+        if high is not None and (self.response_time_max is None or high > self.response_time_max):
+            self.response_time_max = high
+
+    def merge(self, other: "HealthStats"):
+        for status in self.status_counts:
+            self.status_counts[status] += other.status_counts[status]
+            self.status_seconds[status] += other.status_seconds[status]
+        self.add_latency(other.response_count, other.response_time_sum, other.response_time_min, other.response_time_max)
+        for latency, count in other.histogram.items():
+            self.histogram[latency] = self.histogram.get(latency, 0) + count
+
+    def percentile(self, q: float) -> Optional[float]:
+        return estimate_percentile(self.histogram, q, self.response_time_min, self.response_time_max)
+
+    def summary(self) -> dict:
+        """Fields of ``HealthStatsResponse``"""
+        summary = {
+            "total_checks": self.total_checks,
+            "uptime_percent": self.uptime_percent,
+            "check_counts": dict(self.status_counts),
+            "time_in_status_seconds": {status: round(seconds, 3) for status, seconds in self.status_seconds.items()},
+            "response_time_min": self.response_time_min,
+            "response_time_avg": self.response_time_avg,
+            "response_time_max": self.response_time_max,
+        }
+        for q in PERCENTILES:
+            summary[f"response_time_p{q}"] = self.percentile(q)
+        return summary
+
+
+def resolve_stats_range(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    default_span: timedelta = timedelta(days=1)
+) -> tuple[datetime, datetime]:
+    """Fill in a missing ``end`` (now) and ``start`` (``default_span`` before end)"""
+    end = end or datetime.utcnow()
+    return start or end - default_span, end
+
+
+def estimate_percentile(
+    histogram: dict[int, int],
+    q: float,
+    low: Optional[int] = None,
+    high: Optional[int] = None
+) -> Optional[float]:
+    """Estimate the ``q``-th percentile from latency bucket counts.
+
+    Interpolates linearly inside the bucket holding the target rank and
+    clamps to the observed ``low``/``high`` so a sparse tail never reports
+    a value nobody saw.
+    """
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    rank = q / 100 * total
+    seen = 0
+    for latency in sorted(histogram):
+        count = histogram[latency]
+        if seen + count >= rank:
+            lower = LATENCY_BUCKET_BOUNDS_MS[latency - 1] if latency > 0 else 0
+            if latency < len(LATENCY_BUCKET_BOUNDS_MS):
+                upper = LATENCY_BUCKET_BOUNDS_MS[latency]
+            else:
+                upper = high if high is not None else lower
+            value = lower + (upper - lower) * (rank - seen) / count
+            if low is not None:
+                value = max(value, low)
+            if high is not None:
+                value = min(value, high)
+            return float(value)
+        seen += count
+    return float(high) if high is not None else None
+
+
+async def get_health_stats(
+    db: AsyncSession,
+    environment_ids: Iterable[UUID],
+    start: datetime,
+    end: datetime,
+    resolution: Optional[str] = None
+) -> tuple[str, dict[UUID, HealthStats]]:
+    """Uptime, time per status and latency percentiles for each environment over ``[start, end)``.
+
+    Everything is read from the rollup and latency histogram tables in two
+    queries, so the cost depends on the number of buckets in
+    the range, not on the number of raw checks. Buckets are counted whole;
+    pick a finer ``resolution`` for tighter edges.
+    """
+    environment_ids = list(environment_ids)
+    stats = {environment_id: HealthStats() for environment_id in environment_ids}
+    if not environment_ids:
+        return resolution or next(iter(ROLLUP_RESOLUTIONS)), stats
+
+    if resolution is None:
+        resolution = choose_resolution(start, end, STATS_MAX_BUCKETS)
+    bucket_seconds = ROLLUP_RESOLUTIONS[resolution]
+    first_bucket = bucket_start(start, bucket_seconds)
+
+    rollups = await db.execute(
+        select(
+            HealthCheckRollup.environment_id,
+            HealthCheckRollup.bucket_start,
+            HealthCheckRollup.healthy_count,
+            HealthCheckRollup.degraded_count,
+            HealthCheckRollup.down_count,
+            HealthCheckRollup.unknown_count,
+            HealthCheckRollup.response_count,
+            HealthCheckRollup.response_time_sum,
+            HealthCheckRollup.response_time_min,
+            HealthCheckRollup.response_time_max
+        ).where(
+            HealthCheckRollup.environment_id.in_(environment_ids),
+            HealthCheckRollup.bucket_seconds == bucket_seconds,
+            HealthCheckRollup.bucket_start >= first_bucket,
+            HealthCheckRollup.bucket_start < end
+        )
+    )
+    for row in rollups.all():
+        counts = {status: getattr(row, column) for status, column in _STATUS_COLUMNS}
+        bucket_end = row.bucket_start + timedelta(seconds=bucket_seconds)
+        covered = (min(bucket_end, end) - max(row.bucket_start, start)).total_seconds()
+        entry = stats[row.environment_id]
+        entry.add_bucket(counts, max(covered, 0.0))
+        entry.add_latency(row.response_count, row.response_time_sum, row.response_time_min, row.response_time_max)
+
+    histogram = await db.execute(
+        select(
+            HealthCheckLatencyHistogram.environment_id,
+            HealthCheckLatencyHistogram.latency_bucket,
+            func.sum(HealthCheckLatencyHistogram.count)
+        ).where(
+            HealthCheckLatencyHistogram.environment_id.in_(environment_ids),
+            HealthCheckLatencyHistogram.bucket_seconds == bucket_seconds,
+            HealthCheckLatencyHistogram.bucket_start >= first_bucket,
+            HealthCheckLatencyHistogram.bucket_start < end
+        ).group_by(HealthCheckLatencyHistogram.environment_id, HealthCheckLatencyHistogram.latency_bucket)
+    )
+    for environment_id, latency, count in histogram.all():
+        stats[environment_id].histogram[latency] = int(count)
+
+    return resolution, stats
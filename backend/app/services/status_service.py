@@ -0,0 +1,281 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import structlog
+
+from app.database import async_session_maker
+from app.models.environment import Environment
+from app.models.health_check import EnvironmentLatestStatus, HealthStatus
+from app.utils.sql import dialect_insert
+
+logger = structlog.get_logger()
+
+
+class LatestStatus:
+    __slots__ = ("service_id", "status", "response_time_ms", "checked_at")
+
+    def __init__(self, service_id: Optional[UUID], status: HealthStatus, response_time_ms: Optional[int], checked_at: datetime):
+        self.service_id = service_id
+        self.status = status
+        self.response_time_ms = response_time_ms
+        self.checked_at = checked_at
+
+
+class StatusCache:
+    """In-process copy of the ``environment_latest_status`` projection.
+
+    Warmed with a single query at startup and kept current by the
+    ingestion path, so listing endpoints can resolve ``current_status`` /
+    ``last_check`` without touching the database. Until it is warmed
+    (scripts, tests) lookups fall back to one query against the projection.
+
+    ``version`` increases on every change and ``service_version`` per
+    service, so derived caches can tell whether the statuses they were
+    built from are still current. Environments are also indexed by
+    service for ``for_service``.
+
+    Removed environments are remembered (up to ``MAX_REMOVED``) so a result
+    still in flight when one was deleted can't put it back.
+    """
+
+    MAX_REMOVED = 10000
+
+    def __init__(self):
+        self._entries: dict[UUID, LatestStatus] = {}
+        self._removed: OrderedDict[UUID, None] = OrderedDict()
+        self._by_service: dict[UUID, set[UUID]] = {}
+        self._service_versions: dict[UUID, int] = {}
+        self.warmed = False
+        self.version = 0
+        # Changes to environments whose service is not known yet
+        self.unattributed_version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, environment_id: UUID) -> Optional[LatestStatus]:
+        return self._entries.get(environment_id)
+
+    def for_service(self, service_id: UUID) -> dict[UUID, LatestStatus]:
+        """Latest status of every cached environment of a service"""
+        return {
+            environment_id: self._entries[environment_id]
+            for environment_id in self._by_service.get(service_id, ())
+        }
+
+    def update(
+        self,
+        environment_id: UUID,
+        status: HealthStatus,
+        response_time_ms: Optional[int],
+        checked_at: datetime,
+        service_id: Optional[UUID] = None
+    ) -> bool:
+        """Record a check result; returns False if it is not newer than the cached one or its environment was removed"""
+        if environment_id in self._removed:
+            return False
+        current = self._entries.get(environment_id)
+        if current is not None and current.checked_at >= checked_at:
+            return False
+        if service_id is None and current is not None:
+            service_id = current.service_id
+        if current is not None and current.service_id != service_id:
+            self._unindex(environment_id, current.service_id)
+        if service_id is not None:
+            self._by_service.setdefault(service_id, set()).add(environment_id)
+        self._entries[environment_id] = LatestStatus(service_id, status, response_time_ms, checked_at)
+        self._changed(service_id)
+        return True
+
+    def remove(self, environment_id: UUID):
+        self._removed[environment_id] = None
+        self._removed.move_to_end(environment_id)
+        if len(self._removed) > self.MAX_REMOVED:
+            self._removed.popitem(last=False)
+        removed = self._entries.pop(environment_id, None)
+        if removed is not None:
+            self._unindex(environment_id, removed.service_id)
+            self._changed(removed.service_id)
+
+    def clear(self):
+        self._entries.clear()
+        self._by_service.clear()
+        self.warmed = False
+        self.version += 1
+        self.unattributed_version += 1
+
+    def _unindex(self, environment_id: UUID, service_id: Optional[UUID]):
+        environments = self._by_service.get(service_id)
+        if environments is not None:
+            environments.discard(environment_id)
+            if not environments:
+                del self._by_service[service_id]
+
+    def service_version(self, service_id: UUID) -> int:
+        return self._service_versions.get(service_id, 0)
+
+    def _changed(self, service_id: Optional[UUID]):
+        self.version += 1
+        if service_id is None:
+            self.unattributed_version += 1
+        else:
+            self._service_versions[service_id] = self._service_versions.get(service_id, 0) + 1
+
+    @staticmethod
+    async def _load() -> list:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(
+                    EnvironmentLatestStatus.environment_id,
+                    Environment.service_id,
+                    EnvironmentLatestStatus.status,
+                    EnvironmentLatestStatus.response_time_ms,
+                    EnvironmentLatestStatus.checked_at
+                ).join(Environment, Environment.id == EnvironmentLatestStatus.environment_id)
+            )
+            return result.all()
+
+    async def warm(self):
+        self._entries = {
+            environment_id: LatestStatus(service_id, status, response_time_ms, checked_at)
+            for environment_id, service_id, status, response_time_ms, checked_at in await self._load()
+        }
+        self._by_service = {}
+        for environment_id, entry in self._entries.items():
+            self._by_service.setdefault(entry.service_id, set()).add(environment_id)
+        self.warmed = True
+        self.version += 1
+        self.unattributed_version += 1
+        logger.info("Status cache warmed", environments=len(self._entries))
+
+    async def refresh(self) -> int:
+        """Apply projection rows newer than the cached ones; returns how many changed.
+
+        For results this process never sees, i.e. checks run by other
+        workers when no shared broadcast bus delivers them.
+        """
+        refreshed = 0
+        for environment_id, service_id, status, response_time_ms, checked_at in await self._load():
+            if self.update(environment_id, status, response_time_ms, checked_at, service_id=service_id):
+                refreshed += 1
+        return refreshed
+
+
+status_cache = StatusCache()
+
+
+def latest_per_environment(rows: Iterable[dict]) -> list[dict]:
+    """Reduce health check rows to the newest one per environment"""
+    latest: dict[UUID, dict] = {}
+    for row in rows:
+        current = latest.get(row["environment_id"])
+        if current is None or row["checked_at"] >= current["checked_at"]:
+            latest[row["environment_id"]] = row
+    return list(latest.values())
+
+
+async def upsert_latest_status(db: AsyncSession, rows: Iterable[dict]) -> list[dict]:
+    """Fold health check rows into the latest-status projection.
+
+    Uses a single ``INSERT .. ON CONFLICT DO UPDATE`` guarded on
+    ``checked_at`` so an older result never overwrites a newer one.
+    Returns the per-environment rows that were applied.
+    """
+    latest = latest_per_environment(rows)
+    if not latest:
+        return latest
+
+    values = [
+        {
+            "environment_id": row["environment_id"],
+            "health_check_id": row["id"],
+            "status": row["status"],
+            "response_time_ms": row["response_time_ms"],
+            "checked_at": row["checked_at"],
+        }
+        for row in latest
+    ]
+
+    insert = dialect_insert(db)
+    if insert is None:
+        for value in values:
+            existing = await db.get(EnvironmentLatestStatus, value["environment_id"])
+            if existing is None:
+                db.add(EnvironmentLatestStatus(**value))
+            elif existing.checked_at <= value["checked_at"]:
+                for key, item in value.items():
+                    setattr(existing, key, item)
+        await db.flush()
+        return latest
+
+    stmt = insert(EnvironmentLatestStatus).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EnvironmentLatestStatus.environment_id],
+        set_={
+            "health_check_id": stmt.excluded.health_check_id,
+            "status": stmt.excluded.status,
+            "response_time_ms": stmt.excluded.response_time_ms,
+            "checked_at": stmt.excluded.checked_at,
+        },
+        where=EnvironmentLatestStatus.checked_at <= stmt.excluded.checked_at
+    )
+    await db.execute(stmt)
+    return latest
+
+
+def cache_latest_status(rows: Iterable[dict]):
+    """Apply already-persisted latest rows to the in-process cache"""
+    for row in rows:
+        status_cache.update(row["environment_id"], row["status"], row["response_time_ms"], row["checked_at"])
+
+
+def cache_latest_status_on_commit(db: AsyncSession, rows: Iterable[dict]):
+    """Apply latest rows to the in-process cache once ``db`` commits, and never if it rolls back"""
+    db.sync_session.info.setdefault("latest_status_rows", []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_on_commit(session: Session):
+    rows = session.info.pop("latest_status_rows", None)
+    if rows:
+        cache_latest_status(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session):
+    session.info.pop("latest_status_rows", None)
+
+
+async def attach_latest_status(db: AsyncSession, environments: Iterable[Environment]):
+    """Set ``current_status`` and ``last_check`` on each environment.
+
+    Served from the status cache once it is warm, otherwise with a single
+    query against the projection, never one query per environment.
+    """
+    environments = list(environments)
+    if not environments:
+        return
+
+    if status_cache.warmed:
+        for env in environments:
+            latest = status_cache.get(env.id)
+            if latest:
+                env.current_status = latest.status
+                env.last_check = latest.checked_at
+        return
+
+    result = await db.execute(
+        select(
+            EnvironmentLatestStatus.environment_id,
+            EnvironmentLatestStatus.status,
+            EnvironmentLatestStatus.checked_at
+        ).where(EnvironmentLatestStatus.environment_id.in_([env.id for env in environments]))
+    )
+    latest = {environment_id: (status, checked_at) for environment_id, status, checked_at in result.all()}
+    for env in environments:
+        if env.id in latest:
+            env.current_status, env.last_check = latest[env.id]
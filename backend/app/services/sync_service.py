@@ -0,0 +1,238 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import false, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.change_log import ChangeLog
+from app.models.environment import Environment
+from app.models.health_check import EnvironmentLatestStatus
+from app.models.service import Service
+from app.services.status_service import attach_latest_status, latest_per_environment
+
+settings = get_settings()
+
+SERVICE = "service"
+ENVIRONMENT = "environment"
+STATUS = "status"
+
+
+class CursorExpired(Exception):
+    """The change log no longer reaches back to the requested cursor"""
+
+
+async def record_service_change(db: AsyncSession, service_id: UUID, team_id: UUID, deleted: bool = False):
+    await db.execute(insert(ChangeLog).values(
+        entity=SERVICE, entity_id=service_id, team_id=team_id, deleted=deleted, changed_at=datetime.utcnow()
+    ))
+
+
+async def record_team_services_deleted(db: AsyncSession, team_id: UUID):
+    """Tombstone every service of a team that is about to be deleted"""
+    await _record_from(db, select(
+        literal(SERVICE), Service.id, Service.team_id, literal(True), literal(datetime.utcnow())
+    ).where(Service.team_id == team_id))
+
+
+async def record_environment_changes(
+    db: AsyncSession,
+    environment_ids: Iterable[UUID],
+    entity: str = ENVIRONMENT,
+    deleted: bool = False
+):
+    """Log changes to environments (or their latest status), resolving each one's team in the same statement.
+
+    Must run while the environments still exist, i.e. before a delete is flushed.
+    """
+    environment_ids = list(environment_ids)
+    if not environment_ids:
+        return
+    await _record_from(db, select(
+        literal(entity), Environment.id, Service.team_id, literal(deleted), literal(datetime.utcnow())
+    ).join(Service, Service.id == Environment.service_id).where(Environment.id.in_(environment_ids)))
+
+
+async def _record_from(db: AsyncSession, query):
+    columns = [ChangeLog.entity, ChangeLog.entity_id, ChangeLog.team_id, ChangeLog.deleted, ChangeLog.changed_at]
+    await db.execute(insert(ChangeLog).from_select(columns, query))
+
+
+async def status_transitions(db: AsyncSession, rows: Iterable[dict]) -> list[UUID]:
+    """Environments whose newest row changes the status held in the projection.
+
+    Must run in the writing transaction before ``upsert_latest_status``.
+    The projection rather than the status cache is the reference: the
+    WebSocket bus refreshes the cache as soon as a result is broadcast,
+    usually before the write-behind ingestor gets to it. Only transitions
+    are logged; response times and check timestamps of an unchanged
+    status reach clients over the WebSocket instead.
+    """
+    latest = latest_per_environment(rows)
+    if not latest:
+        return []
+    result = await db.execute(
+        select(EnvironmentLatestStatus.environment_id, EnvironmentLatestStatus.status, EnvironmentLatestStatus.checked_at)
+        .where(EnvironmentLatestStatus.environment_id.in_([row["environment_id"] for row in latest]))
+    )
+    previous = {environment_id: (status, checked_at) for environment_id, status, checked_at in result.all()}
+
+    changed = []
+    for row in latest:
+        prior = previous.get(row["environment_id"])
+        if prior is None or (prior[0] != row["status"] and prior[1] <= row["checked_at"]):
+            changed.append(row["environment_id"])
+    return changed
+
+
+def scope_token(team_ids: Optional[Iterable[UUID]]) -> str:
+    """Identifies the set of teams a caller can see; it changes when that set does"""
+    if team_ids is None:
+        return "all"
+    joined = ",".join(sorted(str(team_id) for team_id in team_ids))
+    return hashlib.blake2b(joined.encode(), digest_size=8).hexdigest()
+
+
+async def current_cursor(db: AsyncSession) -> int:
+    return (await db.execute(select(func.coalesce(func.max(ChangeLog.seq), 0)))).scalar_one()
+
+
+async def _safe_horizon(db: AsyncSession, since: int, now: datetime) -> Optional[int]:
+    """Highest sequence a client may safely advance its cursor to.
+
+    Sequence numbers are handed out at insert time, so a change committed
+    later can still appear below ones already visible. A gap next to a
+    recent entry may be such an in-flight transaction, so the cursor is
+    held just below it until the grace period passes; older gaps are
+    rolled-back transactions and are skipped. ``None`` means no limit.
+    """
+    recent = (await db.execute(
+        select(ChangeLog.seq)
+        .where(ChangeLog.seq > since, ChangeLog.changed_at >= now - timedelta(seconds=settings.sync_gap_grace_seconds))
+        .order_by(ChangeLog.seq)
+    )).scalars().all()
+    if not recent:
+        return None
+
+    previous = (await db.execute(
+        select(func.coalesce(func.max(ChangeLog.seq), since)).where(ChangeLog.seq < recent[0])
+    )).scalar_one()
+    if recent[0] > previous + 1:
+        return max(previous, since)
+    for current, following in zip(recent, recent[1:]):
+        if following > current + 1:
+            return current
+    return None
+
+
+async def get_changes(
+    db: AsyncSession,
+    team_ids: Optional[Iterable[UUID]],
+    since: int,
+    limit: int,
+    now: Optional[datetime] = None
+) -> dict:
+    """Services, environments and statuses changed after ``since``, plus deletions.
+
+    ``team_ids`` limits the result to those teams; ``None`` means every
+    team. Returns the new cursor and whether more changes are waiting.
+    Changes of a team the caller has left (or that was deleted) are no
+    longer visible; clients notice through ``scope_token`` and take a new
+    snapshot, as they do after joining a team.
+    """
+    now = now or datetime.utcnow()
+    oldest = (await db.execute(select(func.min(ChangeLog.seq)))).scalar_one()
+    if since > 0 and oldest is not None and since < oldest - 1:
+        raise CursorExpired()
+
+    # Read before the entries so a page that is not full can advance the
+    # cursor past other teams' changes without skipping ones of our own
+    ceiling = await current_cursor(db)
+    horizon = await _safe_horizon(db, since, now)
+
+    query = (
+        select(ChangeLog)
+        .where(ChangeLog.seq > since, ChangeLog.seq <= ceiling)
+        .order_by(ChangeLog.seq)
+        .limit(limit + 1)
+    )
+    if team_ids is not None:
+        team_ids = list(team_ids)
+        query = query.where(ChangeLog.team_id.in_(team_ids) if team_ids else false())
+    entries = list((await db.execute(query)).scalars().all())
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Only the latest entry per entity matters
+    latest: dict[tuple[str, UUID], ChangeLog] = {}
+    for entry in entries:
+        latest[(entry.entity, entry.entity_id)] = entry
+
+    service_ids = {entity_id for (entity, entity_id), entry in latest.items() if entity == SERVICE and not entry.deleted}
+    environment_ids = {
+        entity_id for (entity, entity_id), entry in latest.items() if entity == ENVIRONMENT and not entry.deleted
+    }
+    status_ids = {
+        entity_id for (entity, entity_id), entry in latest.items() if entity == STATUS and not entry.deleted
+    } - environment_ids
+    deleted_services = {entity_id for (entity, entity_id), entry in latest.items() if entity == SERVICE and entry.deleted}
+    deleted_environments = {
+        entity_id for (entity, entity_id), entry in latest.items() if entity == ENVIRONMENT and entry.deleted
+    }
+
+    services = []
+    if service_ids:
+        services = list((await db.execute(select(Service).where(Service.id.in_(service_ids)))).scalars().all())
+        deleted_services |= service_ids - {service.id for service in services}
+
+    environments = []
+    if environment_ids or status_ids:
+        environments = list((await db.execute(
+            select(Environment).where(Environment.id.in_(environment_ids | status_ids))
+        )).scalars().all())
+        await attach_latest_status(db, environments)
+        deleted_environments |= (environment_ids | status_ids) - {environment.id for environment in environments}
+
+    cursor = entries[-1].seq if has_more else max(ceiling, since)
+    if horizon is not None:
+        cursor = max(since, min(cursor, horizon))
+
+    return {
+        "cursor": cursor,
+        "has_more": has_more,
+        "services": services,
+        "environments": [environment for environment in environments if environment.id in environment_ids],
+        "statuses": [environment for environment in environments if environment.id in status_ids],
+        "deleted_services": sorted(deleted_services, key=str),
+        "deleted_environments": sorted(deleted_environments, key=str),
+    }
+
+
+async def get_snapshot(db: AsyncSession, team_ids: Optional[Iterable[UUID]]) -> dict:
+    """Every visible service and environment, with the cursor to sync from afterwards"""
+    # Read the cursor first: anything committed while the tree is read is sent again next time
+    cursor = await current_cursor(db)
+
+    query = select(Service)
+    if team_ids is not None:
+        team_ids = list(team_ids)
+        query = query.where(Service.team_id.in_(team_ids) if team_ids else false())
+    services = list((await db.execute(query)).scalars().all())
+
+    environments = []
+    if services:
+        environments = list((await db.execute(
+            select(Environment).where(Environment.service_id.in_([service.id for service in services]))
+        )).scalars().all())
+        await attach_latest_status(db, environments)
+
+    return {
+        "cursor": cursor,
+        "has_more": False,
+        "services": services,
+        "environments": environments,
+        "statuses": [],
+        "deleted_services": [],
+        "deleted_environments": [],
+    }
@@ -0,0 +1,124 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import structlog
+
+from app.config import get_settings
+from app.models.user import User, UserRole
+
+logger = structlog.get_logger()
+settings = get_settings()
+
+
+class UserSnapshot:
+    """Detached, read-only copy of the user fields request handlers need"""
+    __slots__ = ("id", "email", "full_name", "role", "created_at")
+
+    def __init__(self, id: UUID, email: str, full_name: Optional[str], role: UserRole, created_at: datetime):
+        self.id = id
+        self.email = email
+        self.full_name = full_name
+        self.role = role
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(user.id, user.email, user.full_name, user.role, user.created_at)
+
+
+class TokenUserCache:
+    """Bounded LRU of bearer token -> ``UserSnapshot``.
+
+    An entry lives for ``ttl_seconds`` or until the token expires, whichever
+    comes first, so a cached token is never honoured past its ``exp``.
+    Entries are also dropped as soon as an update or delete of the user row
+    is committed in this process; changes made elsewhere are picked up
+    within the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, tuple[UserSnapshot, float]] = OrderedDict()
+        self._tokens_by_user: dict[UUID, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        entry = self._entries.get(token)
+        if entry is not None:
+            snapshot, expires_at = entry
+            if time.time() < expires_at:
+                self._entries.move_to_end(token)
+                self.hits += 1
+                return snapshot
+            self._remove(token)
+        self.misses += 1
+        return None
+
+    def put(self, token: str, snapshot: UserSnapshot, token_expires_at: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        if token in self._entries:
+            self._remove(token)
+        self._entries[token] = (snapshot, expires_at)
+        self._tokens_by_user.setdefault(snapshot.id, set()).add(token)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: UUID):
+        """Forget every cached token of a user, e.g. after a role change"""
+        tokens = self._tokens_by_user.pop(user_id, ())
+        for token in tokens:
+            self._entries.pop(token, None)
+        if tokens:
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _remove(self, token: str):
+        snapshot, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(snapshot.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[snapshot.id]
+
+
+user_cache = TokenUserCache(
+    max_entries=settings.auth_cache_max_entries,
+    ttl_seconds=settings.auth_cache_ttl_seconds
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_changed_users(session: Session, flush_context):
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, User):
+            session.info.setdefault("changed_user_ids", set()).add(instance.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    # Only after commit: evicting at flush would let a concurrent request
+    # re-cache the pre-commit row for the full TTL
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session: Session):
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,9 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalise a request datetime to the naive UTC values stored in the database"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(db: AsyncSession) -> Optional[Callable]:
+    """``insert`` construct supporting ON CONFLICT for the session's dialect, if any"""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
+async def database_now(db: AsyncSession) -> datetime:
+    """The database server's current time as a naive UTC datetime, like the stored timestamps"""
+    now = (await db.execute(select(func.current_timestamp()))).scalar_one()
+    if now.tzinfo is not None:
+        now = now.astimezone(timezone.utc).replace(tzinfo=None)
+    return now
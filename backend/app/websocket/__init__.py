@@ -1,3 +1,3 @@
-from app.websocket.manager import ConnectionManager, manager
+from app.websocket.manager import MSGPACK_SUBPROTOCOL, ConnectionManager, ConnectionRecord, manager
 
-__all__ = ["ConnectionManager", "manager"]
+__all__ = ["MSGPACK_SUBPROTOCOL", "ConnectionManager", "ConnectionRecord", "manager"]
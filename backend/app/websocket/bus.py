@@ -0,0 +1,296 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+from sqlalchemy import text
+import structlog
+
+logger = structlog.get_logger()
+
+MessageHandler = Callable[[dict], None]
+
+BROADCAST_BACKENDS = ("memory", "unix", "postgres")
+
+
+class BroadcastBus(ABC):
+    """Delivers published messages to the handler of every worker process.
+
+    ``publish`` is called once per event; each worker's handler (its
+    ConnectionManager) then fans the message out to its own sockets.
+    Backends implement ``publish``.
+    """
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+
+    @property
+    def running(self) -> bool:
+        return self._handler is not None
+
+    async def start(self, handler: MessageHandler):
+        self._handler = handler
+
+    async def stop(self):
+        self._handler = None
+
+    @abstractmethod
+    async def publish(self, message: dict):
+        """Send ``message`` to the handler of every worker, this one included"""
+
+    def _deliver(self, message: dict):
+        if self._handler is None:
+            return
+        try:
+            self._handler(message)
+        except Exception as e:
+            logger.error("Broadcast handler failed", error=str(e))
+
+
+class InProcessBus(BroadcastBus):
+    """Single-process bus: publishing hands the message straight to the local handler"""
+
+    async def publish(self, message: dict):
+        self._deliver(message)
+
+
+class UnixSocketBus(BroadcastBus):
+    """Brokerless bus for several workers on one host.
+
+    Every worker binds a Unix datagram socket in a shared directory and
+    publishing sends one datagram to each peer socket found there, so
+    ``uvicorn --workers N`` needs nothing else running. Sockets left behind
+    by dead workers are removed the first time a send to them is refused.
+
+    Anyone able to send to these sockets can inject status updates, so the
+    directory is created private to the current user and an existing one
+    is refused unless this user owns it and nobody else can write to it.
+    """
+
+    # Peer sockets are re-listed at most this often
+    PEER_REFRESH_SECONDS = 1.0
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self.messages_dropped = 0
+        self._sock: Optional[socket.socket] = None
+        self._peers: list[str] = []
+        self._peers_refreshed = 0.0
+
+    async def start(self, handler: MessageHandler):
+        self._prepare_directory()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        asyncio.get_running_loop().add_reader(self._sock.fileno(), self._receive)
+        await super().start(handler)
+        logger.info("Broadcast bus listening", backend="unix", path=self.path)
+
+    async def stop(self):
+        await super().stop()
+        if self._sock is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _prepare_directory(self):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        info = os.lstat(self.directory)
+        if not stat.S_ISDIR(info.st_mode):
+            raise RuntimeError(f"Broadcast bus path {self.directory} is not a directory")
+        if info.st_uid != os.getuid():
+            raise RuntimeError(f"Broadcast bus directory {self.directory} is owned by another user")
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise RuntimeError(f"Broadcast bus directory {self.directory} is writable by other users")
+
+    async def publish(self, message: dict):
+        data = json.dumps(message).encode()
+        self._deliver(message)
+        for peer in list(self._current_peers()):
+            try:
+                self._sock.sendto(data, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._remove_peer(peer)
+            except BlockingIOError:
+                # The peer's receive buffer is full; it is too far behind to catch up
+                self.messages_dropped += 1
+
+    def _current_peers(self) -> list[str]:
+        now = time.monotonic()
+        if now - self._peers_refreshed >= self.PEER_REFRESH_SECONDS:
+            self._peers = [
+                entry.path for entry in os.scandir(self.directory)
+                if entry.name.endswith(".sock") and entry.path != self.path
+            ]
+            self._peers_refreshed = now
+        return self._peers
+
+    def _remove_peer(self, peer: str):
+        logger.info("Removing stale broadcast peer", path=peer)
+        try:
+            os.unlink(peer)
+        except FileNotFoundError:
+            pass
+        if peer in self._peers:
+            self._peers.remove(peer)
+
+    def _receive(self):
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                logger.warning("Discarding malformed broadcast datagram")
+                continue
+            self._deliver(message)
+
+
+class PostgresNotifyBus(BroadcastBus):
+    """Bus over PostgreSQL ``LISTEN/NOTIFY`` for workers spread across hosts.
+
+    Holds one dedicated connection from the application's engine for
+    listening; each publish is a ``pg_notify`` on a pooled connection.
+    Every listener, including the publisher, receives the notification.
+    The listening connection is pinged every ``CHECK_INTERVAL_SECONDS``;
+    once it is lost it is reopened with exponential backoff.
+    Notifications sent while it is down are not received.
+    """
+
+    CHECK_INTERVAL_SECONDS = 10.0
+    RECONNECT_MIN_SECONDS = 0.5
+    RECONNECT_MAX_SECONDS = 30.0
+
+    def __init__(self, engine, channel: str):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+        self.reconnects = 0
+        self._connection = None
+        self._raw = None
+        self._lost = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: MessageHandler):
+        if self.engine.dialect.name != "postgresql":
+            raise RuntimeError("The postgres broadcast backend needs a PostgreSQL database")
+        await super().start(handler)
+        await self._listen()
+        self._task = asyncio.create_task(self._supervise())
+        logger.info("Broadcast bus listening", backend="postgres", channel=self.channel)
+
+    async def stop(self):
+        await super().stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._raw is not None and not self._raw.is_closed():
+            try:
+                await self._raw.remove_listener(self.channel, self._notified)
+            except Exception as e:
+                logger.warning("Failed to remove broadcast listener", error=str(e))
+        await self._close_connection()
+
+    async def publish(self, message: dict):
+        async with self.engine.connect() as conn:
+            await conn.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": json.dumps(message)}
+            )
+            await conn.commit()
+
+    async def _listen(self):
+        self._lost.clear()
+        self._connection = await self.engine.connect()
+        try:
+            raw = await self._connection.get_raw_connection()
+            self._raw = raw.driver_connection
+            self._raw.add_termination_listener(self._terminated)
+            await self._raw.add_listener(self.channel, self._notified)
+        except BaseException:
+            await self._close_connection()
+            raise
+
+    async def _close_connection(self, invalidate: bool = False):
+        connection, self._connection, self._raw = self._connection, None, None
+        if connection is None:
+            return
+        try:
+            if invalidate:
+                await connection.invalidate()
+            await connection.close()
+        except Exception as e:
+            logger.warning("Failed to close broadcast bus connection", error=str(e))
+
+    def _terminated(self, connection):
+        self._lost.set()
+
+    async def _connection_alive(self) -> bool:
+        try:
+            await asyncio.wait_for(self._raw.fetchval("SELECT 1"), self.CHECK_INTERVAL_SECONDS)
+            return True
+        except Exception:
+            return False
+
+    async def _supervise(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), self.CHECK_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                if await self._connection_alive():
+                    continue
+            logger.warning("Broadcast bus connection lost, reconnecting", channel=self.channel)
+            await self._close_connection(invalidate=True)
+            delay = self.RECONNECT_MIN_SECONDS
+            while True:
+                try:
+                    await self._listen()
+                    break
+                except Exception as e:
+                    logger.error("Broadcast bus reconnect failed", error=str(e), retry_in=delay)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.RECONNECT_MAX_SECONDS)
+            self.reconnects += 1
+            logger.info("Broadcast bus reconnected", channel=self.channel)
+
+    def _notified(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Discarding malformed broadcast notification")
+            return
+        self._deliver(message)
+
+
+def default_bus_directory() -> str:
+    return os.path.join(tempfile.gettempdir(), "service-monitor-bus")
+
+
+def create_broadcast_bus(backend: str, directory: Optional[str] = None, channel: str = "status_updates") -> BroadcastBus:
+    if backend == "memory":
+        return InProcessBus()
+    if backend == "unix":
+        return UnixSocketBus(directory or default_bus_directory())
+    if backend == "postgres":
+        from app.database import engine
+        return PostgresNotifyBus(engine, channel)
+    raise ValueError(f"Unknown broadcast backend: {backend}")
@@ -1,114 +1,505 @@
+import asyncio
 import json
-from typing import Dict, Set
+import time
+import uuid
+from datetime import datetime
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, KeysView, Optional, Set, Union
 from uuid import UUID
 from fastapi import WebSocket
+import msgpack
 import structlog
 
+from app.config import get_settings
+from app.metrics import WS_FANOUT_DURATION
+from app.models.health_check import HealthStatus
+from app.services.status_service import status_cache
+from app.websocket.bus import BroadcastBus, InProcessBus, create_broadcast_bus
+
 logger = structlog.get_logger()
+settings = get_settings()
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+# Close code sent to clients dropped by the "disconnect" policy (Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# WebSocket subprotocol (or ?format= value) selecting msgpack binary frames
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+# Committed results per status_committed bus message, which has to fit in
+# a PostgreSQL NOTIFY payload (8000 bytes)
+COMMITTED_STATUSES_PER_MESSAGE = 25
+
+# Queue key of frames announcing short ids, which later frames depend on
+_IDS_KEY = "\0ids"
+
+
+def _discard(index: Dict[str, Set[WebSocket]], key: str, websocket: WebSocket):
+    """Remove a socket from one subscription set, dropping the set once empty"""
+    sockets = index.get(key)
+    if sockets is None:
+        return
+    sockets.discard(websocket)
+    if not sockets:
+        del index[key]
+
+
+class ReplayBuffer:
+    """The last ``size`` status updates of one topic (a service or an environment).
+
+    ``floor`` is the newest sequence number no longer held: a client that
+    has seen everything up to ``floor`` or later can be caught up from the
+    buffer alone.
+    """
+    __slots__ = ("updates", "floor")
+
+    def __init__(self, size: int, floor: int):
+        self.updates: Deque[dict] = deque(maxlen=size)
+        self.floor = floor
+
+    def append(self, message: dict):
+        if len(self.updates) == self.updates.maxlen:
+            self.floor = self.updates[0]["seq"]
+        self.updates.append(message)
+
+    def since(self, seq: int) -> Optional[list[dict]]:
+        """Updates after ``seq``, or ``None`` if some of them were already evicted"""
+        if seq < self.floor:
+            return None
+        return [message for message in self.updates if message["seq"] > seq]
+
+
+class ConnectionRecord:
+    """A socket's subscriptions plus its outbound queue and writer task.
+
+    Queue entries are ``[coalesce_key, frame]`` pairs holding an already
+    encoded frame (text, or bytes for binary clients), shared by every
+    recipient of the same broadcast. Binary clients also track which short
+    ids they have been told about in ``known_ids``.
+    Clients that opt into batching collect updates in ``pending`` (latest
+    per environment) until the next flush; in delta mode ``last_status``
+    remembers what each environment was last reported as.
+    """
+    __slots__ = (
+        "websocket", "services", "environments", "queue", "ready", "writer", "sent", "dropped",
+        "batch", "delta", "pending", "last_status", "binary", "known_ids"
+    )
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.services: Set[str] = set()
+        self.environments: Set[str] = set()
+        self.queue: Deque[list] = deque()
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.batch = False
+        self.delta = False
+        self.pending: Dict[str, dict] = {}
+        self.last_status: Dict[str, str] = {}
+        self.binary = False
+        self.known_ids: Set[int] = set()
 
 
 class ConnectionManager:
-    def __init__(self):
+    """Tracks WebSocket subscriptions and fans status updates out to them.
+
+    Broadcasts never await a client: each payload is encoded once and
+    appended to the bounded queue of every recipient, and a per-connection
+    writer task drains that queue. When a queue is full the slow consumer
+    policy decides between dropping the oldest frame, replacing a queued
+    frame for the same environment, or disconnecting the client.
+
+    A status update goes to each subscribed connection once, even when it
+    subscribed to both the service and the environment. Connections can
+    opt into ``status_batch`` frames, which merge the updates of a short
+    window, and into delta mode, which only reports status changes.
+
+    Status updates travel through a broadcast bus so that, with several
+    worker processes, every worker fans each update out to its own sockets
+    and refreshes its own status cache.
+
+    Every delivered update is stamped with a sequence number, unique within
+    this worker's ``stream``, and kept in a bounded replay buffer per
+    subscribed topic. A new subscription is answered with a snapshot of
+    the topic's current statuses from the status cache, or, when the
+    client passes the ``stream`` and ``resume_from`` sequence it last saw
+    and the buffer still reaches back that far, with just the updates it
+    missed.
+
+    Clients can negotiate msgpack binary frames instead of JSON. Status
+    updates then become arrays of ``[seq, environment, service, status,
+    response_time_ms, timestamp]`` in which ids are short integers, shared
+    by every connection of this worker; an ``ids`` frame maps new ones to
+    their UUIDs before their first use.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 256,
+        slow_consumer_policy: str = "drop_oldest",
+        send_timeout: float = 10.0,
+        batch_window: float = 0.15,
+        bus: Optional[BroadcastBus] = None,
+        replay_size: int = 64,
+        replay_max_topics: int = 2000
+    ):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.send_timeout = send_timeout
+        self.batch_window = batch_window
+        self.bus = bus or InProcessBus()
+        self.replay_size = replay_size
+        self.replay_max_topics = replay_max_topics
+        # Sequence numbers restart with the process, so they are only
+        # comparable within one stream
+        self.stream = uuid.uuid4().hex
+        self.seq = 0
+        # Topic key (service or environment id) -> recent updates, least recently subscribed first
+        self.replay: OrderedDict[str, ReplayBuffer] = OrderedDict()
+        # Service / environment id -> short id used in binary frames
+        self.short_ids: Dict[str, int] = {}
         # Map of service_id -> set of websocket connections
         self.service_connections: Dict[str, Set[WebSocket]] = {}
         # Map of environment_id -> set of websocket connections
         self.environment_connections: Dict[str, Set[WebSocket]] = {}
-        # All active connections
-        self.active_connections: Set[WebSocket] = set()
+        # All active connections and their subscriptions
+        self.connections: Dict[WebSocket, ConnectionRecord] = {}
+        # Batching connections with updates waiting for the next flush
+        self._batched: Set[ConnectionRecord] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.slow_consumer_disconnects = 0
+
+    @property
+    def active_connections(self) -> KeysView[WebSocket]:
+        return self.connections.keys()
+
+    def stats(self) -> dict:
+        depths = [len(record.queue) for record in self.connections.values()]
+        return {
+            "connections": len(depths),
+            "queued_messages": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "replay_topics": len(self.replay),
+        }
+
+    async def start(self):
+        await self.bus.start(self._on_bus_message)
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.add(websocket)
-        logger.info("WebSocket connected", total_connections=len(self.active_connections))
+    async def stop(self):
+        await self.bus.stop()
+
+    def _record(self, websocket: WebSocket) -> ConnectionRecord:
+        record = self.connections.get(websocket)
+        if record is None:
+            record = self.connections[websocket] = ConnectionRecord(websocket)
+        return record
+
+    async def connect(self, websocket: WebSocket, binary: bool = False, subprotocol: Optional[str] = None):
+        """Accept a socket, optionally switching it to msgpack binary frames"""
+        if subprotocol:
+            await websocket.accept(subprotocol=subprotocol)
+        else:
+            await websocket.accept()
+        record = self._record(websocket)
+        record.binary = binary
+        record.writer = asyncio.create_task(self._write(record))
+        logger.info("WebSocket connected", total_connections=len(self.connections))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+        record = self.connections.pop(websocket, None)
+        if record is None:
+            return
 
-        # Remove from all service subscriptions
-        for service_id in list(self.service_connections.keys()):
-            self.service_connections[service_id].discard(websocket)
-            if not self.service_connections[service_id]:
-                del self.service_connections[service_id]
+        for service_key in record.services:
+            _discard(self.service_connections, service_key, websocket)
+        for env_key in record.environments:
+            _discard(self.environment_connections, env_key, websocket)
 
-        # Remove from all environment subscriptions
-        for env_id in list(self.environment_connections.keys()):
-            self.environment_connections[env_id].discard(websocket)
-            if not self.environment_connections[env_id]:
-                del self.environment_connections[env_id]
+        if record.writer is not None and record.writer is not asyncio.current_task():
+            record.writer.cancel()
+        record.queue.clear()
+        self._batched.discard(record)
 
-        logger.info("WebSocket disconnected", total_connections=len(self.active_connections))
+        logger.info("WebSocket disconnected", total_connections=len(self.connections))
+
+    def configure(self, websocket: WebSocket, batch: bool = False, delta: bool = False):
+        """Switch a connection between per-update frames and batched / delta delivery"""
+        record = self._record(websocket)
+        record.batch = batch
+        record.delta = delta
+        if not batch and record.pending:
+            self._flush_record(record, {})
+            self._batched.discard(record)
+        if not delta:
+            record.last_status.clear()
 
     def subscribe_to_service(self, websocket: WebSocket, service_id: UUID):
         service_key = str(service_id)
-        if service_key not in self.service_connections:
-            self.service_connections[service_key] = set()
-        self.service_connections[service_key].add(websocket)
+        self._record(websocket).services.add(service_key)
+        self.service_connections.setdefault(service_key, set()).add(websocket)
+        self._track(service_key)
         logger.info("Subscribed to service", service_id=service_key)
 
     def subscribe_to_environment(self, websocket: WebSocket, environment_id: UUID):
         env_key = str(environment_id)
-        if env_key not in self.environment_connections:
-            self.environment_connections[env_key] = set()
-        self.environment_connections[env_key].add(websocket)
+        self._record(websocket).environments.add(env_key)
+        self.environment_connections.setdefault(env_key, set()).add(websocket)
+        self._track(env_key)
         logger.info("Subscribed to environment", environment_id=env_key)
 
     def unsubscribe_from_service(self, websocket: WebSocket, service_id: UUID):
         service_key = str(service_id)
-        if service_key in self.service_connections:
-            self.service_connections[service_key].discard(websocket)
+        record = self.connections.get(websocket)
+        if record is not None:
+            record.services.discard(service_key)
+        _discard(self.service_connections, service_key, websocket)
 
     def unsubscribe_from_environment(self, websocket: WebSocket, environment_id: UUID):
         env_key = str(environment_id)
-        if env_key in self.environment_connections:
-            self.environment_connections[env_key].discard(websocket)
+        record = self.connections.get(websocket)
+        if record is not None:
+            record.environments.discard(env_key)
+        _discard(self.environment_connections, env_key, websocket)
 
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
+    def _track(self, key: str):
+        """Start (or keep) buffering updates for a subscribed topic"""
+        if key in self.replay:
+            self.replay.move_to_end(key)
+            return
+        self.replay[key] = ReplayBuffer(self.replay_size, self.seq)
+        if len(self.replay) > self.replay_max_topics:
+            # Evict the least recently subscribed topic nobody watches anymore
+            for stale in self.replay:
+                if stale not in self.service_connections and stale not in self.environment_connections:
+                    del self.replay[stale]
+                    break
+
+    def catch_up_service(
+        self,
+        websocket: WebSocket,
+        service_id: UUID,
+        resume_from: Optional[int] = None,
+        stream: Optional[str] = None
+    ):
+        """Send a new service subscriber what it missed, or the service's current statuses"""
+        service_key = str(service_id)
+        if self._replay(websocket, "service_id", service_key, resume_from, stream):
+            return
+        statuses = [
+            self._snapshot_entry(environment_id, latest)
+            for environment_id, latest in status_cache.for_service(service_id).items()
+        ]
+        self._send_snapshot(websocket, "service_id", service_key, statuses)
+
+    def catch_up_environment(
+        self,
+        websocket: WebSocket,
+        environment_id: UUID,
+        resume_from: Optional[int] = None,
+        stream: Optional[str] = None
+    ):
+        """Send a new environment subscriber what it missed, or the environment's current status"""
+        env_key = str(environment_id)
+        if self._replay(websocket, "environment_id", env_key, resume_from, stream):
+            return
+        latest = status_cache.get(environment_id)
+        statuses = [self._snapshot_entry(environment_id, latest)] if latest is not None else []
+        self._send_snapshot(websocket, "environment_id", env_key, statuses)
+
+    @staticmethod
+    def _snapshot_entry(environment_id: UUID, latest) -> dict:
+        return {
+            "service_id": str(latest.service_id) if latest.service_id else None,
+            "environment_id": str(environment_id),
+            "status": latest.status.value,
+            "response_time_ms": latest.response_time_ms or 0,
+            "timestamp": latest.checked_at.isoformat()
+        }
+
+    def _replay(
+        self,
+        websocket: WebSocket,
+        field: str,
+        key: str,
+        resume_from: Optional[int],
+        stream: Optional[str]
+    ) -> bool:
+        record = self.connections.get(websocket)
+        buffer = self.replay.get(key)
+        if (
+            record is None or buffer is None or not isinstance(resume_from, int)
+            or stream != self.stream or resume_from > self.seq
+        ):
+            return False
+        updates = buffer.since(resume_from)
+        if updates is None:
+            return False
+        self._send_statuses(
+            record, {"type": "replay", field: key, "stream": self.stream, "seq": self.seq}, "updates", updates
+        )
+        return True
+
+    def _send_snapshot(self, websocket: WebSocket, field: str, key: str, statuses: list[dict]):
+        record = self.connections.get(websocket)
+        if record is None:
+            return
+        self._send_statuses(
+            record, {"type": "snapshot", field: key, "stream": self.stream, "seq": self.seq}, "statuses", statuses
+        )
+
+    def _send_statuses(self, record: ConnectionRecord, frame: dict, field: str, statuses: list[dict]):
+        self._remember_statuses(record, statuses)
+        if record.binary:
+            self._introduce(record, statuses)
+            statuses = [self._compact(entry) for entry in statuses]
+        frame[field] = statuses
+        self._enqueue(record, self._encode(record, frame))
+
+    @staticmethod
+    def _encode(record: ConnectionRecord, message) -> Union[str, bytes]:
+        return msgpack.packb(message) if record.binary else json.dumps(message)
+
+    def _short_id(self, key: Optional[str]) -> Optional[int]:
+        if key is None:
+            return None
+        short = self.short_ids.get(key)
+        if short is None:
+            short = self.short_ids[key] = len(self.short_ids) + 1
+        return short
+
+    def _compact(self, update: dict) -> list:
+        """Binary form of a status update or snapshot entry, with short ids"""
+        return [
+            update.get("seq"),
+            self._short_id(update["environment_id"]),
+            self._short_id(update["service_id"]),
+            update["status"],
+            update["response_time_ms"],
+            update["timestamp"]
+        ]
+
+    def _introduce(self, record: ConnectionRecord, updates: Iterable[dict]):
+        """Queue an ``ids`` frame for the short ids a binary client has not been told yet"""
+        new = {}
+        for update in updates:
+            for key in (update["environment_id"], update["service_id"]):
+                short = self._short_id(key)
+                if short is not None and short not in record.known_ids:
+                    record.known_ids.add(short)
+                    new[key] = short
+        if new:
+            self._enqueue(record, msgpack.packb({"type": "ids", "ids": new}), _IDS_KEY)
+
+    @staticmethod
+    def _remember_statuses(record: ConnectionRecord, statuses: list[dict]):
+        # A delta client already knows these, so only later changes are news
+        if record.delta:
+            for entry in statuses:
+                record.last_status[entry["environment_id"]] = entry["status"]
+
+    async def _write(self, record: ConnectionRecord):
+        """Drain one connection's queue; a failed or stalled send drops the client"""
         try:
-            await websocket.send_json(message)
+            while True:
+                while not record.queue:
+                    record.ready.clear()
+                    await record.ready.wait()
+                _, frame = record.queue.popleft()
+                if isinstance(frame, bytes):
+                    await asyncio.wait_for(record.websocket.send_bytes(frame), self.send_timeout)
+                else:
+                    await asyncio.wait_for(record.websocket.send_text(frame), self.send_timeout)
+                record.sent += 1
+                self.messages_sent += 1
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error("Failed to send message", error=str(e))
+            logger.warning("WebSocket send failed, disconnecting", error=str(e) or type(e).__name__)
+            self.disconnect(record.websocket)
 
-    async def broadcast_to_all(self, message: dict):
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
+    def _enqueue(self, record: ConnectionRecord, frame: Union[str, bytes], key: Optional[str] = None):
+        if len(record.queue) >= self.queue_size:
+            if self.slow_consumer_policy == "disconnect":
+                self._drop_slow_consumer(record)
+                return
+            # Ids frames are never superseded: their ids are already marked known
+            if self.slow_consumer_policy == "coalesce" and key is not None and key != _IDS_KEY:
+                for entry in record.queue:
+                    if entry[0] == key:
+                        # Newer state for the same environment supersedes the queued frame
+                        entry[1] = frame
+                        self._count_drop(record)
+                        return
+            # Drop the oldest frame other than an ids frame, which later
+            # frames depend on; a queue of nothing but ids frames may overrun
+            for index, entry in enumerate(record.queue):
+                if entry[0] != _IDS_KEY:
+                    del record.queue[index]
+                    self._count_drop(record)
+                    break
 
-        # Clean up disconnected
-        for conn in disconnected:
-            self.disconnect(conn)
+        record.queue.append([key, frame])
+        record.ready.set()
 
-    async def broadcast_to_service(self, service_id: UUID, message: dict):
-        service_key = str(service_id)
-        if service_key not in self.service_connections:
-            return
+    def _count_drop(self, record: ConnectionRecord):
+        record.dropped += 1
+        self.messages_dropped += 1
+        if record.dropped == 1:
+            logger.warning("WebSocket client falling behind, dropping messages", queue_size=self.queue_size)
 
-        disconnected = set()
-        for connection in self.service_connections[service_key]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
+    def _drop_slow_consumer(self, record: ConnectionRecord):
+        self.slow_consumer_disconnects += 1
+        logger.warning("Disconnecting slow WebSocket client", queue_size=self.queue_size)
+        websocket = record.websocket
+        self.disconnect(websocket)
+        asyncio.create_task(self._close(websocket))
 
-        for conn in disconnected:
-            self.disconnect(conn)
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
 
-    async def broadcast_to_environment(self, environment_id: UUID, message: dict):
-        env_key = str(environment_id)
-        if env_key not in self.environment_connections:
+    def _fan_out(self, websockets: Iterable[WebSocket], message: dict, key: Optional[str] = None):
+        """Encode ``message`` once per format and queue it for every given socket"""
+        encoded: Dict[bool, Union[str, bytes]] = {}
+        for websocket in list(websockets):
+            record = self.connections.get(websocket)
+            if record is not None:
+                if record.binary not in encoded:
+                    encoded[record.binary] = self._encode(record, message)
+                self._enqueue(record, encoded[record.binary], key)
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        record = self.connections.get(websocket)
+        if record is not None and record.writer is not None:
+            # Share the queue so replies stay ordered with broadcasts
+            self._enqueue(record, self._encode(record, message))
             return
+        try:
+            await websocket.send_json(message)
+        except Exception as e:
+            logger.error("Failed to send message", error=str(e))
 
-        disconnected = set()
-        for connection in self.environment_connections[env_key]:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
+    async def broadcast_to_all(self, message: dict):
+        self._fan_out(self.connections, message)
+
+    async def broadcast_to_service(self, service_id: UUID, message: dict):
+        self._fan_out(self.service_connections.get(str(service_id), ()), message, message.get("environment_id"))
 
-        for conn in disconnected:
-            self.disconnect(conn)
+    async def broadcast_to_environment(self, environment_id: UUID, message: dict):
+        self._fan_out(self.environment_connections.get(str(environment_id), ()), message, str(environment_id))
 
     async def broadcast_status_update(
         self,
@@ -127,11 +518,146 @@ class ConnectionManager:
             "timestamp": timestamp
         }
 
-        # Broadcast to service subscribers
-        await self.broadcast_to_service(service_id, message)
-        # Broadcast to environment subscribers
-        await self.broadcast_to_environment(environment_id, message)
+        if self.bus.running:
+            await self.bus.publish(message)
+        else:
+            self._on_bus_message(message)
+
+    async def publish_committed_statuses(self, rows: Iterable[dict], service_ids: Dict[UUID, UUID]):
+        """Hand results the ingestor has committed to the status cache of every other worker.
+
+        Status updates are broadcast before their row is written, so only
+        these messages may change a status cache.
+        """
+        if isinstance(self.bus, InProcessBus) or not self.bus.running:
+            # The ingestor already updated the only cache there is
+            return
+        statuses = [
+            {
+                "environment_id": str(row["environment_id"]),
+                "service_id": str(service_ids[row["environment_id"]]),
+                "status": row["status"].value,
+                "response_time_ms": row["response_time_ms"],
+                "checked_at": row["checked_at"].isoformat()
+            }
+            for row in rows
+        ]
+        for start in range(0, len(statuses), COMMITTED_STATUSES_PER_MESSAGE):
+            await self.bus.publish({
+                "type": "status_committed",
+                "statuses": statuses[start:start + COMMITTED_STATUSES_PER_MESSAGE]
+            })
+
+    async def broadcast_environments_removed(self, environment_ids: Iterable[UUID]):
+        """Evict deleted environments from the status cache of every worker; call once the delete is committed"""
+        environment_ids = list(environment_ids)
+        for environment_id in environment_ids:
+            status_cache.remove(environment_id)
+        if not environment_ids or isinstance(self.bus, InProcessBus) or not self.bus.running:
+            return
+        await self.bus.publish({
+            "type": "environments_removed",
+            "environment_ids": [str(environment_id) for environment_id in environment_ids]
+        })
+
+    def _on_bus_message(self, message: dict):
+        kind = message.get("type")
+        if kind == "status_update":
+            self.deliver_status_update(message)
+        elif kind == "status_committed":
+            for status in message["statuses"]:
+                status_cache.update(
+                    UUID(status["environment_id"]),
+                    HealthStatus(status["status"]),
+                    status["response_time_ms"],
+                    datetime.fromisoformat(status["checked_at"]),
+                    service_id=UUID(status["service_id"])
+                )
+        elif kind == "environments_removed":
+            for environment_id in message["environment_ids"]:
+                status_cache.remove(UUID(environment_id))
+
+    def deliver_status_update(self, message: dict):
+        """Fan a status_update out to this worker's subscribers"""
+        started = time.perf_counter()
+        env_key = message["environment_id"]
+        status = message["status"]
+        self.seq += 1
+        message["seq"] = self.seq
+        for key in (message["service_id"], env_key):
+            buffer = self.replay.get(key)
+            if buffer is not None:
+                buffer.append(message)
+        recipients = set(self.service_connections.get(message["service_id"], ()))
+        recipients.update(self.environment_connections.get(env_key, ()))
+
+        text = packed = None
+        for websocket in recipients:
+            record = self.connections.get(websocket)
+            if record is None:
+                continue
+            if record.batch:
+                record.pending[env_key] = message
+                self._batched.add(record)
+                continue
+            if record.delta and not self._status_changed(record, env_key, status):
+                continue
+            if record.binary:
+                self._introduce(record, (message,))
+                if packed is None:
+                    packed = msgpack.packb(self._compact(message))
+                self._enqueue(record, packed, env_key)
+                continue
+            if text is None:
+                text = json.dumps(message)
+            self._enqueue(record, text, env_key)
+
+        if self._batched and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush_batches)
+        WS_FANOUT_DURATION.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _status_changed(record: ConnectionRecord, env_key: str, status: str) -> bool:
+        if record.last_status.get(env_key) == status:
+            return False
+        record.last_status[env_key] = status
+        return True
+
+    def _flush_batches(self):
+        """Send every batching connection one status_batch frame with its pending updates"""
+        self._flush_handle = None
+        # Connections watching the same environments end up with the same
+        # update objects, so each distinct batch is encoded only once per format
+        encoded: Dict[tuple, Union[str, bytes]] = {}
+        batched, self._batched = self._batched, set()
+        for record in batched:
+            self._flush_record(record, encoded)
+
+    def _flush_record(self, record: ConnectionRecord, encoded: Dict[tuple, str]):
+        updates = [
+            update for env_key, update in record.pending.items()
+            if not record.delta or self._status_changed(record, env_key, update["status"])
+        ]
+        record.pending.clear()
+        if not updates:
+            return
+        if record.binary:
+            self._introduce(record, updates)
+        key = (record.binary, *(id(update) for update in updates))
+        frame = encoded.get(key)
+        if frame is None:
+            batch = [self._compact(update) for update in updates] if record.binary else updates
+            frame = encoded[key] = self._encode(record, {"type": "status_batch", "updates": batch})
+        self._enqueue(record, frame)
 
 
 # Global connection manager instance
-manager = ConnectionManager()
+manager = ConnectionManager(
+    queue_size=settings.ws_send_queue_size,
+    slow_consumer_policy=settings.ws_slow_consumer_policy,
+    send_timeout=settings.ws_send_timeout_seconds,
+    batch_window=settings.ws_batch_window_ms / 1000,
+    bus=create_broadcast_bus(settings.ws_broadcast_backend, settings.ws_broadcast_dir, settings.ws_broadcast_channel),
+    replay_size=settings.ws_replay_buffer_size,
+    replay_max_topics=settings.ws_replay_max_topics
+)
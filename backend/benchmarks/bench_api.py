@@ -0,0 +1,169 @@
+"""In-process API load driver for the listing and history endpoints.
+
+Runs against a database prepared by ``benchmarks.seed_large`` (the same
+``DATABASE_URL``), calling the app through ``httpx.ASGITransport`` so no
+server or network is involved. For each route it reports p50/p99
+latency, requests/second and SQL statements per request, the latter
+from the per-route statement histogram behind ``/metrics``:
+
+    cd backend && python -m benchmarks.bench_api --requests 200 --concurrency 8
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_api --json api.json
+
+The status cache is warmed first, as the app's lifespan does.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'service_monitor_load.db')}"
+)
+
+import structlog  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.database import async_session_maker, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.metrics import DB_QUERY_DURATION  # noqa: E402
+from app.models import Environment, Service, User  # noqa: E402
+from app.services.status_service import status_cache  # noqa: E402
+from app.utils.security import create_access_token  # noqa: E402
+from benchmarks.seed_large import BENCH_EMAIL  # noqa: E402
+
+# (route template used for metrics, path builder from sampled ids)
+ROUTES = {
+    "list_services": ("/api/services", lambda ids: "/api/services"),
+    "list_team_services": ("/api/services", lambda ids: f"/api/services?team_id={ids['team']}"),
+    "service_environments": (
+        "/api/services/{service_id}/environments",
+        lambda ids: f"/api/services/{ids['service']}/environments"
+    ),
+    "environment_history": (
+        "/api/health-checks/environment/{environment_id}",
+        lambda ids: f"/api/health-checks/environment/{ids['environment']}"
+    ),
+}
+
+
+async def sample_ids(count: int) -> tuple[uuid.UUID, list[dict]]:
+    async with async_session_maker() as db:
+        user_id = (await db.execute(select(User.id).where(User.email == BENCH_EMAIL))).scalar_one_or_none()
+        if user_id is None:
+            raise SystemExit("No benchmark user; run python -m benchmarks.seed_large first")
+        environments = (await db.execute(
+            select(Environment.id, Environment.service_id, Service.team_id)
+            .join(Service, Service.id == Environment.service_id)
+            .order_by(func.random())
+            .limit(count)
+        )).all()
+    return user_id, [
+        {"environment": environment_id, "service": service_id, "team": team_id}
+        for environment_id, service_id, team_id in environments
+    ]
+
+
+async def drive(client: AsyncClient, paths: list[str], concurrency: int) -> tuple[float, list[float], int]:
+    queue = list(reversed(paths))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while queue:
+            path = queue.pop()
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def main(args) -> dict:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+    await status_cache.warm()
+    user_id, ids = await sample_ids(args.requests)
+    token = create_access_token({"sub": str(user_id)}, timedelta(hours=1))
+    headers = {"Authorization": f"Bearer {token}"}
+    rng = random.Random(args.requests)
+
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", headers=headers,
+                           timeout=None) as client:
+        for name in args.routes:
+            template, build = ROUTES[name]
+            requests = args.list_requests if name == "list_services" else args.requests
+            paths = [build(rng.choice(ids)) for _ in range(requests)]
+            # Warm connections, caches and statement compilation
+            await drive(client, paths[:args.concurrency], args.concurrency)
+
+            statements_before = DB_QUERY_DURATION.count(template)
+            elapsed, latencies, errors = await drive(client, paths, args.concurrency)
+            statements = DB_QUERY_DURATION.count(template) - statements_before
+            results[name] = {
+                "requests": len(latencies),
+                "errors": errors,
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+                "mean_ms": statistics.fmean(latencies) * 1000,
+                "requests_per_second": len(latencies) / elapsed,
+                "statements_per_request": statements / len(latencies),
+            }
+            row = results[name]
+            print(
+                f"{name:<22} {row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['requests_per_second']:>9.1f}"
+                f" {row['statements_per_request']:>8.2f} {errors:>6}",
+                flush=True
+            )
+
+    async with async_session_maker() as db:
+        counts = {
+            "services": (await db.execute(select(func.count(Service.id)))).scalar_one(),
+            "environments": (await db.execute(select(func.count(Environment.id)))).scalar_one(),
+        }
+    await engine.dispose()
+    return {
+        "benchmark": "api",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "dataset": counts,
+        "config": {key: value for key, value in vars(args).items() if key != "json"},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", nargs="+", choices=list(ROUTES), default=list(ROUTES))
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--list-requests", type=int, default=20,
+                        help="Requests for the unfiltered service list, which returns every service")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", help="Also write the full report as JSON here")
+    args = parser.parse_args()
+
+    print(f"{'route':<22} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9} {'sql/req':>8} {'errors':>6}")
+    report = asyncio.run(main(args))
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
@@ -0,0 +1,83 @@
+"""Measure event loop lag while a burst of logins verifies bcrypt hashes.
+
+Runs the same burst twice: ``inline`` calls bcrypt on the event loop as
+login used to, ``pool`` goes through the bounded password hasher. A probe
+task sleeps for a fixed tick and records how late it wakes up, which is
+what WebSocket delivery and the scheduler experience during the burst:
+
+    cd backend && python -m benchmarks.bench_login_lag --logins 32
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import structlog
+
+from app.services.password_hasher import PasswordHasher
+from app.utils.security import get_password_hash, verify_password
+
+TICK_SECONDS = 0.005
+
+
+async def probe_lag(samples: list[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        samples.append((time.perf_counter() - started - TICK_SECONDS) * 1000)
+
+
+async def burst(verify, logins: int) -> tuple[float, list[float]]:
+    samples: list[float] = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_lag(samples, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe
+    return elapsed, samples
+
+
+def report(name: str, logins: int, elapsed: float, samples: list[float]):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f"  {name:<7} {logins / elapsed:7.1f} logins/s   loop lag p50 {statistics.median(samples):7.1f} ms"
+        f"   p99 {p99:7.1f} ms   max {samples[-1]:7.1f} ms"
+    )
+
+
+async def main(logins: int, workers: int):
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(50))
+    hashed = get_password_hash("correct horse battery staple")
+
+    async def inline():
+        assert verify_password("correct horse battery staple", hashed)
+
+    hasher = PasswordHasher(max_workers=workers, max_pending=logins)
+
+    async def pooled():
+        assert await hasher.verify("correct horse battery staple", hashed)
+
+    print(f"{logins} concurrent logins, {workers} hashing threads")
+    report("inline", logins, *await burst(inline, logins))
+    report("pool", logins, *await burst(pooled, logins))
+    stats = hasher.stats()
+    print(
+        f"  pool hash latency avg {stats['hash_seconds_total'] / stats['completed'] * 1000:.1f} ms,"
+        f" max {stats['hash_seconds_max'] * 1000:.1f} ms,"
+        f" queue wait avg {stats['wait_seconds_total'] / stats['completed'] * 1000:.1f} ms"
+    )
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers))
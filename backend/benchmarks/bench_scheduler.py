@@ -0,0 +1,301 @@
+"""Throughput of the health check pipeline against a local stub target.
+
+Seeds a throwaway database with thousands of environments pointing at
+``benchmarks.stub_target``, then drives the probe pipeline for a while
+and reports checks/second, cycle duration, schedule lag, database write
+rate and memory as JSON, so results can be diffed between releases:
+
+    cd backend && python -m benchmarks.bench_scheduler --environments 5000 --duration 60 --output scheduler.json
+
+``--pipeline scheduler`` (default) runs the background scheduler with
+write-behind ingestion, as the app does. ``--pipeline inline`` runs
+``perform_health_check`` per environment in full passes, one session and
+commit each, as a manual trigger does; each pass is one cycle. Both
+broadcast every result to ``--subscribers`` fake WebSocket clients.
+
+Point ``DATABASE_URL`` at a scratch PostgreSQL database to benchmark there
+instead; its tables are dropped and recreated.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'service_monitor_bench.db')}"
+)
+
+import structlog  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, async_session_maker, engine  # noqa: E402
+from app.metrics import (  # noqa: E402
+    DB_QUERY_DURATION,
+    HEALTH_CHECK_DURATION,
+    HEALTH_CHECK_SCHEDULE_LAG,
+    instrument_engine
+)
+from app.models import Environment, Service, Team  # noqa: E402
+from app.models.environment import EnvironmentType  # noqa: E402
+from app.services.ingestion import ingestor  # noqa: E402
+from app.services.monitor_service import perform_health_check  # noqa: E402
+from app.services.probe_client import probe_client  # noqa: E402
+from app.services.scheduler import HealthCheckScheduler  # noqa: E402
+from app.websocket import manager  # noqa: E402
+from benchmarks.stub_target import StubTarget, add_stub_arguments  # noqa: E402
+
+ENVIRONMENTS_PER_SERVICE = 3
+
+
+class FakeSocket:
+    """Stands in for a WebSocket client; counts frames instead of sending them"""
+
+    def __init__(self):
+        self.frames = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.frames += 1
+
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is missing"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def histogram_summary(histogram) -> dict:
+    """Count, mean and bucket-bound p50/p95/p99 of an unlabelled histogram"""
+    series = histogram._series.get(())
+    if not series or not series[-1]:
+        return {"count": 0}
+    total = series[-1]
+    bounds = histogram.buckets + (float("inf"),)
+    summary = {"count": total, "mean": series[-2] / total}
+    for q in (50, 95, 99):
+        rank, seen = q / 100 * total, 0
+        for bound, count in zip(bounds, series):
+            seen += count
+            if seen >= rank:
+                summary[f"p{q}_le"] = bound if bound != float("inf") else None
+                break
+    return summary
+
+
+async def seed(environments: int, urls: list[str], interval: int, timeout: int) -> list[tuple]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime.utcnow()
+    team_id = uuid.uuid4()
+    services = [
+        {"id": uuid.uuid4(), "name": f"service-{index}", "team_id": team_id, "created_at": now}
+        for index in range((environments + ENVIRONMENTS_PER_SERVICE - 1) // ENVIRONMENTS_PER_SERVICE)
+    ]
+    kinds = list(EnvironmentType)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "name": kinds[index % ENVIRONMENTS_PER_SERVICE],
+            "url": urls[index % len(urls)],
+            "service_id": services[index // ENVIRONMENTS_PER_SERVICE]["id"],
+            "check_interval_seconds": interval,
+            "timeout_seconds": timeout,
+            "created_at": now,
+        }
+        for index in range(environments)
+    ]
+
+    async with async_session_maker() as db:
+        await db.execute(insert(Team), [{"id": team_id, "name": "Bench", "created_at": now}])
+        for offset in range(0, len(services), 5000):
+            await db.execute(insert(Service), services[offset:offset + 5000])
+        for offset in range(0, len(rows), 5000):
+            await db.execute(insert(Environment), rows[offset:offset + 5000])
+        await db.commit()
+
+    return [(row["id"], row["service_id"]) for row in rows]
+
+
+async def connect_subscribers(count: int, service_ids: list) -> list[FakeSocket]:
+    rng = random.Random(count)
+    sockets = []
+    for _ in range(count):
+        socket = FakeSocket()
+        await manager.connect(socket)
+        for service_id in rng.sample(service_ids, min(10, len(service_ids))):
+            manager.subscribe_to_service(socket, service_id)
+        sockets.append(socket)
+    return sockets
+
+
+async def run_scheduler(args, targets: list[tuple]) -> dict:
+    scheduler = HealthCheckScheduler(concurrency=args.concurrency, resync_seconds=3600)
+    ingestor.start()
+    scheduler.start()
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - started
+    checks = scheduler.checks_run
+    # Stopping cancels in-flight probes and flushes what was already ingested
+    await scheduler.stop()
+    await ingestor.stop()
+
+    checks_per_second = checks / elapsed
+    return {
+        "elapsed_seconds": elapsed,
+        "checks": checks,
+        "checks_per_second": checks_per_second,
+        # Time one full pass over every environment takes at the measured rate
+        "cycle_seconds": len(targets) / checks_per_second if checks_per_second else None,
+        "overruns": scheduler.overrun_count,
+        "check_duration_seconds": histogram_summary(HEALTH_CHECK_DURATION),
+        "schedule_lag_seconds": histogram_summary(HEALTH_CHECK_SCHEDULE_LAG),
+        "rows_written": ingestor.rows_written,
+        "rows_written_per_second": ingestor.rows_written / elapsed,
+        "write_batches": ingestor.batches_written,
+    }
+
+
+async def run_inline(args, targets: list[tuple]) -> dict:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    checks = 0
+
+    async def check(environment_id, service_id):
+        nonlocal checks
+        async with semaphore:
+            async with async_session_maker() as db:
+                health_check = await perform_health_check(db, environment_id)
+                await db.commit()
+            checks += 1
+            await manager.broadcast_status_update(
+                service_id=service_id,
+                environment_id=environment_id,
+                status=health_check.status.value,
+                response_time_ms=health_check.response_time_ms or 0,
+                timestamp=health_check.checked_at.isoformat()
+            )
+
+    cycles = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.duration:
+        cycle_started = time.perf_counter()
+        await asyncio.gather(*(check(environment_id, service_id) for environment_id, service_id in targets))
+        cycles.append(time.perf_counter() - cycle_started)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed_seconds": elapsed,
+        "checks": checks,
+        "checks_per_second": checks / elapsed,
+        "cycles": len(cycles),
+        "cycle_seconds": statistics.median(cycles),
+        "cycle_seconds_max": max(cycles),
+        "rows_written": checks,
+        "rows_written_per_second": checks / elapsed,
+        "write_batches": checks,
+    }
+
+
+async def main(args) -> dict:
+    # Per-check logging would dominate the measurement
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(50))
+    instrument_engine(engine)
+
+    stub = StubTarget(
+        ports=args.ports,
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        seed=args.environments
+    )
+    await stub.start()
+    targets = await seed(args.environments, stub.urls, args.interval, args.timeout)
+    service_ids = sorted({service_id for _, service_id in targets})
+
+    probe_client.max_connections = max(probe_client.max_connections, args.concurrency)
+    probe_client.max_connections_per_host = args.per_host
+    await probe_client.start()
+    await manager.start()
+    sockets = await connect_subscribers(args.subscribers, service_ids)
+
+    rss_before = rss_mb()
+    statements_before = DB_QUERY_DURATION.count("background")
+    try:
+        if args.pipeline == "scheduler":
+            results = await run_scheduler(args, targets)
+        else:
+            results = await run_inline(args, targets)
+        # Let writer tasks drain what the last checks queued
+        await asyncio.sleep(0.1)
+    finally:
+        for socket in sockets:
+            manager.disconnect(socket)
+        await manager.stop()
+        await probe_client.stop()
+        await stub.stop()
+        await engine.dispose()
+
+    results.update({
+        "db_statements": DB_QUERY_DURATION.count("background") - statements_before,
+        "stub_requests": stub.requests,
+        "websocket_frames": sum(socket.frames for socket in sockets),
+        "rss_mb_before": round(rss_before, 1),
+        "rss_mb_after": round(rss_mb(), 1),
+        "rss_mb_peak": round(peak_rss_mb(), 1),
+    })
+    results["db_statements_per_second"] = results["db_statements"] / results["elapsed_seconds"]
+    return {
+        "benchmark": "scheduler",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pipeline", choices=("scheduler", "inline"), default="scheduler")
+    parser.add_argument("--environments", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run the pipeline")
+    parser.add_argument("--interval", type=int, default=10, help="check_interval_seconds of every environment")
+    parser.add_argument("--timeout", type=int, default=2, help="timeout_seconds of every environment")
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent probes")
+    parser.add_argument("--per-host", type=int, default=64, help="Concurrent probes per stub port")
+    parser.add_argument("--subscribers", type=int, default=100, help="Fake WebSocket clients, 10 services each")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,122 @@
+"""Compare the rollup-backed stats query with aggregating raw history in Python.
+
+Seeds a throwaway SQLite database with one environment checked once a
+minute, then times both approaches at growing history sizes:
+
+    cd backend && python -m benchmarks.bench_stats --sizes 1000,10000,100000
+
+Point ``DATABASE_URL`` at a scratch PostgreSQL database to benchmark there
+instead; its tables are dropped and recreated.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'service_monitor_bench.db')}"
+)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, async_session_maker, engine  # noqa: E402
+from app.models import Environment, HealthCheck, Service, Team  # noqa: E402
+from app.models.environment import EnvironmentType  # noqa: E402
+from app.models.health_check import HealthStatus  # noqa: E402
+from app.services.monitor_service import ProbeResult, build_health_check_row, get_health_check_history  # noqa: E402
+from app.services.rollup_service import upsert_rollups  # noqa: E402
+from app.services.stats_service import get_health_stats  # noqa: E402
+
+SEED_CHUNK = 5000
+
+
+async def seed(checks: int, end: datetime):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session_maker() as db:
+        team = Team(name="Bench")
+        db.add(team)
+        await db.flush()
+        service = Service(name="Bench", team_id=team.id)
+        db.add(service)
+        await db.flush()
+        environment = Environment(name=EnvironmentType.PRODUCTION, url="http://bench", service_id=service.id)
+        db.add(environment)
+        await db.commit()
+
+    rng = random.Random(checks)
+    start = end - timedelta(minutes=checks)
+    for offset in range(0, checks, SEED_CHUNK):
+        rows = []
+        for minute in range(offset, min(offset + SEED_CHUNK, checks)):
+            status = HealthStatus.DOWN if rng.random() < 0.01 else HealthStatus.HEALTHY
+            probe = ProbeResult(status, int(rng.lognormvariate(5, 0.6)), 200, None)
+            row = build_health_check_row(environment.id, probe)
+            row["checked_at"] = start + timedelta(minutes=minute)
+            rows.append(row)
+        async with async_session_maker() as db:
+            await db.execute(insert(HealthCheck), rows)
+            await upsert_rollups(db, rows)
+            await db.commit()
+
+    return environment.id, start
+
+
+async def naive_stats(environment_id, checks: int) -> dict:
+    """What a client has to do today: fetch raw history and aggregate it"""
+    async with async_session_maker() as db:
+        history = await get_health_check_history(db, environment_id, limit=checks)
+    known = [check for check in history if check.status != HealthStatus.UNKNOWN]
+    latencies = sorted(check.response_time_ms for check in history if check.response_time_ms is not None)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "uptime_percent": 100.0 * sum(check.status != HealthStatus.DOWN for check in known) / len(known),
+        "response_time_p50": quantiles[49],
+        "response_time_p95": quantiles[94],
+        "response_time_p99": quantiles[98],
+    }
+
+
+async def rollup_stats(environment_id, start: datetime, end: datetime) -> dict:
+    async with async_session_maker() as db:
+        _, stats = await get_health_stats(db, [environment_id], start, end)
+    return stats[environment_id].summary()
+
+
+async def timed(factory, repeat: int) -> tuple[float, dict]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await factory()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, result
+
+
+async def main(sizes: list[int], repeat: int):
+    end = datetime(2026, 1, 1)
+    print(f"{'checks':>8} {'naive ms':>10} {'rollup ms':>10} {'speedup':>8}  uptime naive/rollup  p95 naive/rollup")
+    for checks in sizes:
+        environment_id, start = await seed(checks, end)
+        naive_ms, naive = await timed(lambda: naive_stats(environment_id, checks), repeat)
+        rollup_ms, rollup = await timed(lambda: rollup_stats(environment_id, start, end), repeat)
+        print(
+            f"{checks:>8} {naive_ms:>10.1f} {rollup_ms:>10.1f} {naive_ms / rollup_ms:>7.1f}x"
+            f"  {naive['uptime_percent']:.2f}/{rollup['uptime_percent']:.2f}"
+            f"  {naive['response_time_p95']:.0f}/{rollup['response_time_p95']:.0f}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated history sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the median is reported")
+    args = parser.parse_args()
+    asyncio.run(main([int(size) for size in args.sizes.split(",")], args.repeat))
@@ -0,0 +1,78 @@
+"""Time WebSocket disconnects with the per-connection subscription index.
+
+Opens N fake connections, each subscribed to a few of many services and
+environments, then disconnects them all. The ``full scan`` column replays
+the previous algorithm, which visited every subscription key on each
+disconnect:
+
+    cd backend && python -m benchmarks.bench_ws_disconnect --connections 10000
+"""
+import argparse
+import random
+import time
+import uuid
+
+import structlog
+
+from app.websocket.manager import ConnectionManager
+
+
+class FakeSocket:
+    pass
+
+
+def build(connections: int, keys: int, per_connection: int) -> tuple[ConnectionManager, list]:
+    rng = random.Random(connections)
+    service_ids = [uuid.uuid4() for _ in range(keys)]
+    environment_ids = [uuid.uuid4() for _ in range(keys * 3)]
+    manager = ConnectionManager()
+    sockets = []
+    for _ in range(connections):
+        socket = FakeSocket()
+        manager._record(socket)
+        for service_id in rng.sample(service_ids, per_connection):
+            manager.subscribe_to_service(socket, service_id)
+        for environment_id in rng.sample(environment_ids, per_connection):
+            manager.subscribe_to_environment(socket, environment_id)
+        sockets.append(socket)
+    return manager, sockets
+
+
+def full_scan_disconnect(manager: ConnectionManager, websocket):
+    """The pre-index algorithm: walk every key of both maps"""
+    manager.connections.pop(websocket, None)
+    for index in (manager.service_connections, manager.environment_connections):
+        for key in list(index.keys()):
+            index[key].discard(websocket)
+            if not index[key]:
+                del index[key]
+
+
+def measure(disconnect, connections: int, keys: int, per_connection: int) -> float:
+    manager, sockets = build(connections, keys, per_connection)
+    started = time.perf_counter()
+    for socket in sockets:
+        disconnect(manager, socket)
+    elapsed = time.perf_counter() - started
+    assert not manager.service_connections and not manager.environment_connections
+    return elapsed / connections * 1e6
+
+
+def main(connections: int, keys: int, per_connection: int):
+    # Keep per-call logging out of the measurement
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(50))
+
+    indexed = measure(ConnectionManager.disconnect, connections, keys, per_connection)
+    scanned = measure(full_scan_disconnect, connections, keys, per_connection)
+    print(f"{connections} connections, {keys} services, {per_connection} subscriptions of each kind per connection")
+    print(f"  indexed   {indexed:10.1f} us/disconnect")
+    print(f"  full scan {scanned:10.1f} us/disconnect ({scanned / indexed:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--services", type=int, default=2000, help="Distinct services (environments are 3x)")
+    parser.add_argument("--subscriptions", type=int, default=3, help="Services and environments per connection")
+    args = parser.parse_args()
+    main(args.connections, args.services, args.subscriptions)
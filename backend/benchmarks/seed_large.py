@@ -0,0 +1,226 @@
+"""Bulk-generate a large, realistic dataset for API load benchmarks.
+
+Creates teams, services, environments, their latest-status projection
+and a history of health checks spread evenly over ``--days``, all through
+multi-row Core inserts (``COPY`` on PostgreSQL) rather than ORM objects.
+The history index is dropped during the load and rebuilt once at the end.
+A member of every team, ``bench@example.com`` / ``bench``, is created for
+the load driver:
+
+    cd backend && python -m benchmarks.seed_large --services 10000 --checks 1000000
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.seed_large --checks 50000000
+
+Existing tables in the target database are dropped and recreated.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'service_monitor_load.db')}"
+)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, engine  # noqa: E402
+from app.models import Environment, HealthCheck, Service, Team, TeamMember, User  # noqa: E402
+from app.models.environment import EnvironmentType  # noqa: E402
+from app.models.health_check import EnvironmentLatestStatus, HealthStatus  # noqa: E402
+from app.models.user import UserRole  # noqa: E402
+from app.utils.security import get_password_hash  # noqa: E402
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench"
+
+CHUNK = 10000
+
+HISTORY_COLUMNS = (
+    "id", "environment_id", "status", "response_time_ms", "status_code", "error_message", "checked_at"
+)
+
+
+def _chunks(rows: list, size: int = CHUNK):
+    for offset in range(0, len(rows), size):
+        yield rows[offset:offset + size]
+
+
+class CheckGenerator:
+    """Plausible probe results: mostly healthy, occasional slow or failing spells"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def __call__(self, environment_id: uuid.UUID, checked_at: datetime) -> tuple:
+        roll = self.rng.random()
+        if roll < 0.01:
+            return (uuid.uuid4(), environment_id, HealthStatus.DOWN, 10000, None, "Request timed out", checked_at)
+        if roll < 0.02:
+            return (uuid.uuid4(), environment_id, HealthStatus.DOWN, int(self.rng.expovariate(1 / 80)), 503,
+                    "Server error: 503", checked_at)
+        if roll < 0.05:
+            return (uuid.uuid4(), environment_id, HealthStatus.DEGRADED, int(self.rng.uniform(5000, 9000)), 200,
+                    "Slow response time", checked_at)
+        return (uuid.uuid4(), environment_id, HealthStatus.HEALTHY, int(self.rng.lognormvariate(4.5, 0.6)), 200,
+                None, checked_at)
+
+
+async def reset_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_tree(teams: int, services: int, environments_per_service: int, now: datetime) -> list[uuid.UUID]:
+    team_rows = [{"id": uuid.uuid4(), "name": f"team-{index}", "created_at": now} for index in range(teams)]
+    user = {
+        "id": uuid.uuid4(),
+        "email": BENCH_EMAIL,
+        "password_hash": get_password_hash(BENCH_PASSWORD),
+        "full_name": "Load benchmark",
+        "role": UserRole.MEMBER,
+        "created_at": now,
+    }
+    members = [
+        {"id": uuid.uuid4(), "user_id": user["id"], "team_id": team["id"], "role": UserRole.MEMBER, "joined_at": now}
+        for team in team_rows
+    ]
+    service_rows = [
+        {
+            "id": uuid.uuid4(),
+            "name": f"service-{index}",
+            "description": f"Generated service {index}",
+            "url": f"https://service-{index}.example.com",
+            "team_id": team_rows[index % teams]["id"],
+            "created_at": now,
+        }
+        for index in range(services)
+    ]
+    kinds = list(EnvironmentType)
+    environment_rows = [
+        {
+            "id": uuid.uuid4(),
+            "name": kinds[index % len(kinds)],
+            "url": f"https://{kinds[index % len(kinds)].value}.service-{position}.example.com/health",
+            "service_id": service["id"],
+            "check_interval_seconds": 60,
+            "timeout_seconds": 10,
+            "created_at": now,
+        }
+        for position, service in enumerate(service_rows)
+        for index in range(environments_per_service)
+    ]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(Team), team_rows)
+        await conn.execute(insert(User), [user])
+        await conn.execute(insert(TeamMember), members)
+        for rows in _chunks(service_rows):
+            await conn.execute(insert(Service), rows)
+        for rows in _chunks(environment_rows):
+            await conn.execute(insert(Environment), rows)
+
+    return [row["id"] for row in environment_rows]
+
+
+async def write_history(conn, rows: list[tuple]):
+    if conn.dialect.name == "postgresql":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            HealthCheck.__tablename__,
+            records=[row[:2] + (row[2].name,) + row[3:] for row in rows],
+            columns=HISTORY_COLUMNS
+        )
+    else:
+        await conn.execute(insert(HealthCheck), [dict(zip(HISTORY_COLUMNS, row)) for row in rows])
+
+
+async def seed_history(environment_ids: list[uuid.UUID], checks: int, days: float, now: datetime) -> dict:
+    """Insert ``checks`` rows, oldest first, one pass over every environment per time step"""
+    per_environment = max(checks // len(environment_ids), 1)
+    step = timedelta(seconds=days * 86400 / per_environment)
+    start = now - step * per_environment
+    generate = CheckGenerator(checks)
+    latest: dict[uuid.UUID, tuple] = {}
+
+    table = HealthCheck.__table__
+    async with engine.begin() as conn:
+        # One index build at the end is far cheaper than maintaining it per row
+        for index in table.indexes:
+            await conn.run_sync(index.drop)
+
+    written = 0
+    started = time.perf_counter()
+    batch: list[tuple] = []
+    for position in range(per_environment):
+        checked_at = start + step * (position + 1)
+        for environment_id in environment_ids:
+            row = generate(environment_id, checked_at)
+            batch.append(row)
+            latest[environment_id] = row
+            if len(batch) >= CHUNK:
+                async with engine.begin() as conn:
+                    await write_history(conn, batch)
+                written += len(batch)
+                batch = []
+                if written % (CHUNK * 50) == 0:
+                    rate = written / (time.perf_counter() - started)
+                    print(f"  {written:>12,} checks  {rate:>10,.0f} rows/s", flush=True)
+    if batch:
+        async with engine.begin() as conn:
+            await write_history(conn, batch)
+        written += len(batch)
+
+    index_started = time.perf_counter()
+    async with engine.begin() as conn:
+        for index in table.indexes:
+            await conn.run_sync(index.create)
+        for rows in _chunks(list(latest.values())):
+            await conn.execute(insert(EnvironmentLatestStatus), [
+                {
+                    "environment_id": row[1],
+                    "health_check_id": row[0],
+                    "status": row[2],
+                    "response_time_ms": row[3],
+                    "checked_at": row[6],
+                }
+                for row in rows
+            ])
+
+    return {
+        "checks": written,
+        "insert_seconds": index_started - started,
+        "index_seconds": time.perf_counter() - index_started,
+    }
+
+
+async def main(args):
+    now = datetime.utcnow().replace(microsecond=0)
+    started = time.perf_counter()
+    await reset_schema()
+    environment_ids = await seed_tree(args.teams, args.services, args.environments_per_service, now)
+    print(f"{args.teams} teams, {args.services} services, {len(environment_ids)} environments"
+          f" in {time.perf_counter() - started:.1f}s", flush=True)
+
+    history = await seed_history(environment_ids, args.checks, args.days, now)
+    print(
+        f"{history['checks']:,} health checks in {history['insert_seconds']:.1f}s"
+        f" ({history['checks'] / max(history['insert_seconds'], 1e-9):,.0f} rows/s),"
+        f" index rebuilt in {history['index_seconds']:.1f}s"
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, default=100)
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--environments-per-service", type=int, default=3)
+    parser.add_argument("--checks", type=int, default=1000000, help="Total health check rows")
+    parser.add_argument("--days", type=float, default=30.0, help="History span ending now")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""Local HTTP target for probe benchmarks.
+
+A minimal keep-alive HTTP/1.1 server on asyncio streams. Every request is
+answered after a latency drawn from a log-normal distribution; a share of
+requests returns 500 and another share never answers, so probes run into
+their timeout. It listens on several ports because probes are limited per
+host:
+
+    python -m benchmarks.stub_target --ports 4 --latency-ms 50
+"""
+import argparse
+import asyncio
+import math
+import random
+from typing import Optional
+
+_OK = b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\nContent-Length: 2\r\n\r\nok"
+_ERROR = b"HTTP/1.1 500 Internal Server Error\r\nContent-Type: text/plain\r\nContent-Length: 5\r\n\r\nerror"
+
+
+class StubTarget:
+    def __init__(
+        self,
+        ports: int = 4,
+        latency_ms: float = 50.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        hang_seconds: float = 3600.0,
+        seed: Optional[int] = None
+    ):
+        self.ports = ports
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.requests = 0
+        self.urls: list[str] = []
+        self._rng = random.Random(seed)
+        self._servers: list[asyncio.base_events.Server] = []
+
+    async def start(self, host: str = "127.0.0.1"):
+        for _ in range(self.ports):
+            server = await asyncio.start_server(self._handle, host, 0, backlog=1024)
+            port = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+            self.urls.append(f"http://{host}:{port}/health")
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+            # Hanging handlers keep their sockets open; cancel them
+            if hasattr(server, "close_clients"):
+                server.close_clients()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers.clear()
+
+    def _latency(self) -> float:
+        # Log-normal with median latency_ms: mostly near the median, with a long tail
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return self._rng.lognormvariate(math.log(max(self.latency_ms, 0.001)), self.latency_sigma) / 1000
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                self.requests += 1
+
+                roll = self._rng.random()
+                if roll < self.timeout_rate:
+                    await asyncio.sleep(self.hang_seconds)
+                    return
+                await asyncio.sleep(self._latency())
+                writer.write(_ERROR if roll < self.timeout_rate + self.error_rate else _OK)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+async def main(args):
+    stub = StubTarget(args.ports, args.latency_ms, args.latency_sigma, args.error_rate, args.timeout_rate)
+    await stub.start(args.host)
+    for url in stub.urls:
+        print(url)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stub.stop()
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--ports", type=int, default=4, help="Listening ports (probes are limited per host:port)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Median response latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal sigma of the latency; 0 is constant")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Share of requests answered with 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.01, help="Share of requests never answered")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    add_stub_arguments(parser)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
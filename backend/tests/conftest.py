@@ -0,0 +1,39 @@
+import os
+import tempfile
+import pytest
+
+# Point the app at a throwaway SQLite database unless CI provides one
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'service_monitor_test.db')}"
+)
+
+
+@pytest.fixture
+async def db_tables():
+    from app.database import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def environment(db_tables):
+    from app.database import async_session_maker
+    from app.models import Team, Service, Environment
+    from app.models.environment import EnvironmentType
+
+    async with async_session_maker() as db:
+        team = Team(name="Platform")
+        db.add(team)
+        await db.flush()
+        service = Service(name="API", team_id=team.id)
+        db.add(service)
+        await db.flush()
+        environment = Environment(name=EnvironmentType.PRODUCTION, url="http://127.0.0.1:9/health", service_id=service.id)
+        db.add(environment)
+        await db.commit()
+    return environment
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select
+from app.database import async_session_maker, engine
+from app.models.environment import Environment, EnvironmentType
+from app.models.service import Service
+from app.models.user import Team, TeamMember, UserRole
+from app.services.access_service import check_environment_access, membership_cache
+from app.services.auth_service import create_user
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_environment_access_costs_at_most_one_query(db_tables):
+    membership_cache.clear()
+    async with async_session_maker() as db:
+        member = await create_user(db, "member@example.com", "pw")
+        outsider = await create_user(db, "outsider@example.com", "pw")
+        team = Team(name="Team")
+        db.add(team)
+        await db.flush()
+        db.add(TeamMember(user_id=member.id, team_id=team.id, role=UserRole.MEMBER))
+        service = Service(name="svc", team_id=team.id)
+        db.add(service)
+        await db.flush()
+        environment = Environment(name=EnvironmentType.PRODUCTION, url="http://x", service_id=service.id)
+        db.add(environment)
+        await db.commit()
+
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        async with async_session_maker() as db:
+            assert (await check_environment_access(db, member, environment.id)).id == environment.id
+            cold = len(statements)
+            await check_environment_access(db, member, environment.id)
+            warm = len(statements) - cold
+            with pytest.raises(HTTPException) as denied:
+                await check_environment_access(db, outsider, environment.id)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+    assert (cold, warm) == (2, 1)
+    assert denied.value.status_code == 403
+
+    async with async_session_maker() as db:
+        db.add(TeamMember(user_id=outsider.id, team_id=team.id, role=UserRole.MEMBER))
+        await db.commit()
+        assert await check_environment_access(db, outsider, environment.id)
+
+
+@pytest.mark.anyio
+async def test_membership_cache_is_invalidated_on_commit_only(db_tables):
+    membership_cache.clear()
+    async with async_session_maker() as db:
+        member = await create_user(db, "leaving@example.com", "pw")
+        team = Team(name="Team")
+        db.add(team)
+        await db.flush()
+        db.add(TeamMember(user_id=member.id, team_id=team.id, role=UserRole.MEMBER))
+        await db.commit()
+    membership_cache.put(member.id, frozenset({team.id}))
+
+    async with async_session_maker() as db:
+        await db.delete(await db.scalar(select(TeamMember).where(TeamMember.user_id == member.id)))
+        await db.flush()
+        # Not committed yet: other requests still see the membership
+        assert membership_cache.get(member.id) == frozenset({team.id})
+        await db.rollback()
+    assert membership_cache.get(member.id) == frozenset({team.id})
+
+    async with async_session_maker() as db:
+        await db.delete(await db.scalar(select(TeamMember).where(TeamMember.user_id == member.id)))
+        await db.commit()
+    assert membership_cache.get(member.id) is None
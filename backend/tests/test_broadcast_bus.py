@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import socket
+import sys
+import textwrap
+import uuid
+import pytest
+from sqlalchemy import text
+from app.database import engine
+from app.websocket.bus import BroadcastBus, PostgresNotifyBus, UnixSocketBus
+from app.websocket.manager import ConnectionManager
+
+WORKER = textwrap.dedent("""
+    import asyncio, json, sys
+    import structlog
+    from app.websocket.bus import UnixSocketBus
+
+    structlog.configure(logger_factory=structlog.PrintLoggerFactory(sys.stderr))
+
+    async def main():
+        received = asyncio.get_running_loop().create_future()
+        bus = UnixSocketBus(sys.argv[1])
+        await bus.start(lambda message: received.done() or received.set_result(message))
+        print("ready", flush=True)
+        print(json.dumps(await asyncio.wait_for(received, 5)), flush=True)
+        await bus.stop()
+
+    asyncio.run(main())
+""")
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent: list[str] = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.sent.append(text)
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_update_published_on_one_worker_reaches_sockets_on_another(tmp_path):
+    publisher = ConnectionManager(bus=UnixSocketBus(str(tmp_path)))
+    subscriber = ConnectionManager(bus=UnixSocketBus(str(tmp_path)))
+    await publisher.start()
+    await subscriber.start()
+    service_id, environment_id = uuid.uuid4(), uuid.uuid4()
+    local, remote = RecordingSocket(), RecordingSocket()
+    for manager, websocket in ((publisher, local), (subscriber, remote)):
+        await manager.connect(websocket)
+        manager.subscribe_to_service(websocket, service_id)
+
+    try:
+        await publisher.broadcast_status_update(service_id, environment_id, "down", 0, "2026-10-16T12:00:00")
+        await asyncio.sleep(0.05)
+    finally:
+        for manager, websocket in ((publisher, local), (subscriber, remote)):
+            manager.disconnect(websocket)
+            await manager.stop()
+
+    assert len(local.sent) == 1
+    assert len(remote.sent) == 1
+    assert json.loads(remote.sent[0])["environment_id"] == str(environment_id)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.anyio
+async def test_unix_bus_delivers_to_worker_process_and_prunes_dead_peers(tmp_path):
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(str(tmp_path / "dead.sock"))
+    dead.close()
+
+    worker = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", WORKER, str(tmp_path),
+        stdout=asyncio.subprocess.PIPE,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    assert (await asyncio.wait_for(worker.stdout.readline(), 10)).strip() == b"ready"
+
+    bus = UnixSocketBus(str(tmp_path))
+    await bus.start(lambda message: None)
+    try:
+        await bus.publish({"type": "status_update", "status": "down"})
+        line = await asyncio.wait_for(worker.stdout.readline(), 10)
+    finally:
+        await bus.stop()
+        await worker.wait()
+
+    assert json.loads(line) == {"type": "status_update", "status": "down"}
+    assert not (tmp_path / "dead.sock").exists()
+
+
+@pytest.mark.anyio
+async def test_unix_bus_creates_a_private_directory(tmp_path):
+    directory = tmp_path / "bus"
+    bus = UnixSocketBus(str(directory))
+    await bus.start(lambda message: None)
+    try:
+        assert directory.stat().st_mode & 0o777 == 0o700
+        assert os.stat(bus.path).st_mode & 0o777 == 0o600
+    finally:
+        await bus.stop()
+
+
+@pytest.mark.anyio
+async def test_unix_bus_refuses_a_directory_others_can_write_to(tmp_path):
+    directory = tmp_path / "bus"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    with pytest.raises(RuntimeError, match="writable by other users"):
+        await UnixSocketBus(str(directory)).start(lambda message: None)
+    assert os.listdir(directory) == []
+
+
+@pytest.mark.anyio
+@pytest.mark.skipif(engine.dialect.name != "postgresql", reason="LISTEN/NOTIFY needs PostgreSQL")
+async def test_postgres_bus_reconnects_after_its_connection_is_killed():
+    received = []
+    bus = PostgresNotifyBus(engine, "test_bus_reconnect")
+    bus.RECONNECT_MIN_SECONDS = 0.05
+    await bus.start(received.append)
+    try:
+        listener_pid = bus._raw.get_server_pid()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT pg_terminate_backend(:pid)"), {"pid": listener_pid})
+        for _ in range(100):
+            if bus.reconnects:
+                break
+            await asyncio.sleep(0.05)
+        assert bus.reconnects == 1
+
+        await bus.publish({"type": "status_update"})
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.05)
+        assert received == [{"type": "status_update"}]
+    finally:
+        await bus.stop()
+        await engine.dispose()
+
+
+def test_backend_without_publish_cannot_be_constructed():
+    class Incomplete(BroadcastBus):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
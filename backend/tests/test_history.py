@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from sqlalchemy import insert
+from app.database import async_session_maker
+from app.models.health_check import HealthCheck, HealthStatus
+from app.services.history_service import decode_history_cursor, encode_history_cursor, stream_health_check_export
+from app.services.monitor_service import ProbeResult, build_health_check_row, get_health_check_history
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def insert_checks(environment_id, count, start):
+    rows = []
+    for i in range(count):
+        row = build_health_check_row(environment_id, ProbeResult(HealthStatus.HEALTHY, 100 + i, 200, None))
+        # Pairs share a timestamp so pages must break ties on id
+        row["checked_at"] = start + timedelta(seconds=i // 2)
+        rows.append(row)
+    async with async_session_maker() as db:
+        await db.execute(insert(HealthCheck), rows)
+        await db.commit()
+    return rows
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    checked_at, health_check_id = datetime(2026, 10, 16, 12, 0, 0, 123456), uuid4()
+
+    assert decode_history_cursor(encode_history_cursor(checked_at, health_check_id)) == (checked_at, health_check_id)
+    with pytest.raises(ValueError):
+        decode_history_cursor("not-a-cursor")
+
+
+@pytest.mark.anyio
+async def test_keyset_pages_cover_history_without_gaps(environment):
+    rows = await insert_checks(environment.id, 11, datetime(2026, 10, 16, 12, 0))
+
+    seen, before = [], None
+    async with async_session_maker() as db:
+        while True:
+            page = await get_health_check_history(db, environment.id, 4, before)
+            seen.extend(page)
+            if len(page) < 4:
+                break
+            before = (page[-1].checked_at, page[-1].id)
+
+    assert len(seen) == len(rows)
+    assert len({check.id for check in seen}) == len(rows)
+    keys = [(check.checked_at, str(check.id)) for check in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.anyio
+async def test_export_streams_ndjson_and_csv(environment):
+    start = datetime(2026, 10, 16, 12, 0)
+    await insert_checks(environment.id, 6, start)
+
+    lines = [line async for line in stream_health_check_export(environment.id, "ndjson", start=start + timedelta(seconds=1))]
+    records = [json.loads(line) for line in lines]
+    assert [record["checked_at"] for record in records] == sorted(record["checked_at"] for record in records)
+    assert sorted(record["response_time_ms"] for record in records) == [102, 103, 104, 105]
+    assert records[0]["status"] == "healthy"
+
+    chunks = [chunk async for chunk in stream_health_check_export(environment.id, "csv", yield_per=2)]
+    rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(rows) == 6
+    assert rows[0]["environment_id"] == str(environment.id)
@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import select, func
+from app.database import async_session_maker
+from app.models.health_check import HealthCheck, HealthStatus
+from app.services import ingestion
+from app.services.ingestion import HealthCheckIngestor
+from app.services.monitor_service import ProbeResult, build_health_check_row
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def count_health_checks() -> int:
+    async with async_session_maker() as db:
+        result = await db.execute(select(func.count(HealthCheck.id)))
+        return result.scalar_one()
+
+
+def make_row(environment_id):
+    return build_health_check_row(environment_id, ProbeResult(HealthStatus.HEALTHY, 12, 200, None))
+
+
+@pytest.mark.anyio
+async def test_rows_are_written_in_batches_and_drained_on_stop(environment):
+    ingestor = HealthCheckIngestor(batch_size=500, flush_interval=60, max_pending=5000)
+    ingestor.start()
+
+    for _ in range(1200):
+        await ingestor.submit(make_row(environment.id))
+    await ingestor.stop()
+
+    assert await count_health_checks() == 1200
+    assert ingestor.rows_written == 1200
+    assert ingestor.batches_written == 3
+
+
+@pytest.mark.anyio
+async def test_partial_batch_flushes_after_interval(environment):
+    ingestor = HealthCheckIngestor(batch_size=500, flush_interval=0.05, max_pending=100)
+    ingestor.start()
+
+    await ingestor.submit(make_row(environment.id))
+    await asyncio.sleep(0.3)
+
+    assert await count_health_checks() == 1
+    await ingestor.stop()
+
+
+@pytest.mark.anyio
+async def test_submit_blocks_while_database_is_slow(environment):
+    ingestor = HealthCheckIngestor(batch_size=1, flush_interval=60, max_pending=2)
+    database_ready = asyncio.Event()
+    write = ingestor._write
+
+    async def slow_write(batch):
+        await database_ready.wait()
+        await write(batch)
+
+    ingestor._write = slow_write
+    ingestor.start()
+
+    # The writer takes the first row and stalls; the next two fill the buffer
+    for _ in range(3):
+        await ingestor.submit(make_row(environment.id))
+        await asyncio.sleep(0)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(ingestor.submit(make_row(environment.id)), timeout=0.1)
+
+    database_ready.set()
+    await ingestor.stop()
+    assert await count_health_checks() == 3
+
+
+@pytest.mark.anyio
+async def test_rows_of_deleted_environments_do_not_sink_the_batch(environment):
+    ingestor = HealthCheckIngestor(batch_size=10, flush_interval=60, max_pending=100)
+    ingestor.start()
+
+    await ingestor.submit(make_row(uuid.uuid4()))
+    await ingestor.submit(make_row(environment.id))
+    await ingestor.stop()
+
+    assert await count_health_checks() == 1
+    assert (ingestor.rows_written, ingestor.rows_discarded, ingestor.rows_dropped) == (1, 1, 0)
+
+
+@pytest.mark.anyio
+async def test_committed_statuses_are_published_with_their_service(environment, monkeypatch):
+    published = []
+
+    async def publish(rows, service_ids):
+        published.append(([row["environment_id"] for row in rows], service_ids))
+
+    monkeypatch.setattr(ingestion.manager, "publish_committed_statuses", publish)
+    ingestor = HealthCheckIngestor(batch_size=10, flush_interval=60, max_pending=100)
+    await ingestor._write([make_row(environment.id), make_row(uuid.uuid4())])
+
+    assert published == [([environment.id], {environment.id: environment.service_id})]
@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.metrics import DB_QUERY_DURATION, HTTP_REQUEST_DURATION, MetricsRegistry
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, "/a")
+
+    lines = registry.render().splitlines()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+@pytest.mark.anyio
+async def test_requests_and_their_queries_are_labelled_by_route_template(db_tables):
+    route = "/api/auth/login"
+    requests_before = HTTP_REQUEST_DURATION.count("POST", route, "401")
+    queries_before = DB_QUERY_DURATION.count(route)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post(route, json={"email": "nobody@example.com", "password": "pw"})
+        response = await client.get("/metrics")
+
+    assert HTTP_REQUEST_DURATION.count("POST", route, "401") == requests_before + 1
+    assert DB_QUERY_DURATION.count(route) == queries_before + 1
+    assert response.status_code == 200
+    assert "websocket_connections 0" in response.text
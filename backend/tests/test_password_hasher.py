@@ -0,0 +1,54 @@
+import asyncio
+import time
+import pytest
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_hash_and_verify_run_off_the_event_loop():
+    hasher = PasswordHasher(max_workers=2, max_pending=4)
+    hashed = await hasher.hash("secret")
+
+    assert await hasher.verify("secret", hashed)
+    assert not await hasher.verify("wrong", hashed)
+    assert hasher.stats()["completed"] == 3
+    assert hasher.pending == 0
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_saturated_hasher_rejects_instead_of_queueing():
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    running = asyncio.create_task(hasher.hash("first"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("second")
+
+    await running
+    assert hasher.rejected == 1
+    hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_keeps_its_job_counted_until_it_finishes():
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    caller = asyncio.create_task(hasher._run(time.sleep, 0.2))
+    await asyncio.sleep(0.05)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    # The bcrypt thread is still busy, so new work is still shed
+    assert hasher.pending == 1
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("second")
+
+    await asyncio.sleep(0.3)
+    assert hasher.pending == 0
+    hasher.shutdown()
@@ -0,0 +1,159 @@
+import asyncio
+import pytest
+from sqlalchemy import update
+from app.database import async_session_maker
+from app.metrics import PROBE_LATENCY
+from app.models.environment import Environment
+from app.models.health_check import HealthStatus
+from app.services import monitor_service
+from app.services.monitor_service import ProbeResult, check_endpoint_health
+from app.services.probe_client import ProbeClientManager
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def _start_stub_server(status_code: int = 200):
+    """Minimal keep-alive HTTP/1.1 server counting accepted connections"""
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                # Stops once the client closes the connection
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(
+                    f"HTTP/1.1 {status_code} X\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok".encode()
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/health", connections
+
+
+@pytest.fixture
+async def probe_client(monkeypatch):
+    client = ProbeClientManager(
+        max_connections=10,
+        max_keepalive_connections=10,
+        keepalive_expiry=30.0,
+        max_connections_per_host=2
+    )
+    await client.start()
+    monkeypatch.setattr(monitor_service, "probe_client", client)
+    yield client
+    await client.stop()
+
+
+@pytest.mark.anyio
+async def test_probes_reuse_pooled_connection(probe_client):
+    server, url, connections = await _start_stub_server()
+    async with server:
+        for _ in range(3):
+            result = await check_endpoint_health(url)
+            assert result.status == HealthStatus.HEALTHY
+        # Since Python 3.12.1 leaving the server context waits for open
+        # connections, so release the pooled keep-alive one first
+        await probe_client.stop()
+
+    assert len(connections) == 1
+
+
+@pytest.mark.anyio
+async def test_split_latency_mode_reports_cold_and_warm(probe_client, monkeypatch):
+    monkeypatch.setattr(monitor_service.settings, "probe_latency_mode", "split")
+    server, url, _ = await _start_stub_server()
+    async with server:
+        cold = await check_endpoint_health(url)
+        warm = await check_endpoint_health(url)
+        await probe_client.stop()
+
+    assert cold.connect_time_ms is not None
+    assert warm.connect_time_ms == 0
+
+
+@pytest.mark.anyio
+async def test_split_latency_mode_keeps_connect_time_on_timeout(probe_client, monkeypatch):
+    monkeypatch.setattr(monitor_service.settings, "probe_latency_mode", "split")
+
+    async def never_respond(reader, writer):
+        await reader.read()
+        writer.close()
+
+    server = await asyncio.start_server(never_respond, "127.0.0.1", 0)
+    url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/health"
+    async with server:
+        result = await check_endpoint_health(url, timeout=0.2)
+        await probe_client.stop()
+
+    assert result.status == HealthStatus.DOWN
+    assert result.connect_time_ms is not None
+    assert result.response_time_ms + result.connect_time_ms == 200
+
+@pytest.mark.anyio
+async def test_server_error_is_down(probe_client):
+    server, url, _ = await _start_stub_server(status_code=503)
+    async with server:
+        result = await check_endpoint_health(url)
+        await probe_client.stop()
+
+    assert result.status == HealthStatus.DOWN
+    assert result.status_code == 503
+
+
+@pytest.mark.anyio
+async def test_host_slot_is_shared_per_host(probe_client):
+    first = probe_client.host_slot("http://example.com/a")
+    second = probe_client.host_slot("http://example.com/b")
+    other = probe_client.host_slot("http://example.org/")
+
+    assert first is second
+    assert first is not other
+
+
+@pytest.mark.anyio
+async def test_malformed_url_is_down(probe_client):
+    result = await check_endpoint_health("http://exa mple.com:notaport/health")
+
+    assert result.status == HealthStatus.DOWN
+    assert result.error_message.startswith("Invalid URL")
+
+
+@pytest.mark.anyio
+async def test_idle_host_slots_are_evicted_beyond_the_limit(probe_client):
+    probe_client.max_tracked_hosts = 2
+    busy = probe_client.host_slot("http://busy.example/")
+    async with probe_client.host_limit("http://busy.example/"):
+        for i in range(5):
+            probe_client.host_slot(f"http://host{i}.example/")
+
+        assert len(probe_client._host_slots) == 2
+        assert probe_client.host_slot("http://busy.example/") is busy
+
+
+@pytest.mark.anyio
+async def test_triggered_check_uses_the_environment_timeout(environment, monkeypatch):
+    timeouts = []
+
+    async def probe(url, timeout=10.0):
+        timeouts.append(timeout)
+        return ProbeResult(HealthStatus.HEALTHY, 5, 200, None)
+
+    monkeypatch.setattr(monitor_service, "check_endpoint_health", probe)
+    observed = PROBE_LATENCY.count("healthy")
+    async with async_session_maker() as db:
+        await db.execute(update(Environment).where(Environment.id == environment.id).values(timeout_seconds=3))
+        await monitor_service.perform_health_check(db, environment.id)
+
+    assert timeouts == [3]
+    # Latency series are per outcome, never per environment
+    assert PROBE_LATENCY.count("healthy") == observed + 1
+    assert PROBE_LATENCY.count(str(environment.id)) == 0
@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime
+import pytest
+from sqlalchemy import event
+from app.database import engine
+from app.services.monitor_service import health_check_history_query, latest_health_check_query
+
+INDEX_NAME = "ix_health_checks_environment_checked_at_id"
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+async def explain(statement) -> str:
+    """Run ``statement`` under EXPLAIN and return the plan as text"""
+    dialect = engine.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    plan = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        return prefix + statement, parameters
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        plan.extend(" ".join(str(col) for col in row) for row in cursor.fetchall())
+
+    async with engine.connect() as conn:
+        if dialect == "postgresql":
+            # An empty test table would otherwise always be seq-scanned
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        event.listen(conn.sync_connection, "before_cursor_execute", before_cursor_execute, retval=True)
+        event.listen(conn.sync_connection, "after_cursor_execute", after_cursor_execute)
+        try:
+            await conn.execute(statement)
+        finally:
+            event.remove(conn.sync_connection, "before_cursor_execute", before_cursor_execute)
+            event.remove(conn.sync_connection, "after_cursor_execute", after_cursor_execute)
+
+    return "\n".join(plan)
+
+
+@pytest.mark.anyio
+async def test_latest_query_uses_environment_index(db_tables):
+    plan = await explain(latest_health_check_query(uuid.uuid4()))
+
+    assert INDEX_NAME in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.anyio
+async def test_history_query_uses_environment_index(db_tables):
+    plan = await explain(health_check_history_query(uuid.uuid4(), 100))
+
+    assert INDEX_NAME in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.anyio
+async def test_history_page_query_uses_environment_index(db_tables):
+    plan = await explain(health_check_history_query(uuid.uuid4(), 100, before=(datetime.utcnow(), uuid.uuid4())))
+
+    assert INDEX_NAME in plan
+    assert "TEMP B-TREE" not in plan
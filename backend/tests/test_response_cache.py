@@ -0,0 +1,66 @@
+from datetime import datetime
+from uuid import UUID
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.metrics import DB_QUERY_DURATION
+from app.models.health_check import HealthStatus
+from app.services.response_cache import etag_matches, make_etag, service_list_cache
+from app.services.status_service import status_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_service_listing_is_revalidated_with_etags(db_tables):
+    service_list_cache.invalidate()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/api/auth/register", json={"email": "etag@example.com", "password": "pw"})
+        login = await client.post("/api/auth/login", json={"email": "etag@example.com", "password": "pw"})
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        team = (await client.post("/api/teams", json={"name": "Team"})).json()
+        service = (await client.post("/api/services", json={"name": "API", "team_id": team["id"]})).json()
+        path = f"/api/services?team_id={team['id']}"
+
+        first = await client.get(path)
+        etag = first.headers["etag"]
+        queries = DB_QUERY_DURATION.count("/api/services")
+        unchanged = await client.get(path, headers={"If-None-Match": etag})
+
+        assert first.status_code == 200 and first.json()["total"] == 1
+        assert unchanged.status_code == 304 and unchanged.headers["etag"] == etag
+        assert DB_QUERY_DURATION.count("/api/services") == queries
+
+        environment = (await client.post(
+            f"/api/services/{service['id']}/environments",
+            json={"name": "production", "url": "http://127.0.0.1:9/health"}
+        )).json()
+        added = await client.get(path, headers={"If-None-Match": etag})
+
+        assert added.status_code == 200 and added.headers["etag"] != etag
+        etag = added.headers["etag"]
+
+        status_cache.update(
+            UUID(environment["id"]), HealthStatus.DOWN, 5, datetime.utcnow(), service_id=UUID(service["id"])
+        )
+        status_cache.warmed = True
+        try:
+            checked = await client.get(path, headers={"If-None-Match": etag})
+        finally:
+            status_cache.clear()
+
+        assert checked.status_code == 200
+        assert checked.json()["services"][0]["environments"][0]["current_status"] == "down"
+
+
+def test_if_none_match_uses_weak_comparison_and_wildcard():
+    etag = make_etag(b"body")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other", W/"else"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event, func, select
+from app.database import async_session_maker, engine
+from app.models.health_check import HealthCheck, HealthCheckRollup, HealthStatus
+from app.services.monitor_service import ProbeResult, build_health_check_row
+from app.services.retention import RETENTION_OWNER_KEY, RetentionManager
+from app.services.rollup_service import upsert_rollups
+from app.services.sharding import WorkerMembership, owner_of
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_purge_removes_only_expired_rows_in_batches(environment):
+    now = datetime(2026, 10, 16, 12, 0)
+    rows = []
+    for age_hours in range(0, 24 * 10, 6):
+        row = build_health_check_row(environment.id, ProbeResult(HealthStatus.HEALTHY, 50, 200, None))
+        row["checked_at"] = now - timedelta(hours=age_hours)
+        rows.append(row)
+    expired = sum(1 for row in rows if row["checked_at"] < now - timedelta(days=7))
+
+    async with async_session_maker() as db:
+        await db.execute(HealthCheck.__table__.insert(), rows)
+        await upsert_rollups(db, rows)
+        await db.commit()
+
+    retention = RetentionManager(
+        raw_days=7,
+        rollup_days={"1m": 2},
+        batch_size=4,
+        batch_pause=0,
+        interval_seconds=3600
+    )
+    report = await retention.purge(now=now)
+
+    async with async_session_maker() as db:
+        remaining = (await db.execute(select(func.count(HealthCheck.id)))).scalar_one()
+        oldest_minute = (await db.execute(
+            select(func.min(HealthCheckRollup.bucket_start)).where(HealthCheckRollup.bucket_seconds == 60)
+        )).scalar_one()
+        hour_rollups = (await db.execute(
+            select(func.count()).select_from(HealthCheckRollup).where(HealthCheckRollup.bucket_seconds == 3600)
+        )).scalar_one()
+
+    assert report["health_checks"] == expired
+    assert remaining == len(rows) - expired
+    assert oldest_minute >= now - timedelta(days=2)
+    # No window configured for 1h rollups, so they are all kept
+    assert hour_rollups == len(rows)
+
+
+@pytest.mark.anyio
+async def test_environments_with_nothing_expired_cost_no_deletes(environment):
+    now = datetime(2026, 10, 16, 12, 0)
+    row = build_health_check_row(environment.id, ProbeResult(HealthStatus.HEALTHY, 50, 200, None))
+    row["checked_at"] = now - timedelta(hours=1)
+    async with async_session_maker() as db:
+        await db.execute(HealthCheck.__table__.insert(), [row])
+        await upsert_rollups(db, [row])
+        await db.commit()
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    retention = RetentionManager(
+        raw_days=7, rollup_days={"1m": 7, "1h": 365, "1d": 365}, batch_size=100, batch_pause=0, interval_seconds=3600
+    )
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        report = await retention.purge(now=now)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert report["health_checks"] == report["health_check_rollups"] == 0
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith("DELETE")]
+    # One probe for raw checks plus one per rollup level and table
+    assert len([statement for statement in statements if "EXISTS" in statement.upper()]) == 7
+
+
+@pytest.mark.anyio
+async def test_only_the_elected_worker_purges(db_tables):
+    workers = ("worker-1", "worker-2")
+    purged_by = []
+    for worker_id in workers:
+        membership = WorkerMembership(heartbeat_seconds=10, ttl_seconds=30, worker_id=worker_id)
+        await membership.heartbeat()
+        membership.workers = workers
+        retention = RetentionManager(
+            raw_days=7, rollup_days={}, batch_size=100, batch_pause=0, interval_seconds=3600, membership=membership
+        )
+
+        async def purge(worker_id=worker_id):
+            purged_by.append(worker_id)
+
+        retention.purge = purge
+        retention.start()
+        await asyncio.sleep(0.01)
+        await retention.stop()
+
+    assert purged_by == [owner_of(RETENTION_OWNER_KEY, workers)]
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+import pytest
+from app.database import async_session_maker
+from app.models.health_check import HealthStatus
+from app.services.monitor_service import ProbeResult, build_health_check_row
+from app.services.rollup_service import choose_resolution, get_rollups, upsert_rollups
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def make_row(environment_id, status, response_time_ms, checked_at, error_message=None):
+    row = build_health_check_row(environment_id, ProbeResult(status, response_time_ms, 200, error_message))
+    row["checked_at"] = checked_at
+    return row
+
+
+@pytest.mark.anyio
+async def test_rollups_merge_across_batches(environment):
+    minute = datetime(2026, 10, 16, 12, 30)
+    first_batch = [
+        make_row(environment.id, HealthStatus.HEALTHY, 120, minute + timedelta(seconds=5)),
+        make_row(environment.id, HealthStatus.DOWN, 900, minute + timedelta(seconds=20), "Server error: 503"),
+    ]
+    second_batch = [
+        make_row(environment.id, HealthStatus.HEALTHY, 60, minute + timedelta(seconds=40)),
+        make_row(environment.id, HealthStatus.DEGRADED, 300, minute + timedelta(minutes=1, seconds=10)),
+    ]
+
+    async with async_session_maker() as db:
+        await upsert_rollups(db, first_batch)
+        await upsert_rollups(db, second_batch)
+        await db.commit()
+
+    async with async_session_maker() as db:
+        _, minutes = await get_rollups(db, environment.id, minute, minute + timedelta(minutes=2), resolution="1m")
+        _, hours = await get_rollups(db, environment.id, minute, minute + timedelta(minutes=2), resolution="1h")
+
+    assert [m.bucket_start for m in minutes] == [minute, minute + timedelta(minutes=1)]
+    first = minutes[0]
+    assert (first.healthy_count, first.down_count, first.error_count) == (2, 1, 1)
+    assert (first.response_time_min, first.response_time_max, first.response_time_sum) == (60, 900, 1080)
+
+    assert len(hours) == 1
+    assert hours[0].healthy_count + hours[0].degraded_count + hours[0].down_count == 4
+
+
+def test_choose_resolution_respects_point_budget():
+    end = datetime(2026, 10, 16)
+
+    assert choose_resolution(end - timedelta(hours=2), end, 200, now=end) == "1m"
+    assert choose_resolution(end - timedelta(days=7), end, 200, now=end) == "1h"
+    assert choose_resolution(end - timedelta(days=30), end, 200, now=end) == "1d"
+    assert choose_resolution(end - timedelta(days=3650), end, 200, now=end) == "1d"
+
+
+def test_choose_resolution_skips_expired_resolutions():
+    end = datetime(2026, 10, 16)
+    start = end - timedelta(hours=2)
+
+    # 1m rollups are only kept for 30 days, so an old two-hour window uses 1h
+    assert choose_resolution(start, end, 200, now=end + timedelta(days=60)) == "1h"
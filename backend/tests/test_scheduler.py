@@ -0,0 +1,138 @@
+import asyncio
+import time
+import uuid
+import pytest
+from sqlalchemy import update
+from app.database import async_session_maker
+from app.models.environment import Environment
+from app.models.health_check import HealthStatus
+from app.services.monitor_service import ProbeResult
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import HealthCheckScheduler, ScheduledCheck, jitter_offset
+
+
+def make_scheduler() -> HealthCheckScheduler:
+    return HealthCheckScheduler(concurrency=4, resync_seconds=300)
+
+
+def test_jitter_is_deterministic_and_within_interval():
+    env_id = uuid.uuid4()
+    offset = jitter_offset(env_id, 60)
+
+    assert offset == jitter_offset(env_id, 60)
+    assert 0 <= offset < 60
+
+
+def test_jitter_spreads_environments_across_interval():
+    offsets = [jitter_offset(uuid.uuid4(), 60) for _ in range(600)]
+    buckets = {int(offset // 10) for offset in offsets}
+
+    assert buckets == set(range(6))
+
+
+def test_next_runs_stay_on_phase_without_drift():
+    scheduler = make_scheduler()
+    env_id = uuid.uuid4()
+    scheduler.schedule(env_id, uuid.uuid4(), "http://a", 30, 5, now=1000.0)
+    first = scheduler.next_due()
+
+    # Dispatching late must not shift later slots
+    due = scheduler.pop_due(first + 7.5)
+    assert [entry.environment_id for entry, _ in due] == [env_id]
+    assert scheduler.next_due() == first + 30
+
+
+def test_missed_slots_are_skipped_and_counted():
+    scheduler = make_scheduler()
+    scheduler.schedule(uuid.uuid4(), uuid.uuid4(), "http://a", 10, 5, now=0.0)
+    first = scheduler.next_due()
+
+    due = scheduler.pop_due(first + 35)
+
+    assert len(due) == 1
+    assert scheduler.overrun_count == 3
+    assert scheduler.next_due() == first + 40
+
+
+def test_unschedule_and_reschedule_does_not_duplicate():
+    scheduler = make_scheduler()
+    env_id = uuid.uuid4()
+    service_id = uuid.uuid4()
+    scheduler.schedule(env_id, service_id, "http://a", 10, 5, now=0.0)
+    scheduler.unschedule(env_id)
+    scheduler.schedule(env_id, service_id, "http://a", 10, 5, now=0.0)
+
+    due = scheduler.pop_due(10.0)
+
+    assert len(due) == 1
+    assert len(scheduler) == 1
+
+
+def test_unschedule_service_removes_its_environments():
+    scheduler = make_scheduler()
+    service_id = uuid.uuid4()
+    scheduler.schedule(uuid.uuid4(), service_id, "http://a", 10, 5, now=0.0)
+    scheduler.schedule(uuid.uuid4(), service_id, "http://b", 10, 5, now=0.0)
+    scheduler.schedule(uuid.uuid4(), uuid.uuid4(), "http://c", 10, 5, now=0.0)
+
+    scheduler.unschedule_service(service_id)
+
+    assert len(scheduler) == 1
+    assert len(scheduler.pop_due(10.0)) == 1
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_stop_lets_built_results_reach_the_ingestor(monkeypatch):
+    submitted, room = [], asyncio.Event()
+
+    class FullIngestor:
+        async def submit(self, row):
+            await room.wait()
+            submitted.append(row)
+
+    async def probe(url, timeout):
+        return ProbeResult(HealthStatus.HEALTHY, 5, 200, None)
+
+    async def no_broadcast(**update):
+        pass
+
+    monkeypatch.setattr(scheduler_module, "ingestor", FullIngestor())
+    monkeypatch.setattr(scheduler_module, "check_endpoint_health", probe)
+    monkeypatch.setattr(scheduler_module.manager, "broadcast_status_update", no_broadcast)
+    scheduler = make_scheduler()
+
+    async def no_resync():
+        pass
+
+    # Keep the loop off the database; a pooled connection would outlive this test's event loop
+    monkeypatch.setattr(scheduler, "resync", no_resync)
+    scheduler.start()
+    check = ScheduledCheck(uuid.uuid4(), uuid.uuid4(), "http://stub", 60, 5)
+    task = asyncio.create_task(scheduler._check_environment(check, time.time()))
+    scheduler._check_tasks.add(task)
+    await asyncio.sleep(0.01)
+
+    stopping = asyncio.create_task(scheduler.stop())
+    await asyncio.sleep(0.01)
+    room.set()
+    await stopping
+
+    assert len(submitted) == 1
+
+
+@pytest.mark.anyio
+async def test_edits_made_through_other_workers_are_detected(environment):
+    scheduler = make_scheduler()
+    assert not await scheduler._environments_changed()
+    assert not await scheduler._environments_changed()
+
+    async with async_session_maker() as db:
+        await db.execute(update(Environment).where(Environment.id == environment.id).values(check_interval_seconds=15))
+        await db.commit()
+
+    assert await scheduler._environments_changed()
@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime, timedelta
+from collections import Counter
+import pytest
+from app.services.scheduler import HealthCheckScheduler
+from app.services.sharding import WorkerMembership, owner_of
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def test_rendezvous_spreads_evenly_and_only_moves_a_dead_workers_share():
+    workers = ["a", "b", "c"]
+    environment_ids = [uuid.uuid4() for _ in range(3000)]
+    before = {environment_id: owner_of(environment_id, workers) for environment_id in environment_ids}
+
+    counts = Counter(before.values())
+    assert all(800 < count < 1200 for count in counts.values())
+
+    after = {environment_id: owner_of(environment_id, ["a", "c"]) for environment_id in environment_ids}
+    moved = [environment_id for environment_id in environment_ids if before[environment_id] != after[environment_id]]
+    assert all(before[environment_id] == "b" for environment_id in moved)
+
+
+@pytest.mark.anyio
+async def test_workers_split_environments_and_take_over_from_a_dead_one(db_tables):
+    first = WorkerMembership(heartbeat_seconds=10, ttl_seconds=30, worker_id="worker-1")
+    second = WorkerMembership(heartbeat_seconds=10, ttl_seconds=30, worker_id="worker-2")
+    now = datetime.utcnow()
+    await first.heartbeat(now)
+    await second.heartbeat(now)
+    await first.heartbeat(now)
+
+    environment_ids = [uuid.uuid4() for _ in range(200)]
+    assert all(first.owns(env_id) != second.owns(env_id) for env_id in environment_ids)
+    assert any(first.owns(env_id) for env_id in environment_ids)
+
+    # worker-2 stops heartbeating; once its row expires worker-1 owns everything
+    await first.heartbeat(now + timedelta(seconds=31))
+    assert first.workers == ("worker-1",)
+    assert first.rebalances == 2
+    assert all(first.owns(env_id) for env_id in environment_ids)
+
+
+@pytest.mark.anyio
+async def test_scheduler_dispatches_only_owned_environments(db_tables):
+    membership = WorkerMembership(heartbeat_seconds=10, ttl_seconds=30, worker_id="worker-1")
+    await membership.heartbeat()
+    membership.workers = ("worker-1", "worker-2")
+    scheduler = HealthCheckScheduler(concurrency=4, resync_seconds=300, membership=membership)
+    environment_ids = [uuid.uuid4() for _ in range(50)]
+    for environment_id in environment_ids:
+        scheduler.schedule(environment_id, uuid.uuid4(), "http://a", 10, 5, now=0.0)
+
+    due = {entry.environment_id for entry, _ in scheduler.pop_due(10.0)}
+
+    assert due == {env_id for env_id in environment_ids if owner_of(env_id, membership.workers) == "worker-1"}
+    assert 0 < len(due) < len(environment_ids)
+    assert len(scheduler) == len(environment_ids)
+
+
+@pytest.mark.anyio
+async def test_heartbeat_uses_the_database_clock(db_tables, monkeypatch):
+    from app.services import sharding
+
+    class SkewedClock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return super().utcnow() + timedelta(hours=1)
+
+    peer = WorkerMembership(heartbeat_seconds=10, ttl_seconds=30, worker_id="worker-2")
+    await peer.heartbeat()
+    # A local clock running ahead must not expire a peer that just heartbeated
+    monkeypatch.setattr(sharding, "datetime", SkewedClock)
+    skewed = WorkerMembership(heartbeat_seconds=10, ttl_seconds=30, worker_id="worker-1")
+    await skewed.heartbeat()
+
+    assert skewed.workers == ("worker-1", "worker-2")
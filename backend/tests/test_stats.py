@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+import pytest
+from app.database import async_session_maker
+from app.models.health_check import HealthStatus
+from app.services.monitor_service import ProbeResult, build_health_check_row
+from app.services.rollup_service import upsert_rollups
+from app.services.stats_service import estimate_percentile, get_health_stats
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def test_percentile_estimate_stays_within_bucket_and_observed_range():
+    # 90 checks at 100ms (bucket 17: 81-100ms), 10 at 1000ms (bucket 27: 801-1000ms)
+    histogram = {17: 90, 27: 10}
+
+    assert 80 < estimate_percentile(histogram, 50, 100, 1000) <= 100
+    assert 800 < estimate_percentile(histogram, 99, 100, 1000) <= 1000
+    assert estimate_percentile({}, 50) is None
+
+
+@pytest.mark.anyio
+async def test_stats_from_rollups(environment):
+    start = datetime(2026, 10, 16, 12, 0)
+    rows = []
+    for minute in range(10):
+        status = HealthStatus.DOWN if minute in (3, 4) else HealthStatus.HEALTHY
+        response_time_ms = 1000 if minute == 9 else 100
+        row = build_health_check_row(environment.id, ProbeResult(status, response_time_ms, 200, None))
+        row["checked_at"] = start + timedelta(minutes=minute, seconds=30)
+        rows.append(row)
+
+    async with async_session_maker() as db:
+        await upsert_rollups(db, rows)
+        await db.commit()
+
+    async with async_session_maker() as db:
+        resolution, stats = await get_health_stats(db, [environment.id], start, start + timedelta(minutes=10))
+
+    summary = stats[environment.id].summary()
+    assert resolution == "1m"
+    assert summary["total_checks"] == 10
+    assert summary["uptime_percent"] == pytest.approx(80.0)
+    assert summary["time_in_status_seconds"][HealthStatus.DOWN] == pytest.approx(120.0)
+    assert summary["time_in_status_seconds"][HealthStatus.HEALTHY] == pytest.approx(480.0)
+    assert summary["response_time_p50"] == pytest.approx(100, rel=0.25)
+    assert summary["response_time_p99"] == pytest.approx(1000, rel=0.25)
+    assert summary["response_time_max"] == 1000
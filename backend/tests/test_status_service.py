@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+import pytest
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select
+from app.database import async_session_maker
+from app.main import app
+from app.models.health_check import EnvironmentLatestStatus, HealthStatus
+from app.services.monitor_service import ProbeResult, build_health_check_row, get_services_with_status, save_health_check
+from app.services.status_service import StatusCache, status_cache, upsert_latest_status
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def make_row(environment_id, status, checked_at):
+    row = build_health_check_row(environment_id, ProbeResult(status, 20, 200, None))
+    row["checked_at"] = checked_at
+    return row
+
+
+@pytest.mark.anyio
+async def test_upsert_keeps_newest_result(environment):
+    now = datetime.utcnow()
+    async with async_session_maker() as db:
+        await upsert_latest_status(db, [
+            make_row(environment.id, HealthStatus.DOWN, now),
+            make_row(environment.id, HealthStatus.HEALTHY, now - timedelta(minutes=2)),
+        ])
+        # An older, late-arriving result must not win
+        await upsert_latest_status(db, [make_row(environment.id, HealthStatus.DEGRADED, now - timedelta(minutes=1))])
+        await db.commit()
+
+        result = await db.execute(select(EnvironmentLatestStatus))
+        latest = result.scalar_one()
+
+    assert latest.status == HealthStatus.DOWN
+    assert latest.checked_at == now
+
+
+@pytest.mark.anyio
+async def test_services_listing_reads_projection(environment):
+    now = datetime.utcnow()
+    async with async_session_maker() as db:
+        await upsert_latest_status(db, [make_row(environment.id, HealthStatus.DEGRADED, now)])
+        await db.commit()
+
+    async with async_session_maker() as db:
+        services = await get_services_with_status(db)
+
+    env = services[0].environments[0]
+    assert env.current_status == HealthStatus.DEGRADED
+    assert env.last_check == now
+
+
+def test_cache_ignores_stale_updates():
+    cache = StatusCache()
+    env_id = object()
+    now = datetime.utcnow()
+
+    assert cache.update(env_id, HealthStatus.DOWN, 10, now)
+    assert not cache.update(env_id, HealthStatus.HEALTHY, 10, now - timedelta(seconds=1))
+    assert cache.get(env_id).status == HealthStatus.DOWN
+
+
+@pytest.mark.anyio
+async def test_refresh_picks_up_results_written_elsewhere(environment):
+    cache = StatusCache()
+    now = datetime.utcnow()
+    cache.update(environment.id, HealthStatus.HEALTHY, 10, now - timedelta(minutes=1), service_id=environment.service_id)
+    async with async_session_maker() as db:
+        await upsert_latest_status(db, [make_row(environment.id, HealthStatus.DOWN, now)])
+        await db.commit()
+
+    assert await cache.refresh() == 1
+    assert cache.for_service(environment.service_id)[environment.id].status == HealthStatus.DOWN
+    assert await cache.refresh() == 0
+
+
+@pytest.mark.anyio
+async def test_saved_check_reaches_the_cache_only_on_commit(environment):
+    async with async_session_maker() as db:
+        await save_health_check(db, environment.id, ProbeResult(HealthStatus.DOWN, 20, 503, None))
+        assert status_cache.get(environment.id) is None
+        await db.rollback()
+    assert status_cache.get(environment.id) is None
+
+    async with async_session_maker() as db:
+        await save_health_check(db, environment.id, ProbeResult(HealthStatus.HEALTHY, 20, 200, None))
+        await db.commit()
+    assert status_cache.get(environment.id).status == HealthStatus.HEALTHY
+
+
+@pytest.mark.anyio
+async def test_deleting_a_service_evicts_its_environments(db_tables):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/api/auth/register", json={"email": "evict@example.com", "password": "pw"})
+        login = await client.post("/api/auth/login", json={"email": "evict@example.com", "password": "pw"})
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        team = (await client.post("/api/teams", json={"name": "Team"})).json()
+        service = (await client.post("/api/services", json={"name": "API", "team_id": team["id"]})).json()
+        environment = (await client.post(
+            f"/api/services/{service['id']}/environments",
+            json={"name": "production", "url": "http://127.0.0.1:9/health"}
+        )).json()
+        service_id, environment_id = UUID(service["id"]), UUID(environment["id"])
+        status_cache.update(environment_id, HealthStatus.DOWN, 5, datetime.utcnow(), service_id=service_id)
+
+        deleted = await client.delete(f"/api/services/{service['id']}")
+
+    assert deleted.status_code == 204
+    assert status_cache.get(environment_id) is None
+    assert status_cache.for_service(service_id) == {}
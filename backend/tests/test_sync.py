@@ -0,0 +1,94 @@
+import time
+from uuid import UUID
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.database import async_session_maker
+from app.main import app
+from app.models.health_check import HealthStatus
+from app.services.ingestion import ingestor
+from app.services.monitor_service import ProbeResult, save_health_check
+from app.services.scheduler import HealthCheckScheduler, ScheduledCheck
+from app.services.status_service import status_cache
+from app.services.sync_service import get_changes
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_sync_returns_changes_since_cursor(db_tables):
+    status_cache.clear()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/api/auth/register", json={"email": "sync@example.com", "password": "pw"})
+        login = await client.post("/api/auth/login", json={"email": "sync@example.com", "password": "pw"})
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        team = (await client.post("/api/teams", json={"name": "Team"})).json()
+        service = (await client.post("/api/services", json={"name": "API", "team_id": team["id"]})).json()
+        environment = (await client.post(
+            f"/api/services/{service['id']}/environments",
+            json={"name": "production", "url": "http://127.0.0.1:9/health"}
+        )).json()
+
+        snapshot = (await client.get("/api/sync")).json()
+        assert snapshot["full"] and [s["id"] for s in snapshot["services"]] == [service["id"]]
+        assert [e["id"] for e in snapshot["environments"]] == [environment["id"]]
+
+        unchanged = (await client.get("/api/sync", params={"since": snapshot["cursor"]})).json()
+        assert unchanged["cursor"] == snapshot["cursor"] and not unchanged["services"]
+
+        probe = ProbeResult(HealthStatus.DOWN, 5, None, "Connection refused")
+        for _ in range(2):
+            async with async_session_maker() as db:
+                await save_health_check(db, UUID(environment["id"]), probe)
+                await db.commit()
+        status_changes = (await client.get("/api/sync", params={"since": unchanged["cursor"]})).json()
+        assert [s["current_status"] for s in status_changes["statuses"]] == ["down"]
+        # Repeating the same status is not a transition
+        assert status_changes["cursor"] == unchanged["cursor"] + 1
+        paged = await client.get("/api/sync", params={"since": 0, "limit": 1})
+        assert paged.status_code == 200 and paged.json()["has_more"]
+
+        await client.post("/api/auth/register", json={"email": "other@example.com", "password": "pw"})
+        other_login = await client.post("/api/auth/login", json={"email": "other@example.com", "password": "pw"})
+        other = {"Authorization": f"Bearer {other_login.json()['access_token']}"}
+        other_cursor = (await client.get("/api/sync", headers=other)).json()["cursor"]
+
+        await client.delete(f"/api/services/{service['id']}")
+        deleted = (await client.get("/api/sync", params={"since": status_changes["cursor"]})).json()
+        assert deleted["deleted"]["services"] == [service["id"]] and not deleted["services"]
+        # Other tenants do not learn about the deletion
+        unrelated = (await client.get("/api/sync", params={"since": other_cursor}, headers=other)).json()
+        assert unrelated["deleted"] == {"services": [], "environments": []}
+
+        await client.delete(f"/api/teams/{team['id']}")
+        after_team = (await client.get("/api/sync", params={"since": deleted["cursor"]})).json()
+        assert after_team["scope"] != deleted["scope"]
+    status_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_scheduled_check_logs_status_transition(environment):
+    status_cache.clear()
+    async with async_session_maker() as db:
+        await save_health_check(db, environment.id, ProbeResult(HealthStatus.HEALTHY, 5, 200, None))
+        await db.commit()
+        since = (await get_changes(db, None, 0, 100))["cursor"]
+
+    # The probe target refuses connections, so the scheduled check flips the
+    # environment to down; its broadcast refreshes the status cache before
+    # the ingestor writes the row
+    scheduler = HealthCheckScheduler(concurrency=1, resync_seconds=3600)
+    check = ScheduledCheck(environment.id, environment.service_id, environment.url, 60, 2)
+    ingestor.start()
+    try:
+        await scheduler._check_environment(check, time.time())
+    finally:
+        await ingestor.stop()
+
+    async with async_session_maker() as db:
+        changes = await get_changes(db, None, since, 100)
+    status_cache.clear()
+
+    assert [(e.id, e.current_status) for e in changes["statuses"]] == [(environment.id, HealthStatus.DOWN)]
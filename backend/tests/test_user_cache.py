@@ -0,0 +1,95 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from app.database import async_session_maker
+from app.models.user import User, UserRole
+from app.services.auth_service import create_user, get_current_user
+from app.services.user_cache import TokenUserCache, UserSnapshot, user_cache
+from app.utils.security import create_access_token
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+def snapshot(user_id=None) -> UserSnapshot:
+    return UserSnapshot(user_id or uuid.uuid4(), "a@example.com", None, UserRole.MEMBER, datetime.utcnow())
+
+
+def test_cache_evicts_least_recently_used_and_honours_token_expiry():
+    cache = TokenUserCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", snapshot())
+    cache.put("b", snapshot())
+    cache.get("a")
+    cache.put("c", snapshot())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.put("expired", snapshot(), token_expires_at=time.time() - 1)
+    assert cache.get("expired") is None
+
+
+def test_invalidate_user_drops_all_their_tokens():
+    cache = TokenUserCache(max_entries=10, ttl_seconds=60)
+    user_id = uuid.uuid4()
+    cache.put("first", snapshot(user_id))
+    cache.put("second", snapshot(user_id))
+    cache.put("other", snapshot())
+
+    cache.invalidate_user(user_id)
+
+    assert cache.get("first") is None and cache.get("second") is None
+    assert cache.get("other") is not None
+
+
+@pytest.mark.anyio
+async def test_current_user_served_from_cache_until_role_changes(db_tables):
+    user_cache.clear()
+    async with async_session_maker() as db:
+        user = await create_user(db, "cache@example.com", "pw")
+        await db.commit()
+    token = create_access_token({"sub": str(user.id)}, timedelta(minutes=5))
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async with async_session_maker() as db:
+        first = await get_current_user(credentials, db)
+    # No session: this can only be answered from the cache
+    second = await get_current_user(credentials, None)
+    assert second is first
+
+    async with async_session_maker() as db:
+        stored = await db.get(User, user.id)
+        stored.role = UserRole.ADMIN
+        await db.commit()
+
+    async with async_session_maker() as db:
+        refreshed = await get_current_user(credentials, db)
+    assert refreshed.role == UserRole.ADMIN
+
+
+@pytest.mark.anyio
+async def test_user_change_evicts_on_commit_not_on_flush(db_tables):
+    user_cache.clear()
+    async with async_session_maker() as db:
+        user = await create_user(db, "flush@example.com", "pw")
+        await db.commit()
+    user_cache.put("token", UserSnapshot.from_user(user))
+
+    async with async_session_maker() as db:
+        stored = await db.get(User, user.id)
+        stored.role = UserRole.ADMIN
+        await db.flush()
+        assert user_cache.get("token") is not None
+        await db.rollback()
+    assert user_cache.get("token") is not None
+
+    async with async_session_maker() as db:
+        stored = await db.get(User, user.id)
+        stored.role = UserRole.ADMIN
+        await db.commit()
+    assert user_cache.get("token") is None
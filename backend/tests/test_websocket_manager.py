@@ -0,0 +1,293 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+import msgpack
+import pytest
+from app.models.health_check import HealthStatus
+from app.services.status_service import status_cache
+from app.websocket.manager import MSGPACK_SUBPROTOCOL, SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+
+
+class FakeSocket:
+    pass
+
+
+def test_unsubscribe_drops_empty_subscription_sets():
+    manager = ConnectionManager()
+    socket, service_id, env_id = FakeSocket(), uuid.uuid4(), uuid.uuid4()
+    manager.subscribe_to_service(socket, service_id)
+    manager.subscribe_to_environment(socket, env_id)
+
+    manager.unsubscribe_from_service(socket, service_id)
+    manager.unsubscribe_from_environment(socket, env_id)
+
+    assert manager.service_connections == {}
+    assert manager.environment_connections == {}
+    record = manager.connections[socket]
+    assert not record.services and not record.environments
+
+
+def test_disconnect_only_touches_own_subscriptions():
+    manager = ConnectionManager()
+    leaving, staying = FakeSocket(), FakeSocket()
+    shared, own = uuid.uuid4(), uuid.uuid4()
+    manager.subscribe_to_service(leaving, shared)
+    manager.subscribe_to_service(leaving, own)
+    manager.subscribe_to_service(staying, shared)
+
+    manager.disconnect(leaving)
+    manager.disconnect(leaving)
+
+    assert manager.service_connections == {str(shared): {staying}}
+    assert list(manager.active_connections) == [staying]
+
+
+class RecordingSocket:
+    def __init__(self, stall: bool = False):
+        self.sent: list = []
+        self.subprotocol = None
+        self.closed_with = None
+        self._stall = asyncio.Event() if stall else None
+
+    async def accept(self, subprotocol=None):
+        self.subprotocol = subprotocol
+
+    async def send_text(self, text: str):
+        if self._stall is not None:
+            await self._stall.wait()
+        self.sent.append(text)
+
+    async def send_bytes(self, data: bytes):
+        if self._stall is not None:
+            await self._stall.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def broadcast(manager: ConnectionManager, service_id, environment_id, status: str):
+    await manager.broadcast_status_update(service_id, environment_id, status, 10, "2026-10-16T12:00:00")
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.mark.anyio
+async def test_slow_client_does_not_stall_others_and_drops_oldest():
+    manager = ConnectionManager(queue_size=2)
+    fast, slow = RecordingSocket(), RecordingSocket(stall=True)
+    service_id = uuid.uuid4()
+    for socket in (fast, slow):
+        await manager.connect(socket)
+        manager.subscribe_to_service(socket, service_id)
+
+    for status in ("healthy", "degraded", "down", "healthy"):
+        await broadcast(manager, service_id, uuid.uuid4(), status)
+        await asyncio.sleep(0.01)
+
+    assert [json.loads(text)["status"] for text in fast.sent] == ["healthy", "degraded", "down", "healthy"]
+    # The stalled writer holds the first frame; the queue keeps the newest two
+    assert manager.connections[slow].dropped == 1
+    assert [json.loads(entry[1])["status"] for entry in manager.connections[slow].queue] == ["down", "healthy"]
+    assert manager.stats()["max_queue_depth"] == 2
+
+    manager.disconnect(fast)
+    manager.disconnect(slow)
+
+
+@pytest.mark.anyio
+async def test_coalesce_policy_replaces_queued_frame_for_same_environment():
+    manager = ConnectionManager(queue_size=2, slow_consumer_policy="coalesce")
+    slow = RecordingSocket(stall=True)
+    service_id, busy_env, quiet_env = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await manager.connect(slow)
+    manager.subscribe_to_service(slow, service_id)
+
+    await broadcast(manager, service_id, busy_env, "healthy")
+    await asyncio.sleep(0.01)
+    await broadcast(manager, service_id, busy_env, "degraded")
+    await broadcast(manager, service_id, quiet_env, "healthy")
+    await broadcast(manager, service_id, busy_env, "down")
+
+    queued = [json.loads(entry[1]) for entry in manager.connections[slow].queue]
+    assert [(item["environment_id"], item["status"]) for item in queued] == [
+        (str(busy_env), "down"), (str(quiet_env), "healthy")
+    ]
+    manager.disconnect(slow)
+
+
+@pytest.mark.anyio
+async def test_disconnect_policy_closes_slow_client():
+    manager = ConnectionManager(queue_size=1, slow_consumer_policy="disconnect")
+    slow = RecordingSocket(stall=True)
+    service_id = uuid.uuid4()
+    await manager.connect(slow)
+    manager.subscribe_to_service(slow, service_id)
+
+    for _ in range(3):
+        await broadcast(manager, service_id, uuid.uuid4(), "healthy")
+    await asyncio.sleep(0.01)
+
+    assert slow not in manager.connections
+    assert manager.service_connections == {}
+    assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert manager.slow_consumer_disconnects == 1
+
+
+@pytest.mark.anyio
+async def test_service_and_environment_subscriber_gets_one_frame():
+    manager = ConnectionManager()
+    socket = RecordingSocket()
+    service_id, environment_id = uuid.uuid4(), uuid.uuid4()
+    await manager.connect(socket)
+    manager.subscribe_to_service(socket, service_id)
+    manager.subscribe_to_environment(socket, environment_id)
+
+    await broadcast(manager, service_id, environment_id, "healthy")
+    await asyncio.sleep(0.01)
+
+    assert len(socket.sent) == 1
+    manager.disconnect(socket)
+
+
+@pytest.mark.anyio
+async def test_batch_and_delta_modes_merge_and_skip_unchanged():
+    manager = ConnectionManager(batch_window=0.02)
+    socket = RecordingSocket()
+    service_id, first_env, second_env = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    await manager.connect(socket)
+    manager.subscribe_to_service(socket, service_id)
+    manager.configure(socket, batch=True, delta=True)
+
+    await broadcast(manager, service_id, first_env, "healthy")
+    await broadcast(manager, service_id, first_env, "down")
+    await broadcast(manager, service_id, second_env, "healthy")
+    await asyncio.sleep(0.05)
+    # Same statuses again: nothing changed, so nothing is sent
+    await broadcast(manager, service_id, first_env, "down")
+    await broadcast(manager, service_id, second_env, "healthy")
+    await asyncio.sleep(0.05)
+
+    frames = [json.loads(text) for text in socket.sent]
+    assert len(frames) == 1
+    assert frames[0]["type"] == "status_batch"
+    assert [(update["environment_id"], update["status"]) for update in frames[0]["updates"]] == [
+        (str(first_env), "down"), (str(second_env), "healthy")
+    ]
+    manager.disconnect(socket)
+
+
+@pytest.mark.anyio
+async def test_subscribe_gets_snapshot_and_reconnect_replays_missed_updates():
+    manager = ConnectionManager(replay_size=2)
+    service_id, environment_id = uuid.uuid4(), uuid.uuid4()
+    status_cache.update(environment_id, HealthStatus.HEALTHY, 12, datetime(2026, 10, 16, 11), service_id=service_id)
+    try:
+        socket = RecordingSocket()
+        await manager.connect(socket)
+        manager.subscribe_to_service(socket, service_id)
+        manager.catch_up_service(socket, service_id)
+        await broadcast(manager, service_id, environment_id, "down")
+        await asyncio.sleep(0.01)
+        snapshot, update = [json.loads(text) for text in socket.sent]
+        manager.disconnect(socket)
+
+        assert snapshot["type"] == "snapshot" and snapshot["seq"] == 0
+        assert [entry["status"] for entry in snapshot["statuses"]] == ["healthy"]
+        assert update["seq"] == 1
+
+        await broadcast(manager, service_id, environment_id, "degraded")
+        await broadcast(manager, service_id, environment_id, "healthy")
+        resumed, behind = RecordingSocket(), RecordingSocket()
+        for socket, seq in ((resumed, 2), (behind, 0)):
+            await manager.connect(socket)
+            manager.subscribe_to_service(socket, service_id)
+            manager.catch_up_service(socket, service_id, resume_from=seq, stream=manager.stream)
+        await asyncio.sleep(0.01)
+
+        replay = json.loads(resumed.sent[0])
+        assert replay["type"] == "replay" and [u["seq"] for u in replay["updates"]] == [3]
+        # Update 1 has left the two-entry buffer, so a full snapshot is sent instead
+        fallback = json.loads(behind.sent[0])
+        assert fallback["type"] == "snapshot" and fallback["statuses"][0]["status"] == "healthy"
+        manager.disconnect(resumed)
+        manager.disconnect(behind)
+    finally:
+        status_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_binary_clients_get_msgpack_frames_with_short_ids():
+    manager = ConnectionManager()
+    binary, text = RecordingSocket(), RecordingSocket()
+    service_id, environment_id = uuid.uuid4(), uuid.uuid4()
+    await manager.connect(binary, binary=True, subprotocol=MSGPACK_SUBPROTOCOL)
+    await manager.connect(text)
+    for socket in (binary, text):
+        manager.subscribe_to_service(socket, service_id)
+
+    await broadcast(manager, service_id, environment_id, "down")
+    await broadcast(manager, service_id, environment_id, "healthy")
+    await asyncio.sleep(0.01)
+    status_cache.clear()
+
+    assert binary.subprotocol == MSGPACK_SUBPROTOCOL
+    ids, first, second = [msgpack.unpackb(frame) for frame in binary.sent]
+    assert ids == {"type": "ids", "ids": {str(environment_id): 1, str(service_id): 2}}
+    assert first == [1, 1, 2, "down", 10, "2026-10-16T12:00:00"]
+    assert second[3] == "healthy"
+    assert json.loads(text.sent[0])["environment_id"] == str(environment_id)
+    manager.disconnect(binary)
+    manager.disconnect(text)
+
+
+
+@pytest.mark.anyio
+async def test_slow_binary_client_keeps_every_ids_frame():
+    manager = ConnectionManager(queue_size=2, slow_consumer_policy="coalesce")
+    socket = RecordingSocket(stall=True)
+    service_id, environments = uuid.uuid4(), [uuid.uuid4() for _ in range(3)]
+    await manager.connect(socket, binary=True)
+    manager.subscribe_to_service(socket, service_id)
+
+    for environment_id in environments + environments[1:2]:
+        await broadcast(manager, service_id, environment_id, "healthy")
+        await asyncio.sleep(0)
+    socket._stall.set()
+    await asyncio.sleep(0.01)
+    status_cache.clear()
+
+    frames = [msgpack.unpackb(frame) for frame in socket.sent]
+    announced = {short for frame in frames if isinstance(frame, dict) for short in frame["ids"].values()}
+    used = {short for frame in frames if isinstance(frame, list) for short in frame[1:3]}
+    assert used and used <= announced
+    manager.disconnect(socket)
+
+
+@pytest.mark.anyio
+async def test_only_committed_results_reach_the_status_cache():
+    manager = ConnectionManager()
+    service_id, environment_id = uuid.uuid4(), uuid.uuid4()
+
+    def committed(checked_at: str) -> dict:
+        return {"type": "status_committed", "statuses": [{
+            "environment_id": str(environment_id), "service_id": str(service_id),
+            "status": "down", "response_time_ms": 10, "checked_at": checked_at
+        }]}
+
+    # Broadcast before the ingestor has written the row
+    await broadcast(manager, service_id, environment_id, "down")
+    assert status_cache.get(environment_id) is None
+
+    manager._on_bus_message(committed("2026-10-16T12:00:00"))
+    assert status_cache.for_service(service_id)[environment_id].status == HealthStatus.DOWN
+
+    # A result committed just before the delete must not bring the environment back
+    await manager.broadcast_environments_removed([environment_id])
+    manager._on_bus_message(committed("2026-10-16T12:01:00"))
+    assert status_cache.get(environment_id) is None
+    assert status_cache.for_service(service_id) == {}